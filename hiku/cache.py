@@ -1,32 +1,49 @@
 import abc
+import asyncio
 import contextlib
 import hashlib
+import heapq
+import itertools
+import logging
+import math
+import random
+import sys
+import threading
+import time
 
 from collections import (
+    OrderedDict,
     defaultdict,
     deque,
 )
+from concurrent.futures import Executor, Future
 from dataclasses import dataclass
 from typing import (
     TYPE_CHECKING,
     Any,
     Deque,
+    Iterable,
     Iterator,
     Callable,
+    Mapping,
+    NamedTuple,
     Protocol,
+    cast,
 )
 
-from prometheus_client import Counter
+from prometheus_client import Counter, Gauge, Histogram
 
 from hiku.result import Index
 from hiku.graph import (
     Many,
+    Maybe,
     Graph,
     Node,
     Field,
 )
 from hiku.query import (
     QueryVisitor,
+    value_key,
     Field as QueryField,
     Link as QueryLink,
     Node as QueryNode,
@@ -46,8 +63,70 @@ RESULT_CACHE_MISSES = Counter(
     documentation="Resolver result cache misses",
     labelnames=["graph", "query_name", "node", "field"],
 )
+RESULT_CACHE_STALE_HITS = Counter(
+    name="hiku_result_cache_stale_hits",
+    documentation="Expired resolver results served from cache during refresh",
+    labelnames=["graph", "query_name", "node", "field"],
+)
+RESULT_CACHE_EARLY_REFRESHES = Counter(
+    name="hiku_result_cache_early_refreshes",
+    documentation="Resolver results refreshed before expiration",
+    labelnames=["graph", "query_name", "node", "field"],
+)
+TIERED_CACHE_L1_HITS = Counter(
+    name="hiku_tiered_cache_l1_hits",
+    documentation="Tiered cache hits served from the in-process cache",
+    labelnames=["cache"],
+)
+TIERED_CACHE_L2_HITS = Counter(
+    name="hiku_tiered_cache_l2_hits",
+    documentation="Tiered cache hits served from the backend cache",
+    labelnames=["cache"],
+)
+TIERED_CACHE_MISSES = Counter(
+    name="hiku_tiered_cache_misses",
+    documentation="Tiered cache misses in both levels",
+    labelnames=["cache"],
+)
+CACHE_WRITER_PENDING = Gauge(
+    name="hiku_cache_writer_pending",
+    documentation="Cache writes waiting in the background writer queue",
+)
+CACHE_WRITER_COALESCED = Counter(
+    name="hiku_cache_writer_coalesced",
+    documentation="Cache writes replaced by newer writes to the same key",
+)
+CACHE_WRITER_DROPPED = Counter(
+    name="hiku_cache_writer_dropped",
+    documentation="Cache writes dropped because writer queue is full",
+)
+CACHE_WRITER_ERRORS = Counter(
+    name="hiku_cache_writer_errors",
+    documentation="Failed background cache writes",
+)
+CACHE_WRITER_LAG = Histogram(
+    name="hiku_cache_writer_lag_seconds",
+    documentation="Time cache writes wait in the background writer queue",
+)
+
+SINGLE_FLIGHT_WAITS = Counter(
+    name="hiku_cache_single_flight_waits",
+    documentation="Cache misses which waited for the concurrent computation",
+)
+SINGLE_FLIGHT_TIMEOUTS = Counter(
+    name="hiku_cache_single_flight_timeouts",
+    documentation="Cache misses which were not computed by the concurrent"
+    " request in time",
+)
+SINGLE_FLIGHT_FAILURES = Counter(
+    name="hiku_cache_single_flight_failures",
+    documentation="Cache misses which were not computed because the"
+    " concurrent request failed",
+)
 
-CACHE_VERSION = "2"
+CACHE_VERSION = "5"
+
+log = logging.getLogger(__name__)
 
 
 class Hasher(Protocol):
@@ -68,29 +147,591 @@ class BaseCache(abc.ABC):
         raise NotImplementedError()
 
 
+class AsyncBaseCache(abc.ABC):
+    """Cache with awaitable methods, which are awaited by the engine
+    natively, it can be used only with asynchronous executors, e.g.
+    :py:class:`hiku.executors.asyncio.AsyncIOExecutor`
+    """
+
+    @abc.abstractmethod
+    async def get_many(self, keys: list[str]) -> dict[str, Any]:
+        """Result must contain only keys which were cached"""
+        raise NotImplementedError()
+
+    @abc.abstractmethod
+    async def set_many(self, items: dict[str, Any], ttl: int) -> None:
+        raise NotImplementedError()
+
+
+class InMemoryAsyncCache(AsyncBaseCache):
+    """Reference implementation of the :py:class:`AsyncBaseCache`, which
+    stores entries in a dict until they expire, intended for tests and
+    benchmarks
+
+    :param clock: function which returns current time in seconds
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic) -> None:
+        self._clock = clock
+        self._store: dict[str, tuple[float, Any]] = {}
+
+    def __len__(self) -> int:
+        return len(self._store)
+
+    async def get_many(self, keys: list[str]) -> dict[str, Any]:
+        now = self._clock()
+        result = {}
+        for key in keys:
+            entry = self._store.get(key)
+            if entry is None:
+                continue
+            if entry[0] <= now:
+                del self._store[key]
+            else:
+                result[key] = entry[1]
+        return result
+
+    async def set_many(self, items: dict[str, Any], ttl: int) -> None:
+        expires = self._clock() + ttl
+        for key, value in items.items():
+            self._store[key] = (expires, value)
+
+
+def approx_size(value: Any) -> int:
+    """Returns approximate size of the cached value in bytes, nested
+    containers are traversed
+    """
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        for k, v in value.items():
+            size += approx_size(k) + approx_size(v)
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        for v in value:
+            size += approx_size(v)
+    return size
+
+
+class TieredCache(BaseCache):
+    """Bounded in-process LRU cache (L1) in front of another cache (L2)
+
+    Reads are served from L1 when possible, missing keys are fetched from
+    L2 and stored in L1 (read-through). Writes go to both levels
+    (write-through). L1 entries expire after ``ttl`` from the ``@cached``
+    directive, entries loaded from L2 expire after ``read_ttl`` seconds,
+    because their remaining TTL in L2 is unknown, but not later than
+    ``expires`` time of the cached link payload. Payloads which are already
+    expired are not stored in L1.
+
+    Exposes metrics:
+    - hiku_tiered_cache_l1_hits
+    - hiku_tiered_cache_l2_hits
+    - hiku_tiered_cache_misses
+
+    :param l2: backend cache
+    :param maxsize: max number of entries in L1
+    :param max_bytes: max approximate size of entries in L1, not limited
+        when ``None``
+    :param read_ttl: L1 TTL of entries loaded from L2
+    :param name: value of the ``cache`` metrics label
+    :param sizeof: function to estimate entry size in bytes
+    :param clock: function which returns current time in seconds
+    """
+
+    def __init__(
+        self,
+        l2: BaseCache,
+        maxsize: int = 1024,
+        max_bytes: int | None = None,
+        read_ttl: int = 10,
+        name: str = "default",
+        sizeof: Callable[[Any], int] = approx_size,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.l2 = l2
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.read_ttl = read_ttl
+        self._sizeof = sizeof
+        self._clock = clock
+        self._l1: OrderedDict[str, tuple[float, int, Any]] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._l1_hits = TIERED_CACHE_L1_HITS.labels(name)
+        self._l2_hits = TIERED_CACHE_L2_HITS.labels(name)
+        self._misses = TIERED_CACHE_MISSES.labels(name)
+
+    def __len__(self) -> int:
+        return len(self._l1)
+
+    @property
+    def size(self) -> int:
+        """Approximate size of L1 entries in bytes"""
+        return self._bytes
+
+    def _pop(self, key: str) -> None:
+        _, size, _ = self._l1.pop(key)
+        self._bytes -= size
+
+    def _read_ttl(self, value: Any, now: float) -> float:
+        if isinstance(value, dict) and "expires" in value:
+            return min(self.read_ttl, value["expires"] - now)
+        return self.read_ttl
+
+    def _store(self, items: dict[str, Any], ttl: float) -> None:
+        if ttl <= 0 or self.maxsize <= 0:
+            return
+        expires = self._clock() + ttl
+        sized = [
+            (key, value, self._sizeof(value) if self.max_bytes else 0)
+            for key, value in items.items()
+        ]
+        with self._lock:
+            for key, value, size in sized:
+                if key in self._l1:
+                    self._pop(key)
+                if self.max_bytes is not None and size > self.max_bytes:
+                    continue
+                self._l1[key] = (expires, size, value)
+                self._bytes += size
+            while len(self._l1) > self.maxsize or (
+                self.max_bytes is not None and self._bytes > self.max_bytes
+            ):
+                _, (_, size, _) = self._l1.popitem(last=False)
+                self._bytes -= size
+
+    def get_many(self, keys: list[str]) -> dict[str, Any]:
+        result = {}
+        missing = []
+        now = self._clock()
+        with self._lock:
+            for key in keys:
+                entry = self._l1.get(key)
+                if entry is None:
+                    missing.append(key)
+                elif entry[0] <= now:
+                    self._pop(key)
+                    missing.append(key)
+                else:
+                    self._l1.move_to_end(key)
+                    result[key] = entry[2]
+        if result:
+            self._l1_hits.inc(len(result))
+        if missing:
+            loaded = self.l2.get_many(missing)
+            if loaded:
+                self._l2_hits.inc(len(loaded))
+                # wall time, as payloads store their expiration time
+                wall_now = time.time()
+                by_ttl: dict[float, dict[str, Any]] = defaultdict(dict)
+                for key, value in loaded.items():
+                    by_ttl[self._read_ttl(value, wall_now)][key] = value
+                for ttl, items in by_ttl.items():
+                    self._store(items, ttl)
+                result.update(loaded)
+            if len(loaded) < len(missing):
+                self._misses.inc(len(missing) - len(loaded))
+        return result
+
+    def set_many(self, items: dict[str, Any], ttl: int) -> None:
+        self._store(items, ttl)
+        self.l2.set_many(items, ttl)
+
+
+class _Write(NamedTuple):
+    cache: BaseCache | AsyncBaseCache
+    key: str
+    value: Any
+    ttl: int
+    queued: float
+
+
+class CacheWriter:
+    """Writes cache entries in background, so query results are returned
+    without waiting for the cache backend
+
+    Writes to the same key, which are still in the queue, are coalesced:
+    only the latest value is written. When queue is full, new writes are
+    dropped, so a slow cache backend does not consume memory without
+    limit.
+
+    Synchronous caches are written in a daemon thread, asynchronous caches
+    (:py:class:`AsyncBaseCache`) are written by a task in the event loop,
+    which submitted writes, each event loop has its own queue and task.
+
+    Exposes metrics:
+    - hiku_cache_writer_pending
+    - hiku_cache_writer_coalesced
+    - hiku_cache_writer_dropped
+    - hiku_cache_writer_errors
+    - hiku_cache_writer_lag_seconds
+
+    :param maxsize: max number of keys waiting in the queue
+    """
+
+    def __init__(self, maxsize: int = 10000) -> None:
+        self.maxsize = maxsize
+        self._pending: OrderedDict[tuple[int, str], _Write] = OrderedDict()
+        self._pending_async: dict[
+            asyncio.AbstractEventLoop, OrderedDict[tuple[int, str], _Write]
+        ] = {}
+        self._writing = 0
+        self._lock = threading.Lock()
+        self._ready = threading.Condition(self._lock)
+        self._idle = threading.Condition(self._lock)
+        self._thread: threading.Thread | None = None
+        self._tasks: dict[asyncio.AbstractEventLoop, asyncio.Task] = {}
+
+    def __len__(self) -> int:
+        return len(self._pending) + sum(map(len, self._pending_async.values()))
+
+    def submit(
+        self, cache: BaseCache | AsyncBaseCache, items: dict[str, Any], ttl: int
+    ) -> None:
+        """Queues items to be written into the cache"""
+        is_async = isinstance(cache, AsyncBaseCache)
+        loop = asyncio.get_running_loop() if is_async else None
+        queued = time.perf_counter()
+        with self._lock:
+            if loop is not None:
+                pending = self._pending_async.setdefault(loop, OrderedDict())
+            else:
+                pending = self._pending
+            for key, value in items.items():
+                pkey = (id(cache), key)
+                if pkey in pending:
+                    CACHE_WRITER_COALESCED.inc()
+                elif len(pending) >= self.maxsize:
+                    CACHE_WRITER_DROPPED.inc()
+                    continue
+                pending[pkey] = _Write(cache, key, value, ttl, queued)
+            CACHE_WRITER_PENDING.set(len(self))
+            if loop is not None:
+                task = self._tasks.get(loop)
+                if task is None or task.done():
+                    self._tasks[loop] = loop.create_task(self._run_async(loop))
+            else:
+                self._ready.notify()
+                if self._thread is None:
+                    self._thread = threading.Thread(
+                        target=self._run,
+                        name="hiku-cache-writer",
+                        daemon=True,
+                    )
+                    self._thread.start()
+
+    def _take(
+        self, pending: OrderedDict[tuple[int, str], _Write]
+    ) -> list[tuple[BaseCache | AsyncBaseCache, dict[str, Any], int]]:
+        now = time.perf_counter()
+        batches: dict[tuple[int, int], tuple[Any, dict[str, Any], int]] = {}
+        for write in pending.values():
+            CACHE_WRITER_LAG.observe(now - write.queued)
+            batch = batches.get((id(write.cache), write.ttl))
+            if batch is None:
+                batch = batches[(id(write.cache), write.ttl)] = (
+                    write.cache,
+                    {},
+                    write.ttl,
+                )
+            batch[1][write.key] = write.value
+        self._writing += len(pending)
+        pending.clear()
+        CACHE_WRITER_PENDING.set(len(self))
+        return list(batches.values())
+
+    def _done(self, count: int) -> None:
+        with self._lock:
+            self._writing -= count
+            self._idle.notify_all()
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                while not self._pending:
+                    self._ready.wait()
+                batches = self._take(self._pending)
+            for cache, items, ttl in batches:
+                try:
+                    cast(BaseCache, cache).set_many(items, ttl)
+                except Exception:
+                    CACHE_WRITER_ERRORS.inc()
+                    log.exception("Failed to write cache entries")
+                finally:
+                    self._done(len(items))
+
+    async def _run_async(self, loop: asyncio.AbstractEventLoop) -> None:
+        while True:
+            with self._lock:
+                pending = self._pending_async.get(loop)
+                if not pending:
+                    self._pending_async.pop(loop, None)
+                    self._tasks.pop(loop, None)
+                    return
+                batches = self._take(pending)
+            for cache, items, ttl in batches:
+                try:
+                    await cast(AsyncBaseCache, cache).set_many(items, ttl)
+                except Exception:
+                    CACHE_WRITER_ERRORS.inc()
+                    log.exception("Failed to write cache entries")
+                finally:
+                    self._done(len(items))
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Waits until all queued writes to synchronous caches are done,
+        returns ``False`` on timeout
+        """
+        with self._lock:
+            return self._idle.wait_for(
+                lambda: not self._pending and not self._writing, timeout
+            )
+
+    async def flush_async(self) -> None:
+        """Waits until all writes to asynchronous caches, queued in the
+        current event loop, are done
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._lock:
+                task = self._tasks.get(loop)
+            if task is None or task.done():
+                return
+            await asyncio.shield(task)
+
+
+class _Flight(NamedTuple):
+    owner: object
+    future: Future
+    started: float
+
+
+class SingleFlight:
+    """Coalesces concurrent computations of the same ``@cached`` link
+
+    When cached link is missing in cache, first request computes it, and
+    other concurrent requests, which miss the same cache key, wait for its
+    result instead of calling the same resolvers.
+
+    When first request fails, waiting requests are released and compute
+    link themselves, they also do this when result is not ready in
+    ``timeout`` seconds. Computations, which take longer than ``timeout``,
+    are considered abandoned. Timeouts of the synchronous waits are handled
+    by one daemon thread.
+
+    Exposes metrics:
+    - hiku_cache_single_flight_waits
+    - hiku_cache_single_flight_timeouts
+    - hiku_cache_single_flight_failures
+
+    :param timeout: how long to wait for the concurrent computation
+    """
+
+    def __init__(self, timeout: float = 5.0) -> None:
+        self.timeout = timeout
+        self._flights: dict[str, _Flight] = {}
+        self._lock = threading.Lock()
+        self._timeouts: list[tuple[float, int, Callable[[], None]]] = []
+        self._timeouts_seq = itertools.count()
+        self._timer_ready = threading.Condition(self._lock)
+        self._timer: threading.Thread | None = None
+
+    def __len__(self) -> int:
+        return len(self._flights)
+
+    def acquire(
+        self, keys: Iterable[str], owner: object
+    ) -> tuple[list[str], dict[str, Future]]:
+        """Returns keys, which should be computed by the owner, and futures
+        of the keys, which are computed by others
+        """
+        leading = []
+        waiting = {}
+        now = time.monotonic()
+        with self._lock:
+            for key in keys:
+                flight = self._flights.get(key)
+                if flight is not None and flight.owner is owner:
+                    # same link is reached by several paths of the query,
+                    # others may already wait for this flight
+                    leading.append(key)
+                    continue
+                if flight is not None:
+                    if now - flight.started < self.timeout:
+                        waiting[key] = flight.future
+                        continue
+                    # abandoned computation
+                    if not flight.future.done():
+                        flight.future.set_result(None)
+                self._flights[key] = _Flight(owner, Future(), now)
+                leading.append(key)
+        if waiting:
+            SINGLE_FLIGHT_WAITS.inc(len(waiting))
+        return leading, waiting
+
+    def release(self, owner: object, data: Mapping[str, Any]) -> None:
+        """Passes computed data to the waiting requests, ``None`` values
+        mean that data was not computed and waiting requests should compute
+        it themselves
+        """
+        released = []
+        with self._lock:
+            for key, value in data.items():
+                flight = self._flights.get(key)
+                if flight is not None and flight.owner is owner:
+                    del self._flights[key]
+                    released.append((flight.future, value))
+        for future, value in released:
+            if not future.done():
+                future.set_result(value)
+
+    def _collect(self, futures: dict[str, Future]) -> dict[str, Any]:
+        result = {}
+        for key, future in futures.items():
+            if not future.done():
+                SINGLE_FLIGHT_TIMEOUTS.inc()
+                continue
+            value = future.result()
+            if value is None:
+                SINGLE_FLIGHT_FAILURES.inc()
+            else:
+                result[key] = value
+        return result
+
+    def _schedule(self, callback: Callable[[], None]) -> None:
+        """Calls callback in the timer thread after ``timeout`` seconds"""
+        deadline = time.monotonic() + self.timeout
+        with self._lock:
+            heapq.heappush(
+                self._timeouts, (deadline, next(self._timeouts_seq), callback)
+            )
+            self._timer_ready.notify()
+            if self._timer is None:
+                self._timer = threading.Thread(
+                    target=self._run_timer,
+                    name="hiku-single-flight-timer",
+                    daemon=True,
+                )
+                self._timer.start()
+
+    def _run_timer(self) -> None:
+        while True:
+            with self._lock:
+                while True:
+                    if not self._timeouts:
+                        self._timer_ready.wait()
+                        continue
+                    delay = self._timeouts[0][0] - time.monotonic()
+                    if delay <= 0:
+                        break
+                    self._timer_ready.wait(delay)
+                _, _, callback = heapq.heappop(self._timeouts)
+            try:
+                callback()
+            except Exception:
+                log.exception("Failed to expire single flight wait")
+
+    def wait_future(self, futures: dict[str, Future]) -> Future:
+        """Returns future, which is completed with available results, when
+        futures are done or on timeout, waiting doesn't block a thread
+        """
+        result: Future = Future()
+        lock = threading.Lock()
+        pending = [len(futures)]
+
+        # completed waits stay in the timer queue until their deadline,
+        # their callbacks do nothing
+        def complete() -> None:
+            with lock:
+                if result.done():
+                    return
+                result.set_result(self._collect(futures))
+
+        def on_done(_: Future) -> None:
+            with lock:
+                pending[0] -= 1
+                last = not pending[0]
+            if last:
+                complete()
+
+        self._schedule(complete)
+        for future in futures.values():
+            future.add_done_callback(on_done)
+        return result
+
+    def wait(self, futures: dict[str, Future]) -> dict[str, Any]:
+        """Blocks until futures are done or timeout, returns available
+        results
+        """
+        return self.wait_future(futures).result()
+
+    async def wait_async(self, futures: dict[str, Future]) -> dict[str, Any]:
+        await asyncio.wait(
+            [asyncio.wrap_future(f) for f in futures.values()],
+            timeout=self.timeout,
+        )
+        return self._collect(futures)
+
+
 @dataclass(frozen=True, slots=True)
 class CacheMetrics:
     name: str
     hits_counter: Counter = RESULT_CACHE_HITS
     misses_counter: Counter = RESULT_CACHE_MISSES
+    stale_hits_counter: Counter = RESULT_CACHE_STALE_HITS
+    early_refreshes_counter: Counter = RESULT_CACHE_EARLY_REFRESHES
 
 
 @dataclass(frozen=True, slots=True)
 class CacheSettings:
-    cache: BaseCache
+    cache: BaseCache | AsyncBaseCache
     cache_key: CacheKeyFn | None = None
     metrics: CacheMetrics | None = None
+    writer: CacheWriter | None = None
+    single_flight: SingleFlight | None = None
+    early_refresh: float = 0.0
+    """Refresh entries in background before expiration with probability,
+    which grows when expiration is near and when computation of the entry
+    is slow, higher values mean earlier refresh, ``0`` disables it
+    """
+    refresh_executor: Executor | None = None
+    """Executor to run background refreshes with synchronous executors, by
+    default refreshes are run one at a time by a daemon thread
+    """
+    refresh_context: Callable[[Mapping[str, Any]], Mapping[str, Any]] | None = (
+        None
+    )
+    """Returns context for background refresh from the context of the
+    query, which triggered it. Refresh is run after this query is finished
+    and in another thread with synchronous executors, so by default it
+    gets an empty context, refreshed entries are stored under the cache
+    keys of the query, which triggered it
+    """
 
 
 class CacheInfo:
-    __slots__ = ("cache", "cache_key", "metrics", "query_name")
+    __slots__ = (
+        "cache",
+        "cache_key",
+        "metrics",
+        "writer",
+        "single_flight",
+        "early_refresh",
+        "refresh_context",
+        "query_name",
+        "is_async",
+    )
 
     def __init__(
         self, cache_settings: CacheSettings, query_name: str | None = None
     ):
         self.cache = cache_settings.cache
+        self.is_async = isinstance(self.cache, AsyncBaseCache)
         self.cache_key = cache_settings.cache_key
         self.metrics = cache_settings.metrics
+        self.writer = cache_settings.writer
+        self.single_flight = cache_settings.single_flight
+        self.early_refresh = cache_settings.early_refresh
+        self.refresh_context = cache_settings.refresh_context
         self.query_name = query_name or "unknown"
 
     def _track(self, node: str, field: str, hits: int, misses: int) -> None:
@@ -116,17 +757,81 @@ class CacheInfo:
     def get_many(
         self, keys: list[str], node: str, field: str
     ) -> dict[str, Any]:
-        data = self.cache.get_many(keys)
-        hits = sum(1 for key in keys if key in data)
-        misses = len(keys) - hits
-        self._track(node, field, hits, misses)
+        data = cast(BaseCache, self.cache).get_many(keys)
+        self._track_data(keys, data, node, field)
         return data
 
     def set_many(self, items: dict[str, Any], ttl: int) -> None:
-        self.cache.set_many(items, ttl)
+        cast(BaseCache, self.cache).set_many(items, ttl)
+
+    async def get_many_async(
+        self, keys: list[str], node: str, field: str
+    ) -> dict[str, Any]:
+        data = await cast(AsyncBaseCache, self.cache).get_many(keys)
+        self._track_data(keys, data, node, field)
+        return data
+
+    async def set_many_async(self, items: dict[str, Any], ttl: int) -> None:
+        await cast(AsyncBaseCache, self.cache).set_many(items, ttl)
+
+    def split(
+        self,
+        payloads: dict[str, Any],
+        stale: int | None,
+        node: str | None,
+        field: str,
+    ) -> tuple[dict[str, Any], dict[str, Any]]:
+        """Unpacks cache payloads (see :py:meth:`CacheVisitor.process`)
+        into fresh data and data, which should be refreshed, expired
+        entries are omitted
+        """
+        now = time.time()
+        fresh = {}
+        refresh = {}
+        stale_hits = 0
+        early_refreshes = 0
+        for key, payload in payloads.items():
+            expires = payload["expires"]
+            if now >= expires:
+                if stale and now < expires + stale:
+                    refresh[key] = payload["data"]
+                    stale_hits += 1
+            elif self.early_refresh and (
+                # probabilistic early expiration, see "Optimal Probabilistic
+                # Cache Stampede Prevention" by Vattani et al.
+                now
+                - payload["delta"]
+                * self.early_refresh
+                * math.log(1.0 - random.random())
+                >= expires
+            ):
+                refresh[key] = payload["data"]
+                early_refreshes += 1
+            else:
+                fresh[key] = payload["data"]
+
+        if self.metrics and (stale_hits or early_refreshes):
+            labels = (self.metrics.name, self.query_name, node, field)
+            self.metrics.stale_hits_counter.labels(*labels).inc(stale_hits)
+            self.metrics.early_refreshes_counter.labels(*labels).inc(
+                early_refreshes
+            )
+        return fresh, refresh
+
+    def _track_data(
+        self, keys: list[str], data: dict[str, Any], node: str, field: str
+    ) -> None:
+        hits = sum(1 for key in keys if key in data)
+        misses = len(keys) - hits
+        self._track(node, field, hits, misses)
 
 
 class HashVisitor(QueryVisitor):
+    """Feeds index keys of the query fields and links into the hasher,
+    index keys contain canonical representation of the options, see
+    :py:func:`hiku.query.value_key`
+    """
+
     def __init__(self, hasher) -> None:  # type: ignore
         self._hasher = hasher
 
@@ -200,25 +905,44 @@ class CacheVisitor(QueryVisitor):
             self._to_cache[-1][node.name][req] = data
             self._node_idx.pop()
 
+        # links are stored in the index as raw idents
         if graph_obj.type_enum is Many:
-            for r in refs:
-                with _visit_ctx(r.ident):
+            for ident in refs:
+                with _visit_ctx(ident):
                     super().visit_link(link)
         else:
-            if refs is None:
+            if graph_obj.type_enum is Maybe and refs is None:
                 self._node.pop()
                 return
 
-            with _visit_ctx(refs.ident):
+            with _visit_ctx(refs):
                 super().visit_link(link)
 
         self._node.pop()
 
     def process(
-        self, link: QueryLink, ids: list, reqs: list, ctx: "Context"
+        self,
+        link: QueryLink,
+        ids: list,
+        reqs: list,
+        ctx: "Context",
+        delta: float = 0.0,
+        keys: list[str] | None = None,
     ) -> dict:
+        """Returns cache payloads by cache keys, keys are computed from the
+        ``ctx`` unless they are provided, payload contains:
+
+        - ``data`` - parts of the index
+        - ``created`` - unix timestamp of the payload creation
+        - ``expires`` - unix timestamp, when payload should be recomputed,
+          payload is stored in cache longer when ``stale`` window is
+          specified in the ``@cached`` directive
+        - ``delta`` - how long it took to compute data, in seconds
+        """
+        created = time.time()
+        expires = created + link.directives_map["cached"].ttl
         to_cache = {}
-        for i, req in zip(ids, reqs):
+        for n, (i, req) in enumerate(zip(ids, reqs)):
             node = self._node[-1]
             self._node_idx.append(self._index[node.name][i])
             self._data.append({})
@@ -227,8 +951,16 @@ class CacheVisitor(QueryVisitor):
             self.visit(link)
 
             self._to_cache[-1][node.name] = self._data.pop()
-            key = self._cache.query_hash(ctx, link, req)
-            to_cache[key] = dict(self._to_cache.pop())
+            if keys is not None:
+                key = keys[n]
+            else:
+                key = self._cache.query_hash(ctx, link, req)
+            to_cache[key] = {
+                "data": dict(self._to_cache.pop()),
+                "created": created,
+                "expires": expires,
+                "delta": delta,
+            }
             self._node_idx.pop()
 
         return to_cache
@@ -240,9 +972,10 @@ def get_query_hash(
     hash_visitor = HashVisitor(hasher)
     hash_visitor.visit(query_link)
 
+    # builtin hash of strings differs between processes
     if isinstance(req, list):
         for r in req:
-            hasher.update(str(hash(r)).encode("utf-8"))
+            hasher.update(value_key(r).encode("utf-8"))
     else:
-        hasher.update(str(hash(req)).encode("utf-8"))
+        hasher.update(value_key(req).encode("utf-8"))
     hasher.update(CACHE_VERSION.encode("utf-8"))
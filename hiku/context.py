@@ -5,7 +5,7 @@ from graphql.language import ast
 
 from hiku.introspection.graphql import MUTATION_ROOT_NAME, QUERY_ROOT_NAME
 from hiku.result import Proxy
-from hiku.operation import Operation, OperationType
+from hiku.operation import Operation, OperationType, QueryTemplate
 from hiku.extensions.base_validator import QueryValidator
 from hiku.query import Node
 from hiku.graph import Graph, GraphTransformer
@@ -26,8 +26,14 @@ class ExecutionContext:
     query_graph: Graph | None = None
     mutation_graph: Graph | None = None
     operation: Union["Operation", None] = None
+    """Operation template, operation is bound from it"""
+    template: QueryTemplate | None = None
     """Operation name from request's json operationName"""
     request_operation_name: str | None = None
+    """Extensions from request's json extensions"""
+    request_extensions: dict[str, Any] | None = None
+    """Hash of the normalized query text, see ``QueryNormalizer``"""
+    query_hash: str | None = None
     result: Proxy | None = None
     """If errors is list, validation was performed"""
     errors: list[str] | None = None
@@ -0,0 +1,331 @@
+"""
+hiku.denormalize.compiler
+~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Generates specialized Python functions which denormalize result index
+into nested dicts for the particular graph and (merged) query.
+
+All type checks, type lookups and serializers resolution are done once,
+during compilation, so generated code only reads values from the index and
+builds dicts and lists. Result is the same as the result of the
+:py:class:`hiku.denormalize.graphql.DenormalizeGraphQL`.
+"""
+
+import threading
+import typing as t
+from collections import OrderedDict
+from functools import partial
+from itertools import count
+
+from ..graph import FieldType, Graph, Interface, Node as GraphNode, Union
+from ..query import Field, Link, Node
+from ..result import ROOT, Index
+from ..types import (
+    OptionalMeta,
+    RecordMeta,
+    RefMeta,
+    RefMetaTypes,
+    SequenceMeta,
+    get_type,
+)
+from ..utils.serialize import serialize
+
+DenormalizeFunc = t.Callable[[Index], dict]
+
+
+class _Context:
+    """Describes how to read fields of the denormalized object.
+
+    Object is either a row of the node in the index (``node`` is set),
+    or a record value.
+    """
+
+    __slots__ = ("node", "record", "type_name")
+
+    def __init__(
+        self,
+        node: GraphNode | None,
+        record: RecordMeta,
+        type_name: str,
+    ) -> None:
+        self.node = node
+        self.record = record
+        self.type_name = type_name
+
+
+class _Scope:
+    """Local variables of the generated function"""
+
+    __slots__ = ("compiler", "prologue", "tables")
+
+    def __init__(self, compiler: "DenormalizeCompiler") -> None:
+        self.compiler = compiler
+        self.prologue: list[str] = []
+        self.tables: dict[str, str] = {}
+
+    def var(self, value: str) -> str:
+        name = self.compiler._name("v")
+        self.prologue.append("{} = {}".format(name, value))
+        return name
+
+    def table(self, node_name: str) -> str:
+        name = self.tables.get(node_name)
+        if name is None:
+            name = self.tables[node_name] = self.compiler._name("t")
+            self.prologue.append("{} = index.get({!r})".format(name, node_name))
+        return name
+
+
+class DenormalizeCompiler:
+    """Compiles query into a function, which accepts result index and returns
+    denormalized data
+
+    Example:
+
+    .. code-block:: python
+
+        denormalize = DenormalizeCompiler(graph, "Query").compile(query)
+        data = denormalize(result.__idx__)
+
+    :param graph: graph, which is used to execute the query
+    :param root_type_name: name of the root type, e.g. "Query"
+    """
+
+    def __init__(self, graph: Graph, root_type_name: str) -> None:
+        self._graph = graph
+        self._types = graph.__types__
+        self._root_type_name = root_type_name
+        self._counter = count()
+        self._ns: dict[str, t.Any] = {}
+        self._functions: list[str] = []
+        self._dispatchers: list[str] = []
+
+    @classmethod
+    def compile_source(
+        cls, graph: Graph, query: Node, root_type_name: str
+    ) -> str:
+        compiler = cls(graph, root_type_name)
+        compiler._compile(query)
+        return compiler._source()
+
+    def compile(self, query: Node) -> DenormalizeFunc:
+        self._compile(query)
+        code = compile(self._source(), "<denormalize>", "exec")
+        exec(code, self._ns)
+        return self._ns["denormalize"]
+
+    def _compile(self, query: Node) -> None:
+        root = _Context(
+            self._graph.root, self._types["__root__"], self._root_type_name
+        )
+        func = self._object_func(query, root)
+        self._functions.append(
+            "def denormalize(index):\n"
+            "    return {}(index, index[{!r}][{!r}])\n".format(
+                func, ROOT.node, ROOT.ident
+            )
+        )
+
+    def _source(self) -> str:
+        return "\n".join(self._functions + self._dispatchers)
+
+    def _name(self, prefix: str) -> str:
+        return "_{}{}".format(prefix, next(self._counter))
+
+    def _bind(self, prefix: str, value: t.Any) -> str:
+        name = self._name(prefix)
+        self._ns[name] = value
+        return name
+
+    def _object_func(self, node: Node, ctx: _Context) -> str:
+        """Generates function which builds dict from the object"""
+        name = self._name("f")
+        scope = _Scope(self)
+        items: list[str] = []
+
+        fields = list(node.fields)
+        for fr in node.fragments:
+            if ctx.node is not None:
+                node_name = ctx.node.name or ROOT.node
+                if node_name != fr.type_name:
+                    # for unions we must visit only fragments with same type
+                    # as node
+                    continue
+            fields.extend(fr.node.fields)
+
+        for item in fields:
+            if isinstance(item, Field):
+                value = self._field_expr(item, ctx)
+            else:
+                value = self._link_expr(item, ctx, scope)
+            items.append("{!r}: {}".format(item.result_key, value))
+
+        lines = ["def {}(index, o):".format(name)]
+        lines.extend("    {}".format(line) for line in scope.prologue)
+        lines.append("    return {{{}}}".format(", ".join(items)))
+        self._functions.append("\n".join(lines) + "\n")
+        return name
+
+    def _field_expr(self, obj: Field, ctx: _Context) -> str:
+        if obj.name == "__typename":
+            return repr(ctx.type_name)
+
+        if ctx.node is None:
+            # Record type itself does not have custom serialization
+            # if record field is aliased, use index_key as a result-key
+            key = obj.result_key if obj.alias is None else obj.index_key
+            return "o[{!r}]".format(key)
+
+        value = "o[{!r}]".format(obj.index_key)
+        graph_field = ctx.node.fields_map[obj.name]
+        if not graph_field.type_info:
+            return value
+
+        field_type = graph_field.type_info.type_enum
+        type_name = graph_field.type_info.type_name
+        callback: t.Callable[[t.Any], t.Any]
+        if field_type in (FieldType.SCALAR, FieldType.RECORD):
+            return value
+        elif field_type is FieldType.ENUM:
+            callback = self._graph.enums_map[type_name].serialize
+        elif field_type is FieldType.CUSTOM_SCALAR:
+            callback = self._graph.scalars_map[type_name].serialize
+        else:
+            raise TypeError(
+                'Unknown field "{}" type "{!r}"'.format(
+                    graph_field.name, graph_field.type
+                )
+            )
+
+        if isinstance(graph_field.type, (OptionalMeta, SequenceMeta)):
+            callback = partial(serialize, graph_field.type, callback=callback)
+        return "{}({})".format(self._bind("s", callback), value)
+
+    def _link_expr(self, obj: Link, ctx: _Context, scope: _Scope) -> str:
+        type_ = ctx.record.__field_types__[obj.name]
+
+        if ctx.node is not None:
+            value = "o[{!r}]".format(obj.index_key)
+        else:
+            value = "o[{!r}]".format(obj.result_key)
+
+        if isinstance(type_, RefMeta):
+            return self._ref_expr(obj, type_, value)
+        elif isinstance(type_, SequenceMeta):
+            item_type = type_.__item_type__
+            optional = isinstance(item_type, OptionalMeta)
+            if isinstance(item_type, OptionalMeta):
+                item_type = item_type.__type__
+            assert isinstance(item_type, RefMeta), item_type
+            var = self._name("r")
+            expr = self._ref_expr(obj, item_type, var, scope)
+            if optional:
+                expr = "None if {0} is None else {1}".format(var, expr)
+            return "[{} for {} in {}]".format(expr, var, value)
+        elif isinstance(type_, OptionalMeta):
+            assert isinstance(type_.__type__, RefMeta), type_.__type__
+            var = scope.var(value)
+            expr = self._ref_expr(obj, type_.__type__, var)
+            return "None if {} is None else {}".format(var, expr)
+        else:
+            raise AssertionError(repr(type_))
+
+    def _ref_expr(
+        self,
+        obj: Link,
+        type_ref: RefMetaTypes,
+        value: str,
+        scope: _Scope | None = None,
+    ) -> str:
+        """Returns expression which builds dict from the value of the link,
+        if scope is provided, node table lookup is moved out of the loop
+        """
+        type_name = type_ref.__type_name__
+        type_ = get_type(self._types, type_ref)
+
+        if isinstance(type_, (Union, Interface)):
+            func = self._dispatch_func(obj.node, type_)
+            return "{}(index, {})".format(func, value)
+
+        assert isinstance(type_, RecordMeta), type_
+        node = self._graph.nodes_map.get(type_name)
+        func = self._object_func(obj.node, _Context(node, type_, type_name))
+        if node is None:
+            # data type, record value is stored in the index as is
+            return "{}(index, {})".format(func, value)
+
+        if scope is not None:
+            table = scope.table(type_name)
+        else:
+            table = "index[{!r}]".format(type_name)
+        # links to nodes are stored in the index as raw idents
+        return "{}(index, {}[{}])".format(func, table, value)
+
+    def _dispatch_func(self, node: Node, type_: Union | Interface) -> str:
+        """Generates function which builds dict from the reference to the
+        object of one of the union or interface types
+        """
+        if isinstance(type_, Union):
+            type_names = type_.types
+        else:
+            type_names = self._graph.interfaces_types[type_.name]
+
+        funcs = {}
+        for type_name in type_names:
+            ctx = _Context(
+                self._graph.nodes_map[type_name],
+                self._types[type_name],
+                type_name,
+            )
+            funcs[type_name] = self._object_func(node, ctx)
+
+        name = self._name("u")
+        table = self._name("d")
+        self._functions.append(
+            "def {}(index, r):\n"
+            "    return {}[r.node](index, index[r.node][r.ident])\n".format(
+                name, table
+            )
+        )
+        self._dispatchers.append(
+            "{} = {{{}}}\n".format(
+                table,
+                ", ".join("{!r}: {}".format(k, v) for k, v in funcs.items()),
+            )
+        )
+        return name
+
+
+class DenormalizeCache:
+    """Keeps compiled denormalize functions for recently executed queries
+
+    :param size: how many functions to keep
+    """
+
+    def __init__(self, size: int = 128) -> None:
+        self.size = size
+        self._funcs: OrderedDict[tuple[Graph, Node, str], DenormalizeFunc] = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+
+    def get(
+        self, graph: Graph, query: Node, root_type_name: str
+    ) -> DenormalizeFunc:
+        key = (graph, query, root_type_name)
+        try:
+            with self._lock:
+                func = self._funcs.get(key)
+                if func is not None:
+                    self._funcs.move_to_end(key)
+                    return func
+        except TypeError:
+            # query contains unhashable option values
+            return DenormalizeCompiler(graph, root_type_name).compile(query)
+
+        func = DenormalizeCompiler(graph, root_type_name).compile(query)
+        with self._lock:
+            self._funcs[key] = func
+            while len(self._funcs) > self.size:
+                self._funcs.popitem(last=False)
+        return func
@@ -0,0 +1,226 @@
+import asyncio
+import json
+import typing as t
+from collections import deque
+
+from ..enum import BaseEnum
+from ..graph import Graph, Interface, Union
+from ..query import Field, Fragment, Link, Node, QueryVisitor
+from ..result import Proxy
+from ..types import (
+    GenericMeta,
+    OptionalMeta,
+    Record,
+    RecordMeta,
+    RefMeta,
+    SequenceMeta,
+    get_type,
+)
+from .base import serialize_value
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+_encode = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+
+
+class DenormalizeGraphQLJSON(QueryVisitor):
+    """Writes GraphQL response data as UTF-8 encoded JSON directly from the
+    index, without building intermediate dict tree.
+
+    Produces the same document as ``json.dumps`` of
+    :py:class:`hiku.denormalize.graphql.DenormalizeGraphQL` result.
+
+    Example:
+
+    .. code-block:: python
+
+        body = DenormalizeGraphQLJSON(graph, result, "Query").process(query)
+
+    :param graph: graph, which was used to execute the query
+    :param result: result of the query execution
+    :param root_type_name: name of the root type, e.g. "Query"
+    :param chunk_size: approximate size of the chunks produced by
+                       :py:meth:`iter_chunks` and :py:meth:`aiter_chunks`
+    """
+
+    def __init__(
+        self,
+        graph: Graph,
+        result: Proxy,
+        root_type_name: str,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> None:
+        self._graph = graph
+        self._types = graph.__types__
+        self._result = result
+        self._index = result.__idx__
+        self._type: deque[type[Record] | Union | Interface | BaseEnum] = deque(
+            [self._types["__root__"]]
+        )
+        self._type_name = deque([root_type_name])
+        self._data = deque([result])
+        self._chunk_size = chunk_size
+        self._buffer: list[str] = []
+        self._size = 0
+        # keys written into the currently open objects
+        self._keys: list[set[str]] = []
+        self._encoded_keys: dict[str, str] = {}
+
+    def process(self, query: Node) -> bytes:
+        return b"".join(self.iter_chunks(query))
+
+    def iter_chunks(self, query: Node) -> t.Iterator[bytes]:
+        assert not self._keys, self._keys
+        yield from self._object(query)
+        if self._buffer:
+            yield self._take()
+
+    async def aiter_chunks(self, query: Node) -> t.AsyncIterator[bytes]:
+        """Same as :py:meth:`iter_chunks`, but gives control back to the
+        event loop after every chunk
+        """
+        for chunk in self.iter_chunks(query):
+            yield chunk
+            await asyncio.sleep(0)
+
+    def _take(self) -> bytes:
+        chunk = "".join(self._buffer).encode("utf-8")
+        self._buffer.clear()
+        self._size = 0
+        return chunk
+
+    def _write(self, value: str) -> None:
+        self._buffer.append(value)
+        self._size += len(value)
+
+    def _flush(self) -> t.Iterator[bytes]:
+        if self._size >= self._chunk_size:
+            yield self._take()
+
+    def _member(self, key: str) -> bool:
+        """Writes object key, returns False if the key was already written,
+        the same way as repeated assignment of the same key in a dict
+        """
+        keys = self._keys[-1]
+        if key in keys:
+            return False
+        try:
+            encoded = self._encoded_keys[key]
+        except KeyError:
+            encoded = self._encoded_keys[key] = _encode(key) + ":"
+        if keys:
+            self._write("," + encoded)
+        else:
+            self._write(encoded)
+        keys.add(key)
+        return True
+
+    def _object(self, node: Node) -> t.Iterator[bytes]:
+        self._write("{")
+        self._keys.append(set())
+        yield from self.visit(node)
+        self._keys.pop()
+        self._write("}")
+
+    def visit_node(self, obj: Node) -> t.Iterator[bytes]:
+        for item in obj.fields:
+            yield from self.visit(item)
+
+        for i, fr in enumerate(obj.fragments):
+            yield from self.visit_fragment(fr, i)
+
+    def visit_fragment(  # type: ignore[override]
+        self, obj: Fragment, idx: int
+    ) -> t.Iterator[bytes]:
+        data = self._data[-1]
+        if isinstance(data, Proxy):
+            if data.__ref__.node != obj.type_name:
+                # for unions we must visit only fragments with same type as node
+                return
+            node = data.__node__.fragments[idx].node
+            self._data.append(Proxy(self._index, data.__ref__, node))
+        else:
+            self._data.append(data)
+        for item in obj.node.fields:
+            yield from self.visit(item)
+        self._data.pop()
+
+    def visit_field(self, obj: Field) -> t.Iterator[bytes]:
+        if not self._member(obj.result_key):
+            return
+
+        data = self._data[-1]
+        value: t.Any
+        if obj.name == "__typename":
+            value = self._type_name[-1]
+            if isinstance(self._type[-1], (Union, Interface)):
+                value = data.__ref__.node
+        elif isinstance(data, Proxy):
+            type_name = data.__ref__.node
+            if type_name == "__root__":
+                node = self._graph.root
+            else:
+                node = self._graph.nodes_map[type_name]
+            value = serialize_value(
+                self._graph, node.fields_map[obj.name], data[obj.result_key]
+            )
+        else:
+            # if record field is aliased, use index_key as a result-key
+            result_key = obj.result_key if obj.alias is None else obj.index_key
+            value = data[result_key]
+
+        self._write(_encode(value))
+        yield from self._flush()
+
+    def visit_link(self, obj: Link) -> t.Iterator[bytes]:
+        if not self._member(obj.result_key):
+            return
+
+        if isinstance(self._type[-1], (Union, Interface)):
+            type_ = self._types[self._data[-1].__ref__.node].__field_types__[
+                obj.name
+            ]
+        elif isinstance(self._type[-1], RecordMeta):
+            type_ = self._type[-1].__field_types__[obj.name]
+        else:
+            raise AssertionError(repr(self._type[-1]))
+
+        type_ref: GenericMeta
+        if isinstance(type_, RefMeta):
+            type_ref = type_
+        elif isinstance(type_, (SequenceMeta, OptionalMeta)):
+            type_ref = (
+                type_.__item_type__
+                if isinstance(type_, SequenceMeta)
+                else type_.__type__
+            )
+            if isinstance(type_ref, OptionalMeta):
+                type_ref = type_ref.__type__
+            assert isinstance(type_ref, RefMeta), type_ref
+        else:
+            raise AssertionError(repr(type_))
+
+        value = self._data[-1][obj.result_key]
+        self._type.append(get_type(self._types, type_ref))
+        self._type_name.append(type_ref.__type_name__)
+        if isinstance(type_, SequenceMeta):
+            self._write("[")
+            for i, item in enumerate(value):
+                if i:
+                    self._write(",")
+                if item is None:
+                    self._write("null")
+                    continue
+                self._data.append(item)
+                yield from self._object(obj.node)
+                self._data.pop()
+            self._write("]")
+        elif value is None:
+            self._write("null")
+        else:
+            self._data.append(value)
+            yield from self._object(obj.node)
+            self._data.pop()
+        self._type_name.pop()
+        self._type.pop()
+        yield from self._flush()
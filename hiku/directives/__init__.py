@@ -177,6 +177,13 @@ class Cached(Directive):
     ttl: int = directive_field(
         description="How long field will live in cache.",
     )
+    stale: int | None = directive_field(
+        description=(
+            "How long expired field can be served from cache, "
+            "while it is refreshed in background."
+        ),
+        default_value=None,
+    )
 
 
 # Internal directive
@@ -1,7 +1,8 @@
-from typing import Any, overload, TypedDict
+from typing import Any, cast, overload, TypedDict
 
 from abc import ABC
 from asyncio import gather
+import json
 from collections.abc import Mapping
 
 from hiku.error import GraphQLError
@@ -16,6 +17,7 @@ class GraphQLRequest(TypedDict, total=False):
     query: str
     variables: dict[str, Any] | None
     operationName: str | None
+    extensions: dict[str, Any] | None
 
 
 class GraphQLResponse(TypedDict, total=False):
@@ -31,8 +33,30 @@ SingleOrBatchedRequest = GraphQLRequest | BatchedRequest
 SingleOrBatchedResponse = GraphQLResponse | BatchedResponse
 
 
+def _encode_batch(items: list[bytes]) -> bytes:
+    return b"[" + b",".join(items) + b"]"
+
+
+def _check_request(data: GraphQLRequest) -> None:
+    if not isinstance(data, Mapping):
+        raise GraphQLError("Invalid body, query is required")
+    if "query" in data:
+        return
+    # query text can be omitted when persisted query hash is sent
+    extensions = data.get("extensions")
+    if not (isinstance(extensions, Mapping) and "persistedQuery" in extensions):
+        raise GraphQLError("Invalid body, query is required")
+
+
 class BaseGraphQLEndpoint(ABC):
-    """TODO: add doc explaining the purpose of this class over plain schema"""
+    """TODO: add doc explaining the purpose of this class over plain schema
+
+    :param schema: schema to execute queries with
+    :param batching: allow batched requests
+    :param encode: return response body encoded as JSON (:py:class:`bytes`)
+                   instead of dict, data is written directly from the
+                   result index without building intermediate dicts
+    """
 
     schema: Schema
 
@@ -40,9 +64,11 @@ class BaseGraphQLEndpoint(ABC):
         self,
         schema: Schema,
         batching: bool = False,
+        encode: bool = False,
     ):
         self.schema = schema
         self.batching = batching
+        self.encode = encode
 
     def process_result(self, result: ExecutionResult) -> GraphQLResponse:
         data: GraphQLResponse = {"data": result.data}
@@ -52,11 +78,21 @@ class BaseGraphQLEndpoint(ABC):
 
         return data
 
+    def encode_result(self, result: ExecutionResult) -> bytes:
+        if result.data_json is None:
+            return json.dumps(self.process_result(result)).encode("utf-8")
+
+        body = b'{"data":' + result.data_json
+        if result.errors:
+            errors = [{"message": e.message} for e in result.errors]
+            body += b',"errors":' + json.dumps(errors).encode("utf-8")
+        return body + b"}"
+
 
 class BaseSyncGraphQLEndpoint(BaseGraphQLEndpoint):
     def dispatch(
         self, data: GraphQLRequest, context: dict[str, Any] | None = None
-    ) -> GraphQLResponse:
+    ) -> GraphQLResponse | bytes:
         """
         Dispatch graphql request to graph
 
@@ -67,26 +103,32 @@ class BaseSyncGraphQLEndpoint(BaseGraphQLEndpoint):
             result = endpoint.dispatch({"query": "{ hello }"})
 
         :param dict data:
-            {"query": str, "variables": dict, "operationName": str}
+            {"query": str, "variables": dict, "operationName": str,
+             "extensions": dict}
         :param dict context: context for operation
-        :return: :py:class:`dict` graphql response: data or errors
+        :return: :py:class:`dict` graphql response: data or errors,
+                 or :py:class:`bytes` with encoded response if endpoint
+                 was created with ``encode=True``
         """
-        if not (isinstance(data, Mapping) and "query" in data):
-            raise GraphQLError("Invalid body, query is required")
+        _check_request(data)
 
         result = self.schema.execute_sync(
-            query=data["query"],
+            query=data.get("query", ""),
             variables=data.get("variables"),
             operation_name=data.get("operationName"),
             context=context,
+            encode=self.encode,
+            extensions=data.get("extensions"),
         )
+        if self.encode:
+            return self.encode_result(result)
         return self.process_result(result)
 
 
 class BaseAsyncGraphQLEndpoint(BaseGraphQLEndpoint):
     async def dispatch(
         self, data: GraphQLRequest, context: dict[str, Any] | None = None
-    ) -> GraphQLResponse:
+    ) -> GraphQLResponse | bytes:
         """Dispatch graphql request to graph
 
         Example:
@@ -96,19 +138,25 @@ class BaseAsyncGraphQLEndpoint(BaseGraphQLEndpoint):
             result = await endpoint.dispatch({"query": "{ hello }"})
 
         :param dict data:
-            {"query": str, "variables": dict, "operationName": str}
+            {"query": str, "variables": dict, "operationName": str,
+             "extensions": dict}
         :param dict context: context for operation
-        :return: :py:class:`dict` graphql response: data or errors
+        :return: :py:class:`dict` graphql response: data or errors,
+                 or :py:class:`bytes` with encoded response if endpoint
+                 was created with ``encode=True``
         """
-        if not (isinstance(data, Mapping) and "query" in data):
-            raise GraphQLError("Invalid body, query is required")
+        _check_request(data)
 
         result = await self.schema.execute(
-            query=data["query"],
+            query=data.get("query", ""),
             variables=data.get("variables"),
             operation_name=data.get("operationName"),
             context=context,
+            encode=self.encode,
+            extensions=data.get("extensions"),
         )
+        if self.encode:
+            return self.encode_result(result)
         return self.process_result(result)
 
 
@@ -127,15 +175,18 @@ class GraphQLEndpoint(BaseSyncGraphQLEndpoint):
         self,
         data: SingleOrBatchedRequest,
         context: dict[str, Any] | None = None,
-    ) -> SingleOrBatchedResponse:
+    ) -> SingleOrBatchedResponse | bytes:
         if isinstance(data, list):
             if not self.batching:
                 raise GraphQLError("Batching is not supported")
 
-            return [
+            results = [
                 super(GraphQLEndpoint, self).dispatch(item, context)
                 for item in data
             ]
+            if self.encode:
+                return _encode_batch(cast(list[bytes], results))
+            return cast(BatchedResponse, results)
         else:
             return super(GraphQLEndpoint, self).dispatch(data, context)
 
@@ -163,9 +214,9 @@ class AsyncGraphQLEndpoint(BaseAsyncGraphQLEndpoint):
         self,
         data: SingleOrBatchedRequest,
         context: dict[str, Any] | None = None,
-    ) -> SingleOrBatchedResponse:
+    ) -> SingleOrBatchedResponse | bytes:
         if isinstance(data, list):
-            return list(
+            results = list(
                 await gather(
                     *(
                         super(AsyncGraphQLEndpoint, self).dispatch(
@@ -175,6 +226,9 @@ class AsyncGraphQLEndpoint(BaseAsyncGraphQLEndpoint):
                     )
                 )
             )
+            if self.encode:
+                return _encode_batch(cast(list[bytes], results))
+            return cast(BatchedResponse, results)
         else:
             return await super(AsyncGraphQLEndpoint, self).dispatch(
                 data, context
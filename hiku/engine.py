@@ -1,9 +1,15 @@
+import asyncio
 import contextlib
 import dataclasses
 import inspect
+import logging
+import threading
+import time
 import warnings
-from collections import defaultdict
-from collections.abc import Hashable, Mapping, Sequence
+from collections import OrderedDict, defaultdict, deque
+from collections.abc import Hashable, Iterable, Mapping, Sequence
+from concurrent.futures import Executor as ConcurrentExecutor
+from concurrent.futures import Future
 from functools import partial
 from itertools import chain, repeat
 from typing import (
@@ -16,20 +22,20 @@ from typing import (
     overload,
 )
 
-from hiku.types import OptionalMeta
+from prometheus_client import Counter
 
-from .cache import CacheInfo, CacheSettings, CacheVisitor
+from .cache import AsyncBaseCache, CacheInfo, CacheSettings, CacheVisitor
 from .compat import ParamSpec
 from .context import ExecutionContext
 from .executors.base import (
     BaseAsyncExecutor,
+    BaseExecutor,
     BaseSyncExecutor,
     SyncAsyncExecutor,
 )
 from .executors.queue import Queue, SubmitRes, TaskSet, Workflow
 from .graph import (
     Field,
-    FieldType,
     Graph,
     Link,
     LinkType,
@@ -39,77 +45,33 @@ from .graph import (
     Node,
     Nothing,
     One,
+    Resolver,
 )
 from .query import Field as QueryField
 from .query import Fragment, QueryTransformer, QueryVisitor
 from .query import Link as QueryLink
 from .query import Node as QueryNode
 from .result import ROOT, Index, Proxy, Reference
-from .utils import ImmutableDict
-from .utils.serialize import serialize
+from .utils import Const, ImmutableDict
 
 NodePath = tuple[str | None, ...]
 
+SKIPPED_IDS = Counter(
+    name="hiku_engine_skipped_ids",
+    documentation="Ids skipped by the engine before calling resolvers",
+    labelnames=["node", "reason"],
+)
+CACHE_REFRESH_ERRORS = Counter(
+    name="hiku_result_cache_refresh_errors",
+    documentation="Failed background refreshes of the cached links",
+)
+CACHE_REFRESH_DROPPED = Counter(
+    name="hiku_result_cache_refresh_dropped",
+    documentation="Background refreshes of the cached links dropped "
+    "because too many refreshes are waiting",
+)
 
-def _yield_options(
-    graph: Graph,
-    graph_obj: Link | Field,
-    query_obj: QueryField | QueryLink,
-) -> Iterator[tuple[str, Any]]:
-    options = query_obj.options or {}
-    for option in graph_obj.options:
-        value = options.get(option.name, option.default)
-        optional = isinstance(option.type, OptionalMeta)
-        if value is Nothing and not optional:
-            raise TypeError(
-                'Required option "{}" for {!r} was not provided'.format(
-                    option.name, graph_obj
-                )
-            )
-        elif option.type_info and option.type_info.type_enum is FieldType.ENUM:
-            enum = graph.enums_map[option.type_info.type_name]
-            yield option.name, serialize(option.type, value, enum.parse)
-        elif (
-            option.type_info
-            and option.type_info.type_enum is FieldType.CUSTOM_SCALAR
-        ):
-            scalar = graph.scalars_map[option.type_info.type_name]
-            yield option.name, serialize(option.type, value, scalar.parse)
-        elif (
-            option.type_info
-            and option.type_info.type_enum is FieldType.SCALAR
-            and option.type
-        ):
-            yield option.name, option.type.parse(value)
-        elif (
-            option.type_info
-            and option.type_info.type_enum is FieldType.INPUT
-            and option.type
-        ):
-            if value is Nothing and optional:
-                # if value not provided for optional option, do not add it
-                # to the options dict to notify value absence
-                continue
-
-            if value is None and optional:
-                # if value is None for optional option, return it as None
-                yield option.name, None
-            else:
-                input_type = graph.inputs_map[option.type_info.type_name]
-                for arg in input_type.arguments:
-                    if arg.name not in value and arg.default is not Nothing:
-                        value[arg.name] = arg.default
-                yield option.name, value
-        else:
-            yield option.name, value
-
-
-def _get_options(
-    graph: Graph,
-    graph_obj: Link | Field,
-    query_obj: QueryField | QueryLink,
-) -> dict:
-    return dict(_yield_options(graph, graph_obj, query_obj))
+log = logging.getLogger(__name__)
 
 
 class InitOptions(QueryTransformer):
@@ -171,9 +133,9 @@ class InitOptions(QueryTransformer):
         )
 
     def visit_field(self, obj: QueryField) -> QueryField:
-        graph_obj = self._path[-1].fields_map[obj.name]
-        if graph_obj.options:
-            return obj.copy(options=_get_options(self._graph, graph_obj, obj))
+        resolver = self._path[-1].resolvers[obj.name]
+        if resolver.options:
+            return obj.copy(options=resolver.parse_options(obj.options))
         else:
             return obj
 
@@ -184,7 +146,8 @@ class InitOptions(QueryTransformer):
         return obj.copy(node=node)
 
     def visit_link(self, obj: QueryLink) -> QueryLink:
-        graph_obj = self._path[-1].fields_map[obj.name]
+        resolver = self._path[-1].resolvers[obj.name]
+        graph_obj = resolver.obj
 
         if isinstance(graph_obj, Link):
             if graph_obj.type_info.type_enum is LinkType.UNION:
@@ -202,9 +165,7 @@ class InitOptions(QueryTransformer):
             node = obj.node
 
         options = (
-            _get_options(self._graph, graph_obj, obj)
-            if graph_obj.options
-            else None
+            resolver.parse_options(obj.options) if resolver.options else None
         )
         if options is None and node is obj.node:
             return obj
@@ -223,6 +184,30 @@ class LinkInfo:
     query_link: QueryLink
 
 
+class FieldsBatch:
+    """Fields of the same node and the same resolver, requested from
+    different paths during one scheduling tick.
+
+    Resolver is called once with deduplicated ids of all the paths.
+    """
+
+    __slots__ = ("node", "resolver", "fields_info", "task_set", "ids", "proc")
+
+    def __init__(
+        self,
+        node: Node,
+        resolver: Resolver,
+        fields_info: list[FieldInfo],
+        task_set: TaskSet,
+    ) -> None:
+        self.node = node
+        self.resolver = resolver
+        self.fields_info = fields_info
+        self.task_set = task_set
+        self.ids: dict[Any, None] = {}
+        self.proc: Callable[[], Any] | None = None
+
+
 class SplitQuery(QueryVisitor):
     """Splits query into two groups: fields and links.
     This is needed because we execute fields and links separately.
@@ -230,12 +215,12 @@ class SplitQuery(QueryVisitor):
 
     def __init__(self, graph_node: Node) -> None:
         self._node = graph_node
-        self._fields: list[tuple[Callable, FieldInfo]] = []
+        self._fields: list[tuple[Resolver, FieldInfo]] = []
         self._links: list[LinkInfo] = []
 
     def split(
         self, query_node: QueryNode
-    ) -> tuple[list[tuple[Callable, FieldInfo]], list[LinkInfo]]:
+    ) -> tuple[list[tuple[Resolver, FieldInfo]], list[LinkInfo]]:
         for item in query_node.fields:
             self.visit(item)
 
@@ -258,68 +243,184 @@ class SplitQuery(QueryVisitor):
         if obj.name == "__typename":
             return
 
-        graph_obj = self._node.fields_map[obj.name]
-        func = getattr(graph_obj.func, "__subquery__", graph_obj.func)
-        self._fields.append((func, FieldInfo(graph_obj, obj)))
+        resolver = self._node.resolvers[obj.name]
+        self._fields.append((resolver, FieldInfo(resolver.obj, obj)))
 
     def visit_link(self, obj: QueryLink) -> None:
-        graph_obj = self._node.fields_map[obj.name]
+        resolver = self._node.resolvers[obj.name]
+        graph_obj = resolver.obj
         if isinstance(graph_obj, Link):
-            if graph_obj.requires:
-                if isinstance(graph_obj.requires, list):
-                    for r in graph_obj.requires:
-                        self.visit(QueryField(r))
-                else:
-                    self.visit(QueryField(graph_obj.requires))
+            for r in resolver.requires:
+                self.visit(QueryField(r))
             self._links.append(LinkInfo(graph_link=graph_obj, query_link=obj))
         else:
             assert isinstance(graph_obj, Field), type(graph_obj)
             # `obj` here is a link, but this link is treated as a complex field
-            func = getattr(graph_obj.func, "__subquery__", graph_obj.func)
-            self._fields.append((func, FieldInfo(graph_obj, obj)))
+            self._fields.append((resolver, FieldInfo(graph_obj, obj)))
 
 
 class GroupQuery(QueryVisitor):
     def __init__(self, node: Node) -> None:
         self._node = node
-        self._funcs: list[Callable] = []
+        self._resolvers: list[Resolver] = []
         self._groups: list[list[FieldInfo] | LinkInfo] = []
-        self._current_func = None
+        self._current_func: Callable | None = None
 
     def group(
         self, node: QueryNode
-    ) -> list[tuple[Callable, list[FieldInfo] | LinkInfo]]:
+    ) -> list[tuple[Resolver, list[FieldInfo] | LinkInfo]]:
         for item in node.fields:
             self.visit(item)
-        return list(zip(self._funcs, self._groups))
+        return list(zip(self._resolvers, self._groups))
 
     def visit_node(self, obj: QueryNode) -> NoReturn:
         raise ValueError("Unexpected value: {!r}".format(obj))
 
     def visit_field(self, obj: QueryField) -> None:
-        graph_obj = self._node.fields_map[obj.name]
-        func = getattr(graph_obj.func, "__subquery__", graph_obj.func)
-        if func == self._current_func:
+        resolver = self._node.resolvers[obj.name]
+        if resolver.func == self._current_func:
             assert isinstance(self._groups[-1], list)
-            self._groups[-1].append(FieldInfo(graph_obj, obj))
+            self._groups[-1].append(FieldInfo(resolver.obj, obj))
         else:
-            self._groups.append([FieldInfo(graph_obj, obj)])
-            self._funcs.append(func)
-            self._current_func = func
+            self._groups.append([FieldInfo(resolver.obj, obj)])
+            self._resolvers.append(resolver)
+            self._current_func = resolver.func
 
     def visit_link(self, obj: QueryLink) -> None:
-        graph_obj = self._node.fields_map[obj.name]
-        if graph_obj.requires:
-            if isinstance(graph_obj.requires, list):
-                for r in graph_obj.requires:
-                    self.visit(QueryField(r))
-            else:
-                self.visit(QueryField(graph_obj.requires))
-        self._groups.append(LinkInfo(graph_obj, obj))
-        self._funcs.append(graph_obj.func)
+        resolver = self._node.resolvers[obj.name]
+        for r in resolver.requires:
+            self.visit(QueryField(r))
+        self._groups.append(LinkInfo(resolver.obj, obj))
+        self._resolvers.append(resolver)
         self._current_func = None
 
 
+def _link_deps(
+    resolver: Resolver, to_func: dict[str, Callable]
+) -> tuple[Callable, ...]:
+    return tuple(to_func[r] for r in resolver.requires)
+
+
+class NodePlan:
+    """Precomputed execution steps for a pair of graph node and query node.
+
+    For unordered nodes ``fields`` contains field groups (one group per
+    field resolver) and ``links`` contains links together with field
+    resolvers which must be completed before the link can be scheduled.
+
+    For ordered nodes ``steps`` contains sequential steps to execute.
+    """
+
+    __slots__ = ("query", "ordered", "fields", "links", "steps")
+
+    def __init__(self, node: Node, query: QueryNode) -> None:
+        self.query = query
+        self.ordered = query.ordered
+        self.fields: list[tuple[Resolver, list[FieldInfo]]] = []
+        self.links: list[tuple[LinkInfo, tuple[Callable, ...]]] = []
+        self.steps: list[tuple[Resolver, list[FieldInfo] | LinkInfo]] = []
+
+        if self.ordered:
+            self.steps = GroupQuery(node).group(query)
+            return
+
+        fields, links = SplitQuery(node).split(query)
+
+        to_func: dict[str, Callable] = {}
+        from_func: dict[Callable, tuple[Resolver, list[FieldInfo]]] = {}
+        for resolver, field_info in fields:
+            to_func[field_info.graph_field.name] = resolver.func
+            if resolver.func in from_func:
+                from_func[resolver.func][1].append(field_info)
+            else:
+                from_func[resolver.func] = (resolver, [field_info])
+
+        self.fields = list(from_func.values())
+        self.links = [
+            (
+                link_info,
+                _link_deps(node.resolvers[link_info.graph_link.name], to_func),
+            )
+            for link_info in links
+        ]
+
+
+def _query_items(query: QueryNode) -> Iterator[QueryField | QueryLink]:
+    yield from query.fields
+    for fr in query.fragments:
+        yield from _query_items(fr.node)
+
+
+def collect_link_targets(
+    graph: Graph, query: QueryNode
+) -> dict[tuple[str, str], tuple[str, Const]]:
+    """Collects target nodes and types of the links, which values are stored
+    in the index as raw idents (all links except unions and interfaces),
+    keyed by the node name and the link's index key
+    """
+    targets: dict[tuple[str, str], tuple[str, Const]] = {}
+
+    def visit(node: Node, query_node: QueryNode) -> None:
+        node_name = node.name or ROOT.node
+        for item in _query_items(query_node):
+            if not isinstance(item, QueryLink):
+                continue
+            graph_obj = node.fields_map.get(item.name)
+            if not isinstance(graph_obj, Link):
+                continue
+
+            if graph_obj.type_info.type_enum is LinkType.UNION:
+                names = graph.unions_map[graph_obj.node].types
+            elif graph_obj.type_info.type_enum is LinkType.INTERFACE:
+                names = graph.interfaces_types[graph_obj.node]
+            else:
+                targets[(node_name, item.index_key)] = (
+                    graph_obj.node,
+                    graph_obj.type_enum,
+                )
+                names = [graph_obj.node]
+
+            for name in names:
+                visit(graph.nodes_map[name], item.node)
+
+    visit(graph.root, query)
+    return targets
+
+
+class ExecutionPlan:
+    """Compiled execution plan of the query.
+
+    Holds a query with initialized options and lazily computed
+    :py:class:`NodePlan` for every pair of graph node and query node,
+    visited during execution. Plan does not depend on the execution context,
+    so it can be reused to execute the same query many times.
+    """
+
+    __slots__ = ("query", "_nodes", "_link_targets")
+
+    def __init__(self, query: QueryNode) -> None:
+        self.query = query
+        self._nodes: dict[tuple[str | None, int], NodePlan] = {}
+        self._link_targets: dict[tuple[str, str], tuple[str, Const]] | None = (
+            None
+        )
+
+    def link_targets(
+        self, graph: Graph
+    ) -> dict[tuple[str, str], tuple[str, Const]]:
+        """See :py:func:`collect_link_targets`"""
+        if self._link_targets is None:
+            self._link_targets = collect_link_targets(graph, self.query)
+        return self._link_targets
+
+    def node_plan(self, node: Node, query: QueryNode) -> NodePlan:
+        key = (node.name, id(query))
+        node_plan = self._nodes.get(key)
+        if node_plan is None or node_plan.query is not query:
+            node_plan = self._nodes[key] = NodePlan(node, query)
+        return node_plan
+
+
 def _check_store_fields(
     node: Node,
     fields: list[QueryField | QueryLink],
@@ -401,9 +502,7 @@ def store_fields(
     names = [f.index_key for f in query_fields]
     if node.name is not None:
         assert ids is not None
-        node_idx = index[node.name]
-        for i, row in zip(ids, query_result):
-            node_idx[i].update(zip(names, row))
+        index.store_rows(node.name, ids, names, query_result)
     else:
         assert ids is None
         index.root.update(zip(names, query_result))
@@ -437,44 +536,42 @@ def link_reqs(
         return index.root[link.requires]
 
 
-def link_ref_maybe(graph_link: Link, ident: Any) -> Reference | None:
+def _polymorphic(graph_link: Link) -> bool:
+    return graph_link.type_info.type_enum in (
+        LinkType.UNION,
+        LinkType.INTERFACE,
+    )
+
+
+def link_ref_maybe(graph_link: Link, ident: Any) -> Any:
     if ident is Nothing:
         return None
-    else:
-        if graph_link.type_info.type_enum in (
-            LinkType.UNION,
-            LinkType.INTERFACE,
-        ):
-            return Reference(ident[1].__type_name__, ident[0])
-        return Reference(graph_link.node, ident)
+    elif _polymorphic(graph_link):
+        return Reference(ident[1].__type_name__, ident[0])
+    return ident
 
 
-def link_ref_one(graph_link: Link, ident: Any) -> Reference:
+def link_ref_one(graph_link: Link, ident: Any) -> Any:
     assert ident is not Nothing
 
-    if graph_link.type_info.type_enum in (LinkType.UNION, LinkType.INTERFACE):
+    if _polymorphic(graph_link):
         return Reference(ident[1].__type_name__, ident[0])
-    return Reference(graph_link.node, ident)
+    return ident
 
 
-def link_ref_many(graph_link: Link, idents: list) -> list[Reference]:
-    if graph_link.type_info.type_enum in (LinkType.UNION, LinkType.INTERFACE):
+def link_ref_many(graph_link: Link, idents: list) -> list:
+    if _polymorphic(graph_link):
         return [Reference(i[1].__type_name__, i[0]) for i in idents]
-    return [Reference(graph_link.node, i) for i in idents]
+    return list(idents)
 
 
-def link_ref_maybe_many(
-    graph_link: Link, idents: list
-) -> list[Reference | None]:
-    if graph_link.type_info.type_enum in (LinkType.UNION, LinkType.INTERFACE):
+def link_ref_maybe_many(graph_link: Link, idents: list) -> list:
+    if _polymorphic(graph_link):
         return [
             Reference(i[1].__type_name__, i[0]) if i is not Nothing else None
             for i in idents
         ]
-    return [
-        Reference(graph_link.node, i) if i is not Nothing else None
-        for i in idents
-    ]
+    return [i if i is not Nothing else None for i in idents]
 
 
 _LINK_REF_MAKER: dict[Any, Callable] = {
@@ -591,14 +688,24 @@ def store_links(
     _check_store_links(node, graph_link, ids, query_result)
 
     field_val: Callable = _LINK_REF_MAKER[graph_link.type_enum]
+    if not _polymorphic(graph_link):
+        node_name = node.name or ROOT.node
+        index.targets[(node_name, query_link.index_key)] = (
+            graph_link.node,
+            graph_link.type_enum,
+        )
+
     if node.name is not None:
         assert ids is not None
         if graph_link.requires is None:
             query_result = repeat(query_result, len(ids))
 
-        node_idx = index[node.name]
-        for i, res in zip(ids, query_result):
-            node_idx[i][query_link.index_key] = field_val(graph_link, res)
+        index.store_column(
+            node.name,
+            ids,
+            query_link.index_key,
+            [field_val(graph_link, res) for res in query_result],
+        )
     else:
         index.root[query_link.index_key] = field_val(graph_link, query_result)
 
@@ -636,6 +743,112 @@ def link_result_to_ids(
 Dep = SubmitRes | TaskSet
 
 
+def _exceeds(max_batch_size: int | None, ids: list) -> bool:
+    return max_batch_size is not None and len(ids) > max_batch_size
+
+
+def _chunks(ids: list, max_batch_size: int | None) -> list[list]:
+    if not _exceeds(max_batch_size, ids):
+        return [ids]
+    assert max_batch_size is not None
+    return [
+        ids[i : i + max_batch_size] for i in range(0, len(ids), max_batch_size)
+    ]
+
+
+class _Refresher:
+    """Runs background refreshes of the cached links, same cache key is
+    refreshed only once at a time
+
+    With synchronous executors refreshes are run one at a time by a daemon
+    thread, when too many refreshes are waiting, new ones are dropped.
+    Refreshes can also be run by provided executor.
+
+    :param refresh_executor: executor to run refreshes with synchronous
+                             executors
+    :param maxsize: max number of refreshes waiting for the daemon thread
+    """
+
+    def __init__(
+        self,
+        executor: BaseExecutor,
+        refresh_executor: ConcurrentExecutor | None = None,
+        maxsize: int = 100,
+    ) -> None:
+        self._executor = executor
+        self._refresh_executor = refresh_executor
+        self.maxsize = maxsize
+        self._keys: set[str] = set()
+        self._lock = threading.Lock()
+        self._ready = threading.Condition(self._lock)
+        self._pending: deque[tuple[Queue, "Query", set[str]]] = deque()
+        self._thread: threading.Thread | None = None
+        self._tasks: set[asyncio.Task] = set()
+
+    def acquire(self, keys: Iterable[str]) -> set[str]:
+        with self._lock:
+            acquired = {key for key in keys if key not in self._keys}
+            self._keys.update(acquired)
+        return acquired
+
+    def _release(self, keys: set[str]) -> None:
+        with self._lock:
+            self._keys.difference_update(keys)
+
+    def run(self, queue: Queue, workflow: "Query", keys: set[str]) -> None:
+        if isinstance(self._executor, BaseAsyncExecutor):
+            task = asyncio.get_running_loop().create_task(
+                self._run_async(queue, workflow, keys)
+            )
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        elif self._refresh_executor is not None:
+            self._refresh_executor.submit(self._run, queue, workflow, keys)
+        else:
+            with self._lock:
+                if len(self._pending) >= self.maxsize:
+                    CACHE_REFRESH_DROPPED.inc()
+                    self._keys.difference_update(keys)
+                    return
+                self._pending.append((queue, workflow, keys))
+                self._ready.notify()
+                if self._thread is None:
+                    self._thread = threading.Thread(
+                        target=self._worker,
+                        name="hiku-cache-refresh",
+                        daemon=True,
+                    )
+                    self._thread.start()
+
+    def _worker(self) -> None:
+        while True:
+            with self._lock:
+                while not self._pending:
+                    self._ready.wait()
+                queue, workflow, keys = self._pending.popleft()
+            self._run(queue, workflow, keys)
+
+    def _run(self, queue: Queue, workflow: "Query", keys: set[str]) -> None:
+        try:
+            self._executor.process(queue, workflow)  # type: ignore
+        except Exception:
+            CACHE_REFRESH_ERRORS.inc()
+            log.exception("Failed to refresh cached link")
+        finally:
+            self._release(keys)
+
+    async def _run_async(
+        self, queue: Queue, workflow: "Query", keys: set[str]
+    ) -> None:
+        try:
+            await self._executor.process(queue, workflow)  # type: ignore
+        except Exception:
+            CACHE_REFRESH_ERRORS.inc()
+            log.exception("Failed to refresh cached link")
+        finally:
+            self._release(keys)
+
+
 class Query(Workflow):
     def __init__(
         self,
@@ -645,19 +858,38 @@ class Query(Workflow):
         query: QueryNode,
         ctx: "Context",
         cache: CacheInfo | None = None,
+        plan: ExecutionPlan | None = None,
+        batch_nodes: bool = False,
+        deduplicate_ids: bool = False,
+        index_class: type[Index] = Index,
+        proxy_class: type[Proxy] = Proxy,
+        refresher: _Refresher | None = None,
     ) -> None:
         self._queue = queue
         self._task_set = task_set
         self._graph = graph
         self._query = query
+        self._plan = plan if plan is not None else ExecutionPlan(query)
         self._ctx = ctx
-        self._index = Index()
+        self._index = index_class()
+        self._proxy_class = proxy_class
+        self._index.targets.update(self._plan.link_targets(graph))
         self._cache = cache
+        self._refresher = refresher
+        self._flight_owner = object()
+        self._flights: set[str] = set()
+        # cache keys of the refreshed links, see start_link
+        self._cache_keys: dict[tuple[NodePath, str], list[str]] = {}
         self._in_progress: defaultdict[NodePath, int] = defaultdict(int)
         self._done_callbacks: defaultdict[NodePath, list[Callable]] = (
             defaultdict(list)
         )  # noqa: E501
         self._path_callback: dict[NodePath, Callable] = {}
+        self._deduplicate_ids = deduplicate_ids
+        self._batches: dict[Hashable, FieldsBatch] | None = None
+        if batch_nodes:
+            self._batches = {}
+            queue.add_tick_callback(self._submit_batches)
 
     def _track(self, path: NodePath) -> None:
         self._in_progress[path] += 1
@@ -685,27 +917,48 @@ class Query(Workflow):
         else:
             return self._task_set.submit(func, *args, **kwargs)
 
+    def _submit_resolver(
+        self, task_set: TaskSet, resolver: Resolver, *args: Any
+    ) -> SubmitRes:
+        if resolver.pass_context:
+            return task_set.submit(resolver.func, self._ctx, *args)
+        else:
+            return task_set.submit(resolver.func, *args)
+
     def start(self) -> None:
         self.process_node(tuple(), self._graph.root, self._query, None)
+        if self._batches is not None:
+            self._submit_batches()
+
+    def release_flights(self) -> None:
+        """Releases links, which this query should compute for concurrent
+        queries, but didn't store into the cache, e.g. because of an error
+        """
+        if self._flights:
+            assert self._cache is not None
+            assert self._cache.single_flight is not None
+            self._cache.single_flight.release(
+                self._flight_owner, dict.fromkeys(self._flights)
+            )
+            self._flights.clear()
 
     def result(self) -> Proxy:
+        self.release_flights()
         self._index.finish()
-        return Proxy(self._index, ROOT, self._query)
+        return self._proxy_class(self._index, ROOT, self._query)
 
     def _process_node_ordered(
-        self, path: NodePath, node: Node, query: QueryNode, ids: Any
+        self, path: NodePath, node: Node, node_plan: NodePlan, ids: Any
     ) -> None:
-        proc_steps = GroupQuery(node).group(query)
+        steps = node_plan.steps
 
         # recursively and sequentially schedule fields and links
-        def proc(
-            steps: list[tuple[Callable, list[FieldInfo] | LinkInfo]],
-        ) -> None:
-            step_func, step_item = steps.pop(0)
+        def proc(idx: int) -> None:
+            step_resolver, step_item = steps[idx]
             if isinstance(step_item, list):
                 self._track(path)
                 dep = self._schedule_fields(
-                    path, node, step_func, step_item, ids
+                    path, node, step_resolver, step_item, ids
                 )
             else:
                 self._track(path)
@@ -713,11 +966,11 @@ class Query(Workflow):
                     path, node, step_item.graph_link, step_item.query_link, ids
                 )
 
-            if steps:
-                self._queue.add_callback(dep, lambda: proc(steps))
+            if idx + 1 < len(steps):
+                self._queue.add_callback(dep, lambda: proc(idx + 1))
 
-        if proc_steps:
-            proc(proc_steps)
+        if steps:
+            proc(0)
 
     def process_node(
         self,
@@ -729,70 +982,54 @@ class Query(Workflow):
         path = path + (node.name,)
         self._path_callback[path] = lambda: self._untrack(path)
 
-        if query.ordered:
-            self._process_node_ordered(path, node, query, ids)
-            return
-
-        fields, links = SplitQuery(node).split(query)
+        if self._deduplicate_ids and ids is not None:
+            unique_ids = list(dict.fromkeys(ids))
+            if len(unique_ids) < len(ids):
+                SKIPPED_IDS.labels(node.name, "duplicate").inc(
+                    len(ids) - len(unique_ids)
+                )
+                ids = unique_ids
 
-        to_func: dict[str, Callable] = {}
-        from_func: defaultdict[Callable, list[FieldInfo]] = defaultdict(list)
-        for func, field_info in fields:
-            to_func[field_info.graph_field.name] = func
-            from_func[func].append(field_info)
+        node_plan = self._plan.node_plan(node, query)
+        if node_plan.ordered:
+            self._process_node_ordered(path, node, node_plan, ids)
+            return
 
         to_dep: dict[Callable, Dep] = {}
-        for func, func_fields_info in from_func.items():
+        for resolver, func_fields_info in node_plan.fields:
             self._track(path)
-            to_dep[func] = self._schedule_fields(
-                path, node, func, func_fields_info, ids
+            to_dep[resolver.func] = self._schedule_fields(
+                path, node, resolver, func_fields_info, ids
             )
 
         # schedule link resolve
-        for link_info in links:
-            graph_link = link_info.graph_link
-            link = link_info.query_link
-
+        for link_info, deps in node_plan.links:
             self._track(path)
             schedule = partial(
                 self._schedule_link,
                 path,
                 node,
-                graph_link,
-                link,
+                link_info.graph_link,
+                link_info.query_link,
                 ids,
             )
-            if graph_link.requires:
-                if isinstance(graph_link.requires, list):
-                    done_link_deps: set = set()
-
-                    def add_done_dep_callback(
-                        done_deps: set,
-                        dep: Dep,
-                        req: Any,
-                        graph_link: Link,
-                        schedule: Callable,
-                    ) -> None:
-                        def done_cb() -> None:
-                            done_deps.add(req)
-                            if done_deps == set(graph_link.requires):
-                                schedule()
-
-                        self._queue.add_callback(dep, done_cb)
-
-                    for req in graph_link.requires:
-                        add_done_dep_callback(
-                            done_link_deps,
-                            to_dep[to_func[req]],
-                            req,
-                            graph_link,
-                            schedule,
-                        )
-                else:
-                    dep = to_dep[to_func[graph_link.requires]]
-                    self._queue.add_callback(dep, schedule)
-            else:
+            if not deps:
                 schedule()
+            elif len(deps) == 1:
+                self._queue.add_callback(to_dep[deps[0]], schedule)
+            else:
+                # link is scheduled when all the fields it requires are loaded
+                pending = [len(deps)]
+
+                def done_cb(
+                    pending: list[int] = pending, schedule: Callable = schedule
+                ) -> None:
+                    pending[0] -= 1
+                    if not pending[0]:
+                        schedule()
+
+                for func in deps:
+                    self._queue.add_callback(to_dep[func], done_cb)
 
     def process_link(
         self,
@@ -855,23 +1092,36 @@ class Query(Workflow):
         self,
         path: NodePath,
         node: Node,
-        func: Callable,
+        resolver: Resolver,
         fields_info: list[FieldInfo],
         ids: Any | None,
     ) -> SubmitRes | TaskSet:
+        if self._deduplicate_ids and ids:
+            ids = self._not_loaded_ids(node, fields_info, ids)
+            if not ids:
+                # all requested fields are already loaded
+                done = self._queue.fork(self._task_set)
+                self._queue.add_callback(done, lambda: self._untrack(path))
+                return done
+
+        if self._batches is not None and ids is not None:
+            return self._schedule_fields_batch(
+                path, node, resolver, fields_info, ids
+            )
+
         query_fields = [f.query_field for f in fields_info]
 
         dep: TaskSet | SubmitRes
-        if hasattr(func, "__subquery__"):
-            assert ids is not None
+        if ids is None:
+            dep = self._submit_resolver(self._task_set, resolver, query_fields)
+            proc = dep.result
+        elif resolver.subquery or _exceeds(resolver.max_batch_size, ids):
             dep = self._queue.fork(self._task_set)
-            fields = [(f.graph_field, f.query_field) for f in fields_info]
-            proc = func(fields, ids, self._queue, self._ctx, dep)
+            proc = self._load_fields(dep, resolver, fields_info, ids)
         else:
-            if ids is None:
-                dep = self._submit(func, query_fields)
-            else:
-                dep = self._submit(func, query_fields, ids)
+            dep = self._submit_resolver(
+                self._task_set, resolver, query_fields, ids
+            )
             proc = dep.result
 
         def callback() -> None:
@@ -887,6 +1137,104 @@ class Query(Workflow):
         self._queue.add_callback(dep, callback)
         return dep
 
+    def _load_fields(
+        self,
+        task_set: TaskSet,
+        resolver: Resolver,
+        fields_info: list[FieldInfo],
+        ids: list,
+    ) -> Callable[[], Any]:
+        """Loads fields in the task set, splitting ids into chunks of
+        ``max_batch_size`` ids, which are loaded concurrently.
+
+        Returns function to get results of all chunks in the order of ids.
+        """
+        chunks = _chunks(ids, resolver.max_batch_size)
+        if resolver.subquery:
+            fields = [(f.graph_field, f.query_field) for f in fields_info]
+            procs = [
+                resolver.func(fields, chunk, self._queue, self._ctx, task_set)
+                for chunk in chunks
+            ]
+        else:
+            query_fields = [f.query_field for f in fields_info]
+            procs = [
+                self._submit_resolver(
+                    task_set, resolver, query_fields, chunk
+                ).result
+                for chunk in chunks
+            ]
+        if len(procs) == 1:
+            return procs[0]
+        return lambda: list(chain.from_iterable(proc() for proc in procs))
+
+    def _not_loaded_ids(
+        self, node: Node, fields_info: list[FieldInfo], ids: list
+    ) -> list:
+        node_index = self._index[node.name]
+        keys = [f.query_field.index_key for f in fields_info]
+        not_loaded = []
+        for i in ids:
+            entry = node_index.get(i)
+            if entry is None or not all(key in entry for key in keys):
+                not_loaded.append(i)
+        if len(not_loaded) < len(ids):
+            SKIPPED_IDS.labels(node.name, "loaded").inc(
+                len(ids) - len(not_loaded)
+            )
+        return not_loaded
+
+    def _schedule_fields_batch(
+        self,
+        path: NodePath,
+        node: Node,
+        resolver: Resolver,
+        fields_info: list[FieldInfo],
+        ids: Any,
+    ) -> TaskSet:
+        """Defers resolver call until the end of the current scheduling tick,
+        so the same fields of the same node, requested from different paths,
+        are loaded using single resolver call.
+        """
+        assert self._batches is not None
+        query_fields = [f.query_field for f in fields_info]
+        key = (node.name, resolver.func, tuple(query_fields))
+        batch = self._batches.get(key)
+        if batch is None:
+            batch = FieldsBatch(
+                node, resolver, fields_info, self._queue.fork(self._task_set)
+            )
+            self._batches[key] = batch
+
+            def store(batch: FieldsBatch = batch) -> None:
+                assert batch.proc is not None
+                store_fields(
+                    self._index,
+                    node,
+                    query_fields,
+                    list(batch.ids),
+                    batch.proc(),
+                )
+
+            self._queue.add_callback(batch.task_set, store)
+
+        batch.ids.update(dict.fromkeys(ids))
+        self._queue.add_callback(batch.task_set, lambda: self._untrack(path))
+        return batch.task_set
+
+    def _submit_batches(self) -> None:
+        if not self._batches:
+            return
+        batches = list(self._batches.values())
+        self._batches.clear()
+        for batch in batches:
+            batch.proc = self._load_fields(
+                batch.task_set,
+                batch.resolver,
+                batch.fields_info,
+                list(batch.ids),
+            )
+
     def _update_index_from_cache(
         self,
         path: NodePath,
@@ -904,12 +1252,23 @@ class Query(Workflow):
             )
 
         keys = set(info[0] for info in key_info)
-        dep = self._submit(
-            self._cache.get_many, list(keys), node.name, graph_link.name
+        get_many = (
+            self._cache.get_many_async
+            if self._cache.is_async
+            else self._cache.get_many
         )
+        dep = self._submit(get_many, list(keys), node.name, graph_link.name)
 
         def callback() -> None:
-            result = dep.result()
+            assert self._cache is not None
+            result, refresh = self._cache.split(
+                dep.result(),
+                query_link.directives_map["cached"].stale,
+                node.name,
+                graph_link.name,
+            )
+            # entries which should be refreshed are still served from cache
+            result.update(refresh)
             cached_data = []
             cached_ids = []
             for key, i, req in key_info:
@@ -922,6 +1281,34 @@ class Query(Workflow):
                 update_index(self._index, node, cached_ids, cached_data)
                 ids = [i for i in ids if i not in cached_ids]
 
+            if refresh and self._refresher is not None:
+                self._refresh_link(
+                    node,
+                    graph_link,
+                    query_link,
+                    [info for info in key_info if info[0] in refresh],
+                )
+
+            if ids and self._cache.single_flight is not None:
+                missing = [
+                    (key, i) for key, i, _ in key_info if key not in result
+                ]
+                leading, waiting = self._cache.single_flight.acquire(
+                    dict.fromkeys(key for key, _ in missing),
+                    self._flight_owner,
+                )
+                self._flights.update(leading)
+                if waiting:
+                    self._wait_flights(
+                        path,
+                        node,
+                        graph_link,
+                        query_link,
+                        [(key, i) for key, i in missing if key in waiting],
+                        waiting,
+                    )
+                    ids = [i for key, i in missing if key not in waiting]
+
             if ids:
                 self._schedule_link(
                     path,
@@ -935,6 +1322,134 @@ class Query(Workflow):
         self._queue.add_callback(dep, callback)
         return dep
 
+    def _refresh_link(
+        self,
+        node: Node,
+        graph_link: Link,
+        query_link: QueryLink,
+        key_info: list[tuple[str, Any, Any]],
+    ) -> None:
+        """Recomputes cached link in background, keys which are already
+        refreshed by other queries are skipped
+        """
+        assert self._refresher is not None
+        keys = self._refresher.acquire(dict.fromkeys(k for k, _, _ in key_info))
+        if not keys:
+            return
+        key_info = [info for info in key_info if info[0] in keys]
+
+        # refresh outlives this query, so it doesn't use its context
+        assert self._cache is not None
+        ctx = Context(
+            self._cache.refresh_context(self._ctx)
+            if self._cache.refresh_context is not None
+            else {}
+        )
+
+        queue = Queue(self._queue.executor)
+        workflow = Query(
+            queue,
+            queue.fork(None),
+            self._graph,
+            self._query,
+            ctx,
+            self._cache,
+            self._plan,
+            batch_nodes=self._batches is not None,
+            deduplicate_ids=self._deduplicate_ids,
+            index_class=type(self._index),
+            proxy_class=self._proxy_class,
+        )
+        workflow.start_link(
+            node,
+            graph_link,
+            query_link,
+            [i for _, i, _ in key_info],
+            [req for _, _, req in key_info],
+            [key for key, _, _ in key_info],
+        )
+        self._refresher.run(queue, workflow, keys)
+
+    def start_link(
+        self,
+        node: Node,
+        graph_link: Link,
+        query_link: QueryLink,
+        ids: list[Any],
+        reqs: list[Any],
+        keys: list[str] | None = None,
+    ) -> None:
+        """Starts computation of the single link, instead of the whole
+        query, bypassing cache, used to refresh cached links
+
+        :param ids: idents of the objects of the node
+        :param reqs: values of the link requirements of these objects
+        :param keys: cache keys of these objects, computed with the context
+                     of the query, which triggered refresh
+        """
+        node_idx = self._index[node.name]
+        for i, req in zip(ids, reqs):
+            if isinstance(graph_link.requires, list):
+                node_idx[i].update(req)
+            else:
+                node_idx[i][graph_link.requires] = req
+
+        path = (node.name,)
+        if keys is not None:
+            self._cache_keys[(path, graph_link.name)] = keys
+        self._track(path)
+        self._schedule_link(
+            path, node, graph_link, query_link, ids, skip_cache=True
+        )
+
+    def _wait_flights(
+        self,
+        path: NodePath,
+        node: Node,
+        graph_link: Link,
+        query_link: QueryLink,
+        key_ids: list[tuple[str, Any]],
+        futures: dict[str, Future],
+    ) -> None:
+        """Waits for links, which are computed by concurrent queries, and
+        computes links, which were not computed in time
+        """
+        assert self._cache is not None
+        assert self._cache.single_flight is not None
+        single_flight = self._cache.single_flight
+        self._track(path)
+        dep: SubmitRes
+        if isinstance(self._queue.executor, BaseAsyncExecutor):
+            dep = self._submit(single_flight.wait_async, futures)
+        else:
+            # waiting doesn't occupy executor's workers
+            dep = single_flight.wait_future(futures)
+            self._queue.add_future(self._task_set, dep)
+
+        def callback() -> None:
+            result = dep.result()
+            data = []
+            data_ids = []
+            ids = []
+            for key, i in key_ids:
+                if key in result:
+                    data_ids.append(i)
+                    data.append(result[key]["data"])
+                else:
+                    ids.append(i)
+
+            if data:
+                update_index(self._index, node, data_ids, data)
+
+            if ids:
+                self._schedule_link(
+                    path, node, graph_link, query_link, ids, skip_cache=True
+                )
+            else:
+                self._untrack(path)
+
+        self._queue.add_callback(dep, callback)
+
     def _schedule_link(
         self,
         path: NodePath,
@@ -943,7 +1458,7 @@ class Query(Workflow):
         query_link: QueryLink,
         ids: Any,
         skip_cache: bool = False,
-    ) -> SubmitRes:
+    ) -> Dep:
         """Schedules link (submits Link.func to executor).
 
         If link has `requires` specified, take required values list from index
@@ -955,8 +1470,9 @@ class Query(Workflow):
         When Link.func is executed by executor, a `process_link`
         method called with result.
         """
+        resolver = node.resolvers[graph_link.name]
         args = []
-        if graph_link.requires:
+        if resolver.requires:
             # collect data for link requires from store
             reqs: Any = link_reqs(self._index, node, graph_link, ids)
 
@@ -971,10 +1487,28 @@ class Query(Workflow):
 
             args.append(reqs)
 
-        if graph_link.options:
+        if resolver.options:
             args.append(query_link.options)
 
-        dep = self._submit(graph_link.func, *args)
+        started = time.perf_counter()
+        dep: Dep
+        if (
+            ids is not None
+            and resolver.requires
+            and _exceeds(resolver.max_batch_size, reqs)
+        ):
+            dep = self._queue.fork(self._task_set)
+            futures = [
+                self._submit_resolver(dep, resolver, chunk, *args[1:])
+                for chunk in _chunks(reqs, resolver.max_batch_size)
+            ]
+
+            def result() -> Any:
+                return list(chain.from_iterable(f.result() for f in futures))
+
+        else:
+            dep = self._submit_resolver(self._task_set, resolver, *args)
+            result = dep.result
 
         def callback() -> None:
             return self.process_link(
@@ -983,7 +1517,7 @@ class Query(Workflow):
                 graph_link,
                 query_link,
                 ids,
-                dep.result(),
+                result(),
             )
 
         self._queue.add_callback(dep, callback)
@@ -991,12 +1525,32 @@ class Query(Workflow):
         def store_link_cache() -> None:
             assert self._cache is not None
             cached = query_link.directives_map["cached"]
+            ttl = cached.ttl + (cached.stale or 0)
             reqs: Any = link_reqs(self._index, node, graph_link, ids)
             to_cache = CacheVisitor(
                 self._cache, self._index, self._graph, node
-            ).process(query_link, ids, reqs, self._ctx)
+            ).process(
+                query_link,
+                ids,
+                reqs,
+                self._ctx,
+                time.perf_counter() - started,
+                self._cache_keys.get((path, graph_link.name)),
+            )
 
-            self._submit(self._cache.set_many, to_cache, cached.ttl)
+            if self._cache.single_flight is not None:
+                self._cache.single_flight.release(self._flight_owner, to_cache)
+
+            if self._cache.writer is not None:
+                self._cache.writer.submit(self._cache.cache, to_cache, ttl)
+                return
+
+            set_many = (
+                self._cache.set_many_async
+                if self._cache.is_async
+                else self._cache.set_many
+            )
+            self._submit(set_many, to_cache, ttl)
 
         if "cached" in query_link.directives_map and self._cache:
             self._add_done_callback(path + (graph_link.node,), store_link_cache)
@@ -1018,6 +1572,36 @@ def pass_context(func: Callable[P, R]) -> Callable[P, R]:
     return func
 
 
+def cheap(func: Callable[P, R]) -> Callable[P, R]:
+    """Decorator to mark a synchronous function as cheap to call.
+
+    Cheap functions are called in the event loop thread even when
+    :py:class:`hiku.executors.asyncio.AsyncIOExecutor` is configured to run
+    synchronous functions in a thread pool.
+    """
+    func.__cheap__ = True  # type: ignore[attr-defined]
+    return func
+
+
+def limit_concurrency(limit: int) -> Callable[[Callable[P, R]], Callable[P, R]]:
+    """Decorator to limit how many calls of a function can run concurrently.
+
+    Limit is enforced by :py:class:`hiku.executors.asyncio.AsyncIOExecutor`
+    and :py:class:`hiku.executors.threads.ThreadsExecutor`, and it is shared
+    between all queries executed using the same executor.
+    """
+    if limit < 1:
+        raise ValueError(
+            "Concurrency limit should be positive: {}".format(limit)
+        )
+
+    def decorator(func: Callable[P, R]) -> Callable[P, R]:
+        func.__concurrency_limit__ = limit  # type: ignore[attr-defined]
+        return func
+
+    return decorator
+
+
 def _do_pass_context(func: Callable) -> bool:
     return getattr(func, "__pass_context__", False)
 
@@ -1048,15 +1632,89 @@ _ExecutorType = TypeVar(
 
 
 class Engine(Generic[_ExecutorType]):
+    """Executes queries using provided executor.
+
+    :param executor: executor to run data loading functions
+    :param cache: cache settings for ``@cached`` directive, caches
+        implementing :py:class:`hiku.cache.AsyncBaseCache` require
+        asynchronous executor
+    :param plan_cache_size: how many compiled execution plans to keep,
+        plans are reused for the same graph and the same (merged) query,
+        ``0`` disables plans caching
+    :param batch_nodes: load the same fields of the same node, requested
+        from different paths, using single resolver call with deduplicated
+        ids, when these paths are scheduled at the same time
+    :param deduplicate_ids: remove duplicate ids before calling resolvers
+        and do not load fields which are already loaded for some ids,
+        skipped ids are counted by ``hiku_engine_skipped_ids`` metric
+    :param index_class: class of the index to store results in, use
+        :py:class:`hiku.result.ColumnarIndex` to store objects by columns,
+        which is more memory efficient for large results
+    :param proxy_class: class of the result proxy, use
+        :py:class:`hiku.result.CachedProxy` to cache resolved values and
+        child proxies, when results are consumed in Python code
+    """
+
     executor: _ExecutorType
 
     def __init__(
         self,
         executor: _ExecutorType,
         cache: CacheSettings | None = None,
+        plan_cache_size: int = 128,
+        batch_nodes: bool = False,
+        deduplicate_ids: bool = False,
+        index_class: type[Index] = Index,
+        proxy_class: type[Proxy] = Proxy,
     ) -> None:
+        if (
+            cache is not None
+            and isinstance(cache.cache, AsyncBaseCache)
+            and not isinstance(executor, BaseAsyncExecutor)
+        ):
+            raise TypeError(
+                "Asynchronous cache {!r} requires asynchronous executor".format(
+                    cache.cache
+                )
+            )
         self.executor = executor
         self.cache_settings = cache
+        self._refresher = (
+            _Refresher(executor, cache.refresh_executor)
+            if cache is not None
+            else None
+        )
+        self.plan_cache_size = plan_cache_size
+        self.batch_nodes = batch_nodes
+        self.deduplicate_ids = deduplicate_ids
+        self.index_class = index_class
+        self.proxy_class = proxy_class
+        self._plans: OrderedDict[tuple[Graph, QueryNode], ExecutionPlan] = (
+            OrderedDict()
+        )
+        self._plans_lock = threading.Lock()
+
+    def _get_plan(self, graph: Graph, query: QueryNode) -> ExecutionPlan:
+        if not self.plan_cache_size:
+            return ExecutionPlan(InitOptions(graph).visit(query))
+
+        key = (graph, query)
+        try:
+            with self._plans_lock:
+                plan = self._plans.get(key)
+                if plan is not None:
+                    self._plans.move_to_end(key)
+                    return plan
+        except TypeError:
+            # query contains unhashable option values
+            return ExecutionPlan(InitOptions(graph).visit(query))
+
+        plan = ExecutionPlan(InitOptions(graph).visit(query))
+        with self._plans_lock:
+            self._plans[key] = plan
+            while len(self._plans) > self.plan_cache_size:
+                self._plans.popitem(last=False)
+        return plan
 
     def _prepare_workflow(
         self, execution_context: ExecutionContext
@@ -1066,8 +1724,8 @@ class Engine(Generic[_ExecutorType]):
         ctx = execution_context.context
         operation_name = execution_context.operation_name
 
-        query = InitOptions(graph).visit(query)
         assert query is not None
+        plan = self._get_plan(graph, query)
         queue = Queue(self.executor)
         task_set = queue.fork(None)
         cache = (
@@ -1079,9 +1737,25 @@ class Engine(Generic[_ExecutorType]):
             else None
         )
         query_workflow = Query(
-            queue, task_set, graph, query, Context(ctx), cache
+            queue,
+            task_set,
+            graph,
+            plan.query,
+            Context(ctx),
+            cache,
+            plan,
+            self.batch_nodes,
+            self.deduplicate_ids,
+            self.index_class,
+            self.proxy_class,
+            self._refresher,
         )
-        query_workflow.start()
+        try:
+            query_workflow.start()
+        except BaseException:
+            # synchronous executors may run resolvers during start
+            query_workflow.release_flights()
+            raise
         return queue, query_workflow
 
     @overload
@@ -1101,4 +1775,21 @@ class Engine(Generic[_ExecutorType]):
         execution_context: ExecutionContext,
     ) -> Any:
         queue, workflow = self._prepare_workflow(execution_context)
-        return self.executor.process(queue, workflow)
+        if (
+            self.cache_settings is None
+            or self.cache_settings.single_flight is None
+        ):
+            return self.executor.process(queue, workflow)
+
+        if isinstance(self.executor, BaseAsyncExecutor):
+            return self._process_async(queue, workflow)
+        try:
+            return self.executor.process(queue, workflow)
+        finally:
+            workflow.release_flights()
+
+    async def _process_async(self, queue: Queue, workflow: Query) -> Proxy:
+        try:
+            return await self.executor.process(queue, workflow)  # type: ignore
+        finally:
+            workflow.release_flights()
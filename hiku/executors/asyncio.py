@@ -1,20 +1,51 @@
+import contextvars
 import inspect
+import sys
+import threading
+import time
 from asyncio import (
-    FIRST_COMPLETED,
+    AbstractEventLoop,
     CancelledError,
-    Task,
+    Future,
+    Semaphore,
     gather,
     get_running_loop,
-    wait,
 )
-from typing import TYPE_CHECKING, Any, Callable, Coroutine, cast
+from collections import deque
+from concurrent.futures import Executor
+from typing import TYPE_CHECKING, Any, Callable, Coroutine, Hashable, cast
+from weakref import WeakKeyDictionary
 
-from hiku.executors.base import BaseAsyncExecutor
+from prometheus_client import Histogram
+
+from hiku.executors.base import (
+    LIMIT_SATURATED,
+    LIMIT_WAIT,
+    BaseAsyncExecutor,
+    get_limits,
+)
 from hiku.result import Proxy
 
 if TYPE_CHECKING:
     from hiku.executors.queue import Queue, Workflow
 
+if sys.version_info >= (3, 12):
+    from asyncio import eager_task_factory
+else:
+    eager_task_factory = None
+
+
+THREAD_POOL_WAIT = Histogram(
+    name="hiku_thread_pool_wait_seconds",
+    documentation="Time synchronous functions wait in the thread pool queue",
+)
+
+
+def _is_async(fn: Callable) -> bool:
+    return inspect.iscoroutinefunction(fn) or inspect.iscoroutinefunction(
+        getattr(fn, "__call__", None)
+    )
+
 
 class AsyncIOExecutor(BaseAsyncExecutor):
     """AsyncIOExecutor is an executor that uses asyncio event loop to run tasks.
@@ -22,19 +53,128 @@ class AsyncIOExecutor(BaseAsyncExecutor):
     By default it allows to run both synchronous and asynchronous tasks.
     To deny synchronous tasks set deny_sync to True.
 
+    Results of synchronous tasks are returned as already completed futures,
+    without creating asyncio tasks.
+
     :param deny_sync: deny synchronous tasks -
                       raise TypeError if a task is not awaitable
+    :param eager: start asynchronous tasks eagerly, coroutine runs
+                  synchronously until it blocks, so tasks which do not block
+                  are completed without scheduling them on the event loop
+                  (requires Python 3.12+, ignored on older versions)
+    :param thread_pool: run synchronous functions in this executor
+                        (e.g. ``ThreadPoolExecutor``) instead of running them
+                        in the event loop thread, functions marked with
+                        :py:func:`hiku.engine.cheap` are still called inline.
+                        Time spent in the pool queue is measured by
+                        ``hiku_thread_pool_wait_seconds`` metric
+    :param max_concurrency: maximum number of concurrently running tasks,
+                            functions can also have their own limits, see
+                            :py:func:`hiku.engine.limit_concurrency`,
+                            limits are applied per event loop
     """
 
-    def __init__(self, deny_sync: bool = False) -> None:
+    def __init__(
+        self,
+        deny_sync: bool = False,
+        eager: bool = False,
+        thread_pool: Executor | None = None,
+        max_concurrency: int | None = None,
+    ) -> None:
         self.deny_sync = deny_sync
+        self.eager = eager
+        self.thread_pool = thread_pool
+        self.max_concurrency = max_concurrency
+        # semaphores are bound to the event loop, so executor can be
+        # used in several event loops
+        self._semaphores: WeakKeyDictionary[
+            AbstractEventLoop, dict[Hashable, Semaphore]
+        ] = WeakKeyDictionary()
+        self._semaphores_lock = threading.Lock()
+
+    def _offloaded(self, fn: Callable) -> bool:
+        return (
+            self.thread_pool is not None
+            and not self.deny_sync
+            and not getattr(fn, "__cheap__", False)
+            and not _is_async(fn)
+        )
+
+    async def _limited(
+        self,
+        loop: AbstractEventLoop,
+        limits: list[tuple[Hashable, str, int]],
+        fn: Callable,
+        args: tuple,
+        kwargs: dict,
+    ) -> Any:
+        with self._semaphores_lock:
+            semaphores = self._semaphores.get(loop)
+            if semaphores is None:
+                semaphores = self._semaphores[loop] = {}
+        acquired = []
+        try:
+            for key, label, limit in limits:
+                semaphore = semaphores.get(key)
+                if semaphore is None:
+                    semaphore = semaphores[key] = Semaphore(limit)
+                if semaphore.locked():
+                    LIMIT_SATURATED.labels(label).inc()
+                    started = time.perf_counter()
+                    await semaphore.acquire()
+                    LIMIT_WAIT.labels(label).observe(
+                        time.perf_counter() - started
+                    )
+                else:
+                    await semaphore.acquire()
+                acquired.append(semaphore)
+
+            if self._offloaded(fn):
+                return await self._offload(loop, fn, args, kwargs)
 
-    async def _wrapper(self, result: Any) -> Any:
+            result = fn(*args, **kwargs)
+            if inspect.isawaitable(result):
+                return await result
+            elif self.deny_sync:
+                raise TypeError(
+                    "{!r} returned non-awaitable object {!r}".format(fn, result)
+                )
+            return result
+        finally:
+            for semaphore in acquired:
+                semaphore.release()
+
+    async def _offload(
+        self,
+        loop: AbstractEventLoop,
+        fn: Callable,
+        args: tuple,
+        kwargs: dict,
+    ) -> Any:
+        submitted = time.perf_counter()
+
+        def run() -> Any:
+            THREAD_POOL_WAIT.observe(time.perf_counter() - submitted)
+            return fn(*args, **kwargs)
+
+        ctx = contextvars.copy_context()
+        result = await loop.run_in_executor(self.thread_pool, ctx.run, run)
+        if inspect.isawaitable(result):
+            result = await result
         return result
 
-    def submit(self, fn: Callable, *args: Any, **kwargs: Any) -> Task:
+    def submit(self, fn: Callable, *args: Any, **kwargs: Any) -> Future:
         loop = get_running_loop()
 
+        limits = get_limits(fn, self.max_concurrency)
+        if limits:
+            return loop.create_task(
+                self._limited(loop, limits, fn, args, kwargs)
+            )
+
+        if self._offloaded(fn):
+            return loop.create_task(self._offload(loop, fn, args, kwargs))
+
         coro = fn(*args, **kwargs)
         if not inspect.isawaitable(coro):
             if self.deny_sync:
@@ -42,17 +182,42 @@ class AsyncIOExecutor(BaseAsyncExecutor):
                     "{!r} returned non-awaitable object {!r}".format(fn, coro)
                 )
 
-            return loop.create_task(self._wrapper(coro))
+            fut = loop.create_future()
+            fut.set_result(coro)
+            return fut
 
         coro = cast(Coroutine, coro)
+        if self.eager and eager_task_factory is not None:
+            return eager_task_factory(loop, coro)
         return loop.create_task(coro)
 
     async def process(self, queue: "Queue", workflow: "Workflow") -> Proxy:
+        loop = get_running_loop()
+        ready: deque[Future] = deque()
+        waiter: Future | None = None
+
+        def on_done(fut: Future) -> None:
+            ready.append(fut)
+            if waiter is not None and not waiter.done():
+                waiter.set_result(None)
+
+        def on_submit(fut: Any) -> None:
+            fut.add_done_callback(on_done)
+
+        for fut in queue.__futures__:
+            on_submit(fut)
+        queue.add_submit_callback(on_submit)
+
         try:
-            while queue.__futures__:
-                done, _ = await wait(  # type: ignore
-                    queue.__futures__, return_when=FIRST_COMPLETED
-                )
+            while queue:
+                if not ready:
+                    waiter = loop.create_future()
+                    try:
+                        await waiter
+                    finally:
+                        waiter = None
+                done = list(ready)
+                ready.clear()
                 queue.progress(done)
             return workflow.result()
         except CancelledError:
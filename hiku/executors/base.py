@@ -2,9 +2,12 @@ import abc
 from typing import (
     Callable,
     Any,
+    Hashable,
     TYPE_CHECKING,
 )
 
+from prometheus_client import Counter, Histogram
+
 if TYPE_CHECKING:
     from hiku.result import Proxy
     from hiku.executors.queue import (
@@ -13,6 +16,39 @@ if TYPE_CHECKING:
     )
 
 
+GLOBAL_LIMIT = "__all__"
+
+LIMIT_SATURATED = Counter(
+    name="hiku_executor_limit_saturated",
+    documentation="Calls which had to wait for a concurrency limit slot",
+    labelnames=["resolver"],
+)
+LIMIT_WAIT = Histogram(
+    name="hiku_executor_limit_wait_seconds",
+    documentation="Time calls wait for a concurrency limit slot",
+    labelnames=["resolver"],
+)
+
+
+def func_name(fn: Callable) -> str:
+    return getattr(fn, "__qualname__", None) or repr(fn)
+
+
+def get_limits(
+    fn: Callable, max_concurrency: int | None
+) -> list[tuple[Hashable, str, int]]:
+    """Returns concurrency limits of the function as a list of
+    ``(key, metric label, limit)``, function limit goes first
+    """
+    limits: list[tuple[Hashable, str, int]] = []
+    limit = getattr(fn, "__concurrency_limit__", None)
+    if limit is not None:
+        limits.append((fn, func_name(fn), limit))
+    if max_concurrency is not None:
+        limits.append((None, GLOBAL_LIMIT, max_concurrency))
+    return limits
+
+
 class BaseExecutor(abc.ABC):
     @abc.abstractmethod
     def submit(self, fn: Callable, *args: Any, **kwargs: Any) -> Any:
@@ -1,5 +1,4 @@
-from itertools import chain
-from collections import defaultdict
+from collections import defaultdict, deque
 from typing import (
     Callable,
     Any,
@@ -46,6 +45,11 @@ class Queue:
 
     Each task set can also 'fork' new task sets.
     Forking is a way to represent a dependency graph of execution.
+
+    Completion tracking is incremental: every future knows its task set and
+    every task set knows its parent, so the cost of :py:meth:`progress`
+    depends only on the amount of completed work, not on the size of
+    the queue.
     """
 
     def __init__(self, executor: BaseExecutor) -> None:
@@ -64,10 +68,36 @@ class Queue:
         self._callbacks: defaultdict[SubmitRes | TaskSet, list] = defaultdict(
             list
         )
+        """
+        A list of callbacks which are called on every progress step.
+        """
+        self._tick_callbacks: list[Callable[[], None]] = []
+        """
+        A list of callbacks which are called for every submitted future.
+        """
+        self._submit_callbacks: list[Callable[[SubmitRes], None]] = []
+        """
+        Pending futures (in submission order) mapped to their task sets.
+        """
+        self._pending: dict[SubmitRes, TaskSet] = {}
+        """
+        A dictionary of parent task sets associated with each forked task set.
+        """
+        self._parents: dict[TaskSet, TaskSet | None] = {}
+        """
+        Task sets which may be completed, checked during progress.
+        """
+        self._ready: deque[TaskSet] = deque()
 
     @property
     def __futures__(self) -> list[SubmitRes]:
-        return list(chain.from_iterable(self._futures.values()))
+        return list(self._pending)
+
+    def __bool__(self) -> bool:
+        return bool(self._pending)
+
+    def _is_done(self, task_set: TaskSet) -> bool:
+        return not self._futures[task_set] and not self._forks[task_set]
 
     def progress(self, done: Iterable) -> None:
         """
@@ -80,48 +110,87 @@ class Queue:
         A callback is usually a function that is either stores result of
         the future or spawns a new future into the queue.
 
-        The second phase is to enter a loop, where it identifies completed task
-        sets (a task set is considered completed if it doesn't have any futures
+        Task sets which have no futures and forks left after this are
+        added to the ready queue.
+
+        The second phase is to enter a loop, where it takes task sets from
+        the ready queue and checks that they are still completed (a task set is
+        considered completed if it doesn't have any futures
             or forks associated with it).
         For each completed task set, it calls the corresponding callback
         functions and removes the task set from the queue.
 
-        If a task set has forks (task sets that were spawned from it),
-        those forks are also removed from the respective fork set.
+        Completed task set is also removed from the forks of its parent task
+        set, and the parent is added to the ready queue if it has nothing
+        else to wait for.
 
         This process continues until there are no pending task sets left.
+
+        Tick callbacks are called before every check for completed task sets,
+        so they are able to submit deferred tasks into the pending task sets.
         """
-        for future_set in self._futures.values():
-            future_set.difference_update(done)
+        done = list(done)
+        for fut in done:
+            task_set = self._pending.pop(fut, None)
+            if task_set is not None:
+                future_set = self._futures[task_set]
+                future_set.discard(fut)
+                if not future_set:
+                    self._ready.append(task_set)
 
         for fut in done:
             for callback in self._callbacks.pop(fut, []):
                 callback()
 
         while True:
-            completed_task_sets = [
-                ts
-                for ts in self._futures.keys()
-                if not self._futures[ts] and not self._forks[ts]
-            ]
-            if not completed_task_sets:
+            for tick_callback in self._tick_callbacks:
+                tick_callback()
+
+            if not self._ready:
                 break
 
-            for task_set in completed_task_sets:
+            ready, self._ready = self._ready, deque()
+            for task_set in ready:
+                if task_set not in self._futures or not self._is_done(task_set):
+                    continue
+
                 for callback in self._callbacks.pop(task_set, []):
                     callback()
-                self._futures.pop(task_set)
-                self._forks.pop(task_set)
-                for fork_set in self._forks.values():
+
+                if not self._is_done(task_set):
+                    # callbacks submitted new tasks into this task set
+                    continue
+
+                del self._futures[task_set]
+                del self._forks[task_set]
+                parent = self._parents.pop(task_set)
+                if parent is not None:
+                    fork_set = self._forks[parent]
                     fork_set.discard(task_set)
+                    if not fork_set and not self._futures[parent]:
+                        self._ready.append(parent)
+
+    @property
+    def executor(self) -> BaseExecutor:
+        return self._executor
 
     def submit(
         self, task_set: "TaskSet", fn: Callable, *args: Any, **kwargs: Any
     ) -> SubmitRes:
         fut = self._executor.submit(fn, *args, **kwargs)
-        self._futures[task_set].add(fut)
+        self.add_future(task_set, fut)
         return fut
 
+    def add_future(self, task_set: "TaskSet", fut: SubmitRes) -> None:
+        """
+        Adds a future, which is completed outside of the executor, e.g. by
+        another query, future type must be supported by the executor.
+        """
+        self._futures[task_set].add(fut)
+        self._pending[fut] = task_set
+        for submit_callback in self._submit_callbacks:
+            submit_callback(fut)
+
     def fork(self, from_: Union["TaskSet", None]) -> "TaskSet":
         """
         Forked task sets represent child task sets of a parent task set.
@@ -132,11 +201,30 @@ class Queue:
         task_set = TaskSet(self)
         self._futures[task_set] = set()
         self._forks[task_set] = set()
+        self._parents[task_set] = from_
         if from_ is not None:
             self._forks[from_].add(task_set)
+        # empty task set is completed unless something will be added to it
+        self._ready.append(task_set)
         return task_set
 
     def add_callback(
         self, obj: Union[SubmitRes, "TaskSet"], callback: Callable
     ) -> None:
         self._callbacks[obj].append(callback)
+
+    def add_tick_callback(self, callback: Callable[[], None]) -> None:
+        """
+        Adds a callback which is called on every progress step, after
+        callbacks of the completed futures and before task sets completion.
+        """
+        self._tick_callbacks.append(callback)
+
+    def add_submit_callback(
+        self, callback: Callable[[SubmitRes], None]
+    ) -> None:
+        """
+        Adds a callback which is called with every future submitted after
+        this call. Used by executors to track futures completion.
+        """
+        self._submit_callbacks.append(callback)
@@ -32,6 +32,6 @@ class SyncExecutor(BaseSyncExecutor):
         return FutureLike(fn(*args, **kwargs))
 
     def process(self, queue: "Queue", workflow: "Workflow") -> Proxy:
-        while queue.__futures__:
+        while queue:
             queue.progress(queue.__futures__)
         return workflow.result()
@@ -1,3 +1,6 @@
+import threading
+import time
+from collections import defaultdict, deque
 from concurrent.futures import (
     wait,
     FIRST_COMPLETED,
@@ -8,9 +11,15 @@ from typing import (
     TYPE_CHECKING,
     Callable,
     Any,
+    Hashable,
 )
 
-from hiku.executors.base import BaseSyncExecutor
+from hiku.executors.base import (
+    LIMIT_SATURATED,
+    LIMIT_WAIT,
+    BaseSyncExecutor,
+    get_limits,
+)
 from hiku.result import Proxy
 
 if TYPE_CHECKING:
@@ -20,15 +29,99 @@ if TYPE_CHECKING:
     )
 
 
+class _Call:
+    __slots__ = ("fn", "args", "kwargs", "limits", "future", "queued")
+
+    def __init__(
+        self,
+        fn: Callable,
+        args: tuple,
+        kwargs: dict,
+        limits: list[tuple[Hashable, str, int]],
+    ) -> None:
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.limits = limits
+        self.future: Future = Future()
+        self.queued: float | None = None
+
+
 class ThreadsExecutor(BaseSyncExecutor):
-    def __init__(self, pool: Executor):
+    """Executor which runs tasks in the provided pool (usually
+    ``ThreadPoolExecutor``).
+
+    :param pool: pool to run tasks
+    :param max_concurrency: maximum number of concurrently running tasks,
+                            functions can also have their own limits, see
+                            :py:func:`hiku.engine.limit_concurrency`
+    """
+
+    def __init__(self, pool: Executor, max_concurrency: int | None = None):
         self._pool = pool
+        self.max_concurrency = max_concurrency
+        self._lock = threading.Lock()
+        self._running: defaultdict[Hashable, int] = defaultdict(int)
+        self._waiting: deque[_Call] = deque()
+
+    def _try_acquire(self, call: _Call) -> bool:
+        if all(self._running[key] < limit for key, _, limit in call.limits):
+            for key, _, _ in call.limits:
+                self._running[key] += 1
+            return True
+        return False
+
+    def _start(self, call: _Call) -> None:
+        if call.queued is not None:
+            waited = time.perf_counter() - call.queued
+            for _, label, _ in call.limits:
+                LIMIT_WAIT.labels(label).observe(waited)
+        self._pool.submit(self._run, call)
+
+    def _run(self, call: _Call) -> None:
+        try:
+            if call.future.set_running_or_notify_cancel():
+                try:
+                    result = call.fn(*call.args, **call.kwargs)
+                except BaseException as exc:
+                    call.future.set_exception(exc)
+                else:
+                    call.future.set_result(result)
+        finally:
+            self._release(call)
+
+    def _release(self, call: _Call) -> None:
+        started = []
+        with self._lock:
+            for key, _, _ in call.limits:
+                self._running[key] -= 1
+            for waiting in list(self._waiting):
+                if self._try_acquire(waiting):
+                    self._waiting.remove(waiting)
+                    started.append(waiting)
+        for waiting in started:
+            self._start(waiting)
 
     def submit(self, fn: Callable, *args: Any, **kwargs: Any) -> Future:
-        return self._pool.submit(fn, *args, **kwargs)
+        limits = get_limits(fn, self.max_concurrency)
+        if not limits:
+            return self._pool.submit(fn, *args, **kwargs)
+
+        call = _Call(fn, args, kwargs, limits)
+        with self._lock:
+            acquired = self._try_acquire(call)
+            if not acquired:
+                call.queued = time.perf_counter()
+                self._waiting.append(call)
+                for key, label, limit in limits:
+                    if self._running[key] >= limit:
+                        LIMIT_SATURATED.labels(label).inc()
+        if acquired:
+            self._start(call)
+        return call.future
 
     def process(self, queue: "Queue", workflow: "Workflow") -> Proxy:
-        while queue.__futures__:
+        while queue:
             done, _ = wait(
                 queue.__futures__, return_when=FIRST_COMPLETED  # type: ignore
             )
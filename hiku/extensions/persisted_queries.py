@@ -0,0 +1,231 @@
+import abc
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Iterator
+
+from prometheus_client import Counter
+
+from hiku.context import ExecutionContext
+from hiku.error import GraphQLError
+from hiku.extensions.base_extension import Extension
+from hiku.operation import QueryTemplate
+from hiku.readers.graphql import parse_query, read_template
+
+PERSISTED_QUERY_HITS = Counter(
+    "hiku_persisted_query_hits",
+    "Requests served by prepared query templates",
+)
+PERSISTED_QUERY_MISSES = Counter(
+    "hiku_persisted_query_misses",
+    "Requests which query templates were prepared from the query text",
+)
+PERSISTED_QUERY_NOT_FOUND = Counter(
+    "hiku_persisted_query_not_found",
+    "Requests with unknown persisted query hash",
+)
+
+NOT_FOUND = "PersistedQueryNotFound"
+NOT_ALLOWED = "Only persisted queries are allowed"
+
+
+def query_hash(query: str) -> str:
+    """Returns hash of the query text, which is used by clients to
+    identify persisted queries
+    """
+    return hashlib.sha256(query.encode("utf-8")).hexdigest()
+
+
+class PersistedQueryStore(abc.ABC):
+    """Stores texts of the persisted queries by their hashes"""
+
+    @abc.abstractmethod
+    def get(self, query_hash: str) -> str | None:
+        pass
+
+    @abc.abstractmethod
+    def set(self, query_hash: str, query: str) -> None:
+        pass
+
+
+class InMemoryPersistedQueryStore(PersistedQueryStore):
+    """Keeps persisted queries in memory
+
+    :param queries: initial mapping of hashes to the queries, e.g. queries
+                    extracted from the client's code during build
+    :param maxsize: how many queries to keep, ``None`` means unbounded
+    """
+
+    def __init__(
+        self,
+        queries: dict[str, str] | None = None,
+        maxsize: int | None = None,
+    ) -> None:
+        self.maxsize = maxsize
+        self._queries: OrderedDict[str, str] = OrderedDict(queries or {})
+        self._lock = threading.Lock()
+
+    def get(self, query_hash: str) -> str | None:
+        with self._lock:
+            query = self._queries.get(query_hash)
+            if query is not None:
+                self._queries.move_to_end(query_hash)
+            return query
+
+    def set(self, query_hash: str, query: str) -> None:
+        with self._lock:
+            self._queries[query_hash] = query
+            self._queries.move_to_end(query_hash)
+            if self.maxsize is not None:
+                while len(self._queries) > self.maxsize:
+                    self._queries.popitem(last=False)
+
+
+_PreparedKey = tuple[str, str | None]
+
+
+class PersistedQueries(Extension):
+    """Implements Automatic Persisted Queries protocol: client sends
+    sha256 hash of the query in the ``persistedQuery`` request extension,
+    instead of the query text.
+
+    Query templates (:py:class:`hiku.operation.QueryTemplate`), which were
+    parsed and validated once, are kept in a bounded cache, so the next
+    requests with the same hash and operation name only bind and validate
+    values of the variables.
+
+    Example:
+
+    .. code-block:: python
+
+        schema = Schema(
+            executor,
+            graph,
+            extensions=[PersistedQueries(InMemoryPersistedQueryStore())],
+        )
+        endpoint = GraphQLEndpoint(schema)
+        endpoint.dispatch({
+            "extensions": {
+                "persistedQuery": {"version": 1, "sha256Hash": "..."},
+            },
+        })
+
+    Exposes metrics:
+    - hiku_persisted_query_hits
+    - hiku_persisted_query_misses
+    - hiku_persisted_query_not_found
+
+    :param store: store of the queries texts, in-memory store is used by
+                  default
+    :param persisted_only: reject queries which are not in the store,
+                           clients can't register new queries
+    :param maxsize: how many query templates to keep
+    """
+
+    def __init__(
+        self,
+        store: PersistedQueryStore | None = None,
+        persisted_only: bool = False,
+        maxsize: int = 1024,
+    ) -> None:
+        self.store = (
+            store if store is not None else InMemoryPersistedQueryStore()
+        )
+        self.persisted_only = persisted_only
+        self.maxsize = maxsize
+        self._prepared: OrderedDict[_PreparedKey, QueryTemplate] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get_hash(self, execution_context: ExecutionContext) -> str | None:
+        extensions = execution_context.request_extensions or {}
+        persisted_query = extensions.get("persistedQuery")
+        if persisted_query is None:
+            return None
+
+        if not isinstance(persisted_query, dict) or not isinstance(
+            persisted_query.get("sha256Hash"), str
+        ):
+            raise GraphQLError("Invalid persisted query")
+        if persisted_query.get("version") != 1:
+            raise GraphQLError("Unsupported persisted query version")
+        return persisted_query["sha256Hash"]
+
+    def _load_query(self, execution_context: ExecutionContext) -> str | None:
+        hash_ = self._get_hash(execution_context)
+        query_src = execution_context.query_src
+        if hash_ is None:
+            if self.persisted_only:
+                raise GraphQLError(NOT_ALLOWED)
+            return None
+
+        if query_src:
+            if query_hash(query_src) != hash_:
+                raise GraphQLError("Provided sha does not match query")
+            if self.store.get(hash_) is None:
+                if self.persisted_only:
+                    raise GraphQLError(NOT_ALLOWED)
+                self.store.set(hash_, query_src)
+            return hash_
+
+        query = self.store.get(hash_)
+        if query is None:
+            PERSISTED_QUERY_NOT_FOUND.inc()
+            raise GraphQLError(NOT_FOUND)
+        execution_context.query_src = query
+        return hash_
+
+    def _read_template(
+        self, execution_context: ExecutionContext
+    ) -> QueryTemplate:
+        if execution_context.graphql_document is None:
+            execution_context.graphql_document = parse_query(
+                execution_context.query_src
+            )
+        try:
+            return read_template(
+                execution_context.graphql_document,
+                execution_context.variables,
+                execution_context.request_operation_name,
+            )
+        except TypeError as e:
+            raise GraphQLError("Failed to read query: {}".format(e))
+
+    def on_operation(
+        self, execution_context: ExecutionContext
+    ) -> Iterator[None]:
+        key = None
+        if execution_context.query is None:
+            hash_ = self._load_query(execution_context)
+            if hash_ is not None:
+                key = (hash_, execution_context.request_operation_name)
+
+        if key is None:
+            yield
+            return
+
+        with self._lock:
+            template = self._prepared.get(key)
+            if template is not None:
+                self._prepared.move_to_end(key)
+
+        # templates differ by values of the variables, used in directives
+        if template is not None and template.matches(
+            execution_context.variables
+        ):
+            PERSISTED_QUERY_HITS.inc()
+            execution_context.template = template
+            execution_context.graphql_document = template.document
+            yield
+            return
+
+        PERSISTED_QUERY_MISSES.inc()
+        template = self._read_template(execution_context)
+        execution_context.template = template
+        yield
+
+        if execution_context.result is not None:
+            with self._lock:
+                self._prepared[key] = template
+                self._prepared.move_to_end(key)
+                while len(self._prepared) > self.maxsize:
+                    self._prepared.popitem(last=False)
@@ -0,0 +1,117 @@
+import threading
+from collections import OrderedDict
+from typing import Iterator, NamedTuple
+
+from prometheus_client import Counter, Gauge
+
+from hiku.context import ExecutionContext
+from hiku.extensions.base_extension import Extension
+from hiku.readers.graphql_fast import Unsupported
+from hiku.readers.normalize import normalize_query, query_key
+
+QUERY_NORMALIZER_SOURCES = Gauge(
+    "hiku_query_normalizer_sources",
+    "Distinct query texts in the normalizer cache",
+)
+QUERY_NORMALIZER_FORMS = Gauge(
+    "hiku_query_normalizer_forms",
+    "Distinct normalized queries in the normalizer cache",
+)
+QUERY_NORMALIZER_DEDUPLICATED = Counter(
+    "hiku_query_normalizer_deduplicated",
+    "New query texts with already known normalized query",
+)
+
+
+class NormalizedQuery(NamedTuple):
+    text: str
+    hash: str
+
+
+class QueryNormalizer(Extension):
+    """Replaces query text with its canonical form (see
+    :py:func:`hiku.readers.normalize.normalize_query`), so queries, which
+    differ only in whitespace, comments or fragments names, share parsed
+    query templates, validation results and ``QueryParserCache`` entries.
+
+    Hash of the normalized query is stored in the
+    ``ExecutionContext.query_hash``.
+
+    Should be placed before other extensions, which depend on the query
+    text.
+
+    Exposes metrics:
+    - hiku_query_normalizer_sources
+    - hiku_query_normalizer_forms
+    - hiku_query_normalizer_deduplicated
+
+    :param maxsize: how many query texts to keep in cache
+    """
+
+    def __init__(self, maxsize: int = 1024) -> None:
+        self.maxsize = maxsize
+        self._queries: OrderedDict[str, NormalizedQuery | None] = OrderedDict()
+        self._variants: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def variants(self, query_hash: str) -> int:
+        """Returns how many query texts in cache have the same normalized
+        query
+        """
+        return self._variants.get(query_hash, 0)
+
+    def _forget(self, normalized: NormalizedQuery | None) -> None:
+        if normalized is None:
+            return
+        count = self._variants[normalized.hash] - 1
+        if count:
+            self._variants[normalized.hash] = count
+        else:
+            del self._variants[normalized.hash]
+
+    def normalize(self, src: str) -> NormalizedQuery | None:
+        """Returns normalized query or ``None``, when query can't be
+        normalized
+        """
+        with self._lock:
+            try:
+                normalized = self._queries[src]
+            except KeyError:
+                pass
+            else:
+                self._queries.move_to_end(src)
+                return normalized
+
+        try:
+            text = normalize_query(src)
+        except Unsupported:
+            normalized = None
+        else:
+            normalized = NormalizedQuery(text, query_key(text))
+
+        with self._lock:
+            if src not in self._queries:
+                self._queries[src] = normalized
+                if normalized is not None:
+                    count = self._variants.get(normalized.hash, 0)
+                    if count:
+                        QUERY_NORMALIZER_DEDUPLICATED.inc()
+                    self._variants[normalized.hash] = count + 1
+                while len(self._queries) > self.maxsize:
+                    _, evicted = self._queries.popitem(last=False)
+                    self._forget(evicted)
+            QUERY_NORMALIZER_SOURCES.set(len(self._queries))
+            QUERY_NORMALIZER_FORMS.set(len(self._variants))
+        return normalized
+
+    def on_parse(self, execution_context: ExecutionContext) -> Iterator[None]:
+        if (
+            execution_context.query_src
+            and execution_context.graphql_document is None
+            and execution_context.operation is None
+        ):
+            normalized = self.normalize(execution_context.query_src)
+            if normalized is not None:
+                execution_context.query_src = normalized.text
+                execution_context.query_hash = normalized.hash
+        yield
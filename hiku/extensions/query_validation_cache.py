@@ -18,10 +18,12 @@ class QueryValidationCache(Extension):
     def on_validate(
         self, execution_context: ExecutionContext
     ) -> Iterator[None]:
-        execution_context.errors = self.cached_validator(
-            execution_context.graph,
-            execution_context.query,
-            execution_context.validators,
-        )
+        # queries read from templates are validated once per template
+        if execution_context.template is None:
+            execution_context.errors = self.cached_validator(
+                execution_context.graph,
+                execution_context.query,
+                execution_context.validators,
+            )
 
         yield
@@ -293,6 +293,7 @@ class Graph(_Graph):
         scalars: list[type[Scalar]] | None = None,
         inputs: list[Input] | None = None,
         is_async: bool = False,
+        max_batch_size: int | None = None,
     ):
         self.is_async = is_async
 
@@ -331,6 +332,7 @@ class Graph(_Graph):
             enums,
             scalars,
             inputs,
+            max_batch_size=max_batch_size,
         )
 
     @classmethod
@@ -352,4 +354,5 @@ class Graph(_Graph):
             scalars=other.scalars,
             inputs=other.inputs,
             is_async=other.is_async,
+            max_batch_size=other.max_batch_size,
         )
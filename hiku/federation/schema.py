@@ -32,6 +32,7 @@ class FederationV1EntityTransformer(GraphTransformer):
             obj.enums,
             obj.scalars,
             obj.inputs,
+            max_batch_size=obj.max_batch_size,
         )
 
 
@@ -580,6 +580,7 @@ class _StripGraph(GraphTransformer):
             obj.enums,
             obj.scalars,
             obj.inputs,
+            max_batch_size=obj.max_batch_size,
         )
 
     def visit_node(self, obj: Node) -> Node:
@@ -41,6 +41,7 @@ from .types import (
     UnionRefMeta,
 )
 from .utils import Const, const
+from .utils.serialize import serialize
 
 if t.TYPE_CHECKING:
     from .query import Field as QueryField
@@ -228,6 +229,7 @@ class Field(AbstractField):
         description: str | None = None,
         directives: list[SchemaDirective] | None = None,
         deprecated: str | None = None,
+        max_batch_size: int | None = None,
     ):
         """
         :param str name: name of the field
@@ -237,6 +239,9 @@ class Field(AbstractField):
         :param description: description of the field
         :param directives: list of directives for the field
         :param deprecated: deprecation reason
+        :param max_batch_size: maximum number of ids to pass into ``func``
+            at once, larger lists of ids are split into chunks, which are
+            loaded concurrently
         """
 
         if directives is None:
@@ -251,6 +256,7 @@ class Field(AbstractField):
         self.options = options or ()
         self.description = description
         self.directives = directives
+        self.max_batch_size = max_batch_size
         self.type_info = get_field_info(type_)
 
     def __repr__(self) -> str:
@@ -540,6 +546,7 @@ class Link(AbstractLink):
         description: str | None = None,
         directives: list[SchemaDirective] | None = None,
         deprecated: str | None = None,
+        max_batch_size: int | None = None,
     ): ...
 
     @t.overload
@@ -554,6 +561,7 @@ class Link(AbstractLink):
         description: str | None = None,
         directives: list[SchemaDirective] | None = None,
         deprecated: str | None = None,
+        max_batch_size: int | None = None,
     ): ...
 
     @t.overload
@@ -568,6 +576,7 @@ class Link(AbstractLink):
         description: str | None = None,
         directives: list[SchemaDirective] | None = None,
         deprecated: str | None = None,
+        max_batch_size: int | None = None,
     ): ...
 
     @t.overload
@@ -582,6 +591,7 @@ class Link(AbstractLink):
         description: str | None = None,
         directives: list[SchemaDirective] | None = None,
         deprecated: str | None = None,
+        max_batch_size: int | None = None,
     ): ...
 
     def __init__(  # type: ignore[no-untyped-def]
@@ -595,6 +605,7 @@ class Link(AbstractLink):
         description=None,
         directives=None,
         deprecated=None,
+        max_batch_size=None,
     ):
         """
         :param name: name of the link
@@ -606,6 +617,9 @@ class Link(AbstractLink):
         :param description: description of the link
         :param directives: list of directives for the link
         :param deprecated: deprecation reason for the link
+        :param max_batch_size: maximum number of required values to pass
+            into ``func`` at once, larger lists are split into chunks,
+            which are loaded concurrently
         """
         type_enum, node = get_link_type_enum(type_)
 
@@ -624,6 +638,7 @@ class Link(AbstractLink):
         self.options = options or ()
         self.description = description
         self.directives = directives
+        self.max_batch_size = max_batch_size
         self.type_info = get_link_type(type_)
 
     def __repr__(self) -> str:
@@ -675,6 +690,8 @@ class Interface(AbstractBase):
         self.name = name
         self.fields = fields
         self.description = description
+        #: resolvers of the fields and links, populated by the graph
+        self.resolvers: dict[str, Resolver] = {}
 
     def __repr__(self) -> str:
         return "{}({!r}, {!r}, ...)".format(
@@ -688,6 +705,13 @@ class Interface(AbstractBase):
     def accept(self, visitor: "AbstractGraphVisitor") -> t.Any:
         return visitor.visit_interface(self)
 
+    def copy(self) -> "Interface":
+        return Interface(
+            name=self.name,
+            fields=self.fields[:],
+            description=self.description,
+        )
+
 
 class Input(AbstractBase):
     def __init__(
@@ -753,6 +777,8 @@ class Node(AbstractNode):
         self.description = description
         self.directives: tuple[SchemaDirective, ...] = tuple(directives or ())
         self.implements = tuple(implements or [])
+        #: resolvers of the fields and links, populated by the graph
+        self.resolvers: dict[str, Resolver] = {}
 
     def __repr__(self) -> str:
         return "{}({!r}, {!r}, ...)".format(
@@ -810,6 +836,183 @@ class Root(Node):
         return visitor.visit_root(self)
 
 
+OptionParser = t.Callable[[t.Any], t.Any]
+
+
+class OptionSpec:
+    """Precomputed option parsing rules
+
+    :param name: name of the option
+    :param default: default option value
+    :param optional: whether the option is optional
+    :param skip_missing: do not pass optional option if it's value is missing
+    :param parse: function to parse option value or ``None``
+    """
+
+    __slots__ = ("name", "default", "optional", "skip_missing", "parse")
+
+    def __init__(
+        self,
+        name: str,
+        default: t.Any,
+        optional: bool,
+        skip_missing: bool,
+        parse: OptionParser | None,
+    ) -> None:
+        self.name = name
+        self.default = default
+        self.optional = optional
+        self.skip_missing = skip_missing
+        self.parse = parse
+
+
+def _serializer(
+    type_: GenericMeta | ScalarMeta | None, callback: OptionParser
+) -> OptionParser:
+    def parse(value: t.Any) -> t.Any:
+        return serialize(type_, value, callback)
+
+    return parse
+
+
+def _input_parser(input_type: "Input", optional: bool) -> OptionParser:
+    def parse(value: t.Any) -> t.Any:
+        if value is None and optional:
+            # if value is None for optional option, return it as None
+            return None
+        for arg in input_type.arguments:
+            if arg.name not in value and arg.default is not Nothing:
+                value[arg.name] = arg.default
+        return value
+
+    return parse
+
+
+def get_option_spec(graph: "Graph", option: Option) -> OptionSpec:
+    optional = isinstance(option.type, OptionalMeta)
+    skip_missing = False
+    parse: OptionParser | None = None
+    type_info = option.type_info
+    if type_info and type_info.type_enum is FieldType.ENUM:
+        parse = _serializer(
+            option.type, graph.enums_map[type_info.type_name].parse
+        )
+    elif type_info and type_info.type_enum is FieldType.CUSTOM_SCALAR:
+        parse = _serializer(
+            option.type, graph.scalars_map[type_info.type_name].parse
+        )
+    elif type_info and type_info.type_enum is FieldType.SCALAR and option.type:
+        parse = option.type.parse
+    elif type_info and type_info.type_enum is FieldType.INPUT and option.type:
+        # if value not provided for optional option, do not add it
+        # to the options dict to notify value absence
+        skip_missing = optional
+        parse = _input_parser(graph.inputs_map[type_info.type_name], optional)
+    return OptionSpec(
+        option.name, option.default, optional, skip_missing, parse
+    )
+
+
+class Resolver:
+    """Resolver descriptor of the field or link
+
+    Computed once when graph is created, so the engine does not need to
+    inspect resolver functions on every request.
+
+    :param obj: graph field or link
+    :param func: function to call, for fields it is a function which loads
+        data for a group of fields (subquery for fields from
+        :py:class:`hiku.sources.graph.SubGraph`)
+    :param pass_context: whether to pass context as a first argument
+    :param subquery: whether function is a subquery
+    :param requires: names of the fields, required by link
+    :param options: option parsing rules
+    :param max_batch_size: maximum number of ids to pass into function at once
+    """
+
+    __slots__ = (
+        "obj",
+        "func",
+        "pass_context",
+        "subquery",
+        "requires",
+        "options",
+        "max_batch_size",
+    )
+
+    def __init__(
+        self,
+        obj: Field | Link,
+        options: tuple[OptionSpec, ...],
+        max_batch_size: int | None = None,
+    ) -> None:
+        func = obj.func
+        requires: tuple[str, ...] = ()
+        if isinstance(obj, Field):
+            func = getattr(func, "__subquery__", func)
+        elif isinstance(obj.requires, list):
+            requires = tuple(obj.requires)
+        elif obj.requires:
+            requires = (obj.requires,)
+
+        self.obj: t.Any = obj
+        self.func: t.Callable = func
+        self.pass_context: bool = getattr(func, "__pass_context__", False)
+        self.subquery = hasattr(func, "__subquery__")
+        self.requires = requires
+        self.options = options
+        self.max_batch_size = max_batch_size
+
+    def __repr__(self) -> str:
+        return "<{}: {!r}>".format(self.__class__.__name__, self.obj)
+
+    def parse_options(self, options: dict[str, t.Any] | None) -> dict:
+        """Returns parsed query options with defaults applied"""
+        options = options or {}
+        parsed = {}
+        for spec in self.options:
+            value = options.get(spec.name, spec.default)
+            if value is Nothing:
+                if not spec.optional:
+                    raise TypeError(
+                        'Required option "{}" for {!r} was not provided'.format(
+                            spec.name, self.obj
+                        )
+                    )
+                elif spec.skip_missing:
+                    continue
+            parsed[spec.name] = (
+                spec.parse(value) if spec.parse is not None else value
+            )
+        return parsed
+
+
+def get_resolvers(
+    graph: "Graph", fields: t.Iterable[Field | Link]
+) -> dict[str, Resolver]:
+    resolvers = {
+        f.name: Resolver(
+            f,
+            tuple(get_option_spec(graph, op) for op in f.options),
+            f.max_batch_size or graph.max_batch_size,
+        )
+        for f in fields
+    }
+    # fields with the same function are loaded together, so the smallest
+    # batch size is used for all of them
+    batch_sizes: dict[t.Callable, int] = {}
+    for resolver in resolvers.values():
+        if isinstance(resolver.obj, Field) and resolver.max_batch_size:
+            batch_sizes[resolver.func] = min(
+                resolver.max_batch_size,
+                batch_sizes.get(resolver.func, resolver.max_batch_size),
+            )
+    for resolver in resolvers.values():
+        if isinstance(resolver.obj, Field) and resolver.func in batch_sizes:
+            resolver.max_batch_size = batch_sizes[resolver.func]
+    return resolvers
+
+
 class AbstractGraph(AbstractBase, ABC):
     pass
 
@@ -840,9 +1043,11 @@ class Graph(AbstractGraph):
         enums: list[BaseEnum] | None = None,
         scalars: list[type[Scalar]] | None = None,
         inputs: list[Input] | None = None,
+        max_batch_size: int | None = None,
     ):
         """
         :param items: list of nodes
+        :param max_batch_size: default ``max_batch_size`` of fields and links
         """
         from .validate.graph import GraphValidator
 
@@ -867,8 +1072,12 @@ class Graph(AbstractGraph):
 
         self.items = GraphInit.init(items)
         self.unions = unions
-        self.interfaces = interfaces
-        self.interfaces_types = collect_interfaces_types(self.items, interfaces)
+        # interfaces are copied as nodes, because they keep resolvers of
+        # this graph
+        self.interfaces = [i.copy() for i in interfaces]
+        self.interfaces_types = collect_interfaces_types(
+            self.items, self.interfaces
+        )
         self.enums: list[BaseEnum] = enums
         self.scalars = scalars
         self.inputs = inputs
@@ -884,6 +1093,11 @@ class Graph(AbstractGraph):
         self.directives: tuple[type[SchemaDirective], ...] = tuple(
             directives or ()
         )
+        self.max_batch_size = max_batch_size
+        for node in chain(self.nodes, [self.root]):
+            node.resolvers = get_resolvers(self, node.fields)
+        for interface in self.interfaces:
+            interface.resolvers = get_resolvers(self, interface.fields)
 
     def __repr__(self) -> str:
         return "{}({!r})".format(self.__class__.__name__, self.items)
@@ -952,6 +1166,7 @@ class Graph(AbstractGraph):
             enums=other.enums,
             scalars=other.scalars,
             inputs=other.inputs,
+            max_batch_size=other.max_batch_size,
         )
 
 
@@ -1066,6 +1281,7 @@ class GraphTransformer(AbstractGraphVisitor):
             options=[self.visit(op) for op in obj.options],
             description=obj.description,
             directives=obj.directives,
+            max_batch_size=obj.max_batch_size,
         )
 
     def visit_link(self, obj: Link) -> Link:
@@ -1077,6 +1293,7 @@ class GraphTransformer(AbstractGraphVisitor):
             options=[self.visit(op) for op in obj.options],
             description=obj.description,
             directives=obj.directives,
+            max_batch_size=obj.max_batch_size,
         )
 
     def visit_node(self, obj: Node) -> Node:
@@ -1128,6 +1345,7 @@ class GraphTransformer(AbstractGraphVisitor):
             obj.enums,
             obj.scalars,
             obj.inputs,
+            max_batch_size=obj.max_batch_size,
         )
 
 
@@ -1111,6 +1111,7 @@ class GraphQLIntrospection(GraphTransformer):
             enums=obj.enums,
             scalars=obj.scalars,
             inputs=obj.inputs,
+            max_batch_size=obj.max_batch_size,
         )
 
 
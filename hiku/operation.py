@@ -1,11 +1,14 @@
 import enum
 
-from typing import TYPE_CHECKING
+from typing import Any, TYPE_CHECKING
 
 from graphql.language import ast
 
+from .query import Fragment, Link, Node, Variable
+
 if TYPE_CHECKING:
-    from hiku.query import Node
+    from .graph import Graph
+    from .validate.query import VariableUsage
 
 
 class OperationType(enum.Enum):
@@ -33,3 +36,184 @@ class Operation:
         self.query = query
         #: optional name of the operation
         self.name = name
+
+
+#: Marks variable definition without default value
+NO_DEFAULT = object()
+
+
+class VariableDefinition:
+    """Represents variable definition of the operation"""
+
+    __slots__ = ("name", "default", "required")
+
+    def __init__(self, name: str, default: Any, required: bool) -> None:
+        #: name of the variable
+        self.name = name
+        #: default value or :py:data:`NO_DEFAULT`
+        self.default = default
+        #: variable type is non-null
+        self.required = required
+
+
+def _has_variables(value: Any) -> bool:
+    if isinstance(value, Variable):
+        return True
+    elif isinstance(value, list):
+        return any(_has_variables(i) for i in value)
+    elif isinstance(value, dict):
+        return any(_has_variables(i) for i in value.values())
+    return False
+
+
+def _substitute(value: Any, variables: dict[str, Any]) -> Any:
+    if isinstance(value, Variable):
+        return variables[value.name]
+    elif isinstance(value, list):
+        return [_substitute(i, variables) for i in value]
+    elif isinstance(value, dict):
+        return {k: _substitute(v, variables) for k, v in value.items()}
+    return value
+
+
+class QueryTemplate:
+    """Represents requested GraphQL operation, which doesn't depend on
+    variables values: options values contain :py:class:`hiku.query.Variable`
+    placeholders, which are replaced with variables values by :py:meth:`bind`
+
+    Values of the variables, used in ``@skip``, ``@include`` and ``@cached``
+    directives, define structure of the query, so they are stored in the
+    template, see :py:meth:`matches`.
+    """
+
+    __slots__ = (
+        "type",
+        "query",
+        "name",
+        "variables",
+        "directive_values",
+        "document",
+        "validation",
+        "_parametric",
+    )
+
+    def __init__(
+        self,
+        type_: OperationType,
+        query: Node,
+        name: str | None,
+        variables: list[VariableDefinition],
+        directive_values: dict[str, Any],
+        document: ast.DocumentNode | None = None,
+    ) -> None:
+        #: type of the operation
+        self.type = type_
+        #: operation's query with placeholders
+        self.query = query
+        #: optional name of the operation
+        self.name = name
+        #: variables definitions
+        self.variables = variables
+        #: values of the variables, which were used in directives
+        self.directive_values = directive_values
+        #: GraphQL document, which was used to read the template
+        self.document = document
+        #: results of the builtin validation, cached by graph, custom
+        #: validators are not cached, because they may check options values
+        self.validation: dict[
+            "Graph", tuple[list[str], list["VariableUsage"], bool]
+        ] = {}
+        # ids of the query objects, which contain placeholders
+        self._parametric: set[int] = set()
+        self._collect(query)
+
+    def _collect(self, node: Node) -> bool:
+        found = False
+        for field in node.fields:
+            parametric = field.options is not None and _has_variables(
+                field.options
+            )
+            if isinstance(field, Link) and self._collect(field.node):
+                parametric = True
+            if parametric:
+                self._parametric.add(id(field))
+                found = True
+        for fr in node.fragments:
+            if self._collect(fr.node):
+                self._parametric.add(id(fr))
+                found = True
+        if found:
+            self._parametric.add(id(node))
+        return found
+
+    def coerce(self, variables: dict[str, Any] | None) -> dict[str, Any]:
+        """Returns values of all defined variables, taking into account
+        their default values
+
+        :raises TypeError: when required variable is not provided
+        """
+        variables = variables or {}
+        values = {}
+        for var in self.variables:
+            try:
+                value = variables[var.name]
+            except KeyError:
+                if var.default is not NO_DEFAULT:
+                    value = var.default
+                elif var.required:
+                    raise TypeError(
+                        'Variable "{}" is not provided for query {}'.format(
+                            var.name, self.name or "<unnamed>"
+                        )
+                    )
+                else:
+                    value = None
+            values[var.name] = value
+        return values
+
+    def matches(self, variables: dict[str, Any] | None) -> bool:
+        """Checks that template can be used with provided variables"""
+        if not self.directive_values:
+            return True
+        try:
+            values = self.coerce(variables)
+        except TypeError:
+            return False
+        return all(
+            values[name] == value
+            for name, value in self.directive_values.items()
+        )
+
+    def _bind_node(self, node: Node, values: dict[str, Any]) -> Node:
+        if id(node) not in self._parametric:
+            return node
+
+        fields: list[Any] = []
+        for field in node.fields:
+            if id(field) in self._parametric:
+                kwargs: dict[str, Any] = {}
+                if field.options is not None:
+                    kwargs["options"] = _substitute(field.options, values)
+                if isinstance(field, Link):
+                    kwargs["node"] = self._bind_node(field.node, values)
+                field = field.copy(**kwargs)
+            fields.append(field)
+
+        fragments: list[Fragment] = []
+        for fr in node.fragments:
+            if id(fr) in self._parametric:
+                fr = fr.copy(node=self._bind_node(fr.node, values))
+            fragments.append(fr)
+
+        return Node(fields, fragments, ordered=node.ordered)
+
+    def bind(self, variables: dict[str, Any] | None) -> Operation:
+        """Returns operation with variables values in place of placeholders,
+        query objects without placeholders are shared between operations
+
+        :raises TypeError: when required variable is not provided
+        """
+        values = self.coerce(variables)
+        return Operation(
+            self.type, self._bind_node(self.query, values), self.name
+        )
@@ -34,10 +34,14 @@ And query result will look like this:
     }
 """
 
+import enum
+import json
 import typing as t
-import hashlib
+import threading
 
-from functools import cached_property
+from uuid import UUID
+from decimal import Decimal
+from datetime import date, datetime, time
 from itertools import chain
 from collections import (
     OrderedDict,
@@ -51,79 +55,206 @@ from .compat import TypeAlias
 T = t.TypeVar("T", bound="Base")
 
 
-def _compute_hash(obj: t.Any) -> int:
-    if isinstance(obj, dict):
-        return hash(
-            tuple(
-                (_compute_hash(k), _compute_hash(v))
-                for k, v in sorted(obj.items())
-            )
-        )
-    if isinstance(obj, list):
-        return hash(tuple(_compute_hash(i) for i in obj))
+def _encode_default(obj: t.Any) -> t.Any:
+    if isinstance(obj, Variable):
+        # "$" can't be used in GraphQL names, so these keys can't collide
+        # with input objects keys
+        return {"$variable": obj.name}
+    if isinstance(obj, (set, frozenset)):
+        return sorted(obj, key=repr)
     if isinstance(obj, bytes):
-        return int(hashlib.sha1(obj).hexdigest(), 16)
-    if isinstance(obj, str):
-        return int(hashlib.sha1(obj.encode("utf-8")).hexdigest(), 16)
-    return hash(obj)
+        return {"$bytes": obj.hex()}
+    if isinstance(obj, enum.Enum):
+        return {"$enum": "{}.{}".format(obj.__class__.__qualname__, obj.name)}
+    if isinstance(obj, (datetime, date, time)):
+        # datetime is a subclass of date, so tags are taken from the type
+        return {"${}".format(type(obj).__name__): obj.isoformat()}
+    if isinstance(obj, Decimal):
+        return {"$decimal": str(obj)}
+    if isinstance(obj, UUID):
+        return {"$uuid": str(obj)}
+    # other values should have deterministic repr to be stable between
+    # processes, hash and id are not used because they aren't
+    return {"$object": "{}:{!r}".format(obj.__class__.__qualname__, obj)}
+
+
+_options_encoder = json.JSONEncoder(
+    ensure_ascii=False,
+    separators=(",", ":"),
+    sort_keys=True,
+    default=_encode_default,
+)
+
+
+def _normalize(obj: t.Any) -> t.Any:
+    if isinstance(obj, dict):
+        items = [
+            [_options_encoder.encode(_normalize(k)), _normalize(v)]
+            for k, v in obj.items()
+        ]
+        items.sort(key=lambda item: item[0])
+        return {"$map": items}
+    if isinstance(obj, (list, tuple)):
+        return [_normalize(i) for i in obj]
+    return obj
+
+
+def value_key(value: t.Any) -> str:
+    """Returns canonical representation of the value (e.g. options of the
+    field): equal values have equal keys and different values have
+    different keys.
+
+    Keys are stable between processes, so they can be used to build cache
+    keys. Mapping keys of the scalar types are encoded as in JSON.
+    ``datetime``, ``date``, ``time``, ``Decimal`` and ``UUID`` values are
+    encoded using their string representation, values of other types are
+    encoded using their ``repr``, which should be deterministic.
+    """
+    try:
+        return _options_encoder.encode(value)
+    except TypeError:
+        # mappings with keys of other types than str
+        return _options_encoder.encode(_normalize(value))
+
+
+class Variable:
+    """Placeholder for the value of the query variable in the options of
+    the query template, see :py:class:`hiku.operation.QueryTemplate`
+    """
+
+    __slots__ = ("name",)
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+    def __repr__(self) -> str:
+        return "{}({!r})".format(self.__class__.__name__, self.name)
+
+    def __eq__(self, other: t.Any) -> bool:
+        return self.__class__ is other.__class__ and self.name == other.name
+
+    def __ne__(self, other: t.Any) -> bool:
+        return not self.__eq__(other)
+
+    def __hash__(self) -> int:
+        return hash((self.__class__, self.name))
+
+
+def _set(obj: t.Any, name: str, value: t.Any) -> t.Any:
+    object.__setattr__(obj, name, value)
+    return value
 
 
 class Base:
+    """Query objects are immutable, their structural hash is computed once
+    on construction
+    """
+
+    __slots__ = ()
     __attrs__: tuple[str, ...] = ()
+    _hash: int
 
     def __repr__(self) -> str:
         kwargs = ", ".join(
-            "{}={!r}".format(attr, self.__dict__[attr])
+            "{}={!r}".format(attr, getattr(self, attr))
             for attr in self.__attrs__
         )
         return "{}({})".format(self.__class__.__name__, kwargs)
 
     def __eq__(self, other: t.Any) -> bool:
+        if self is other:
+            return True
         return self.__class__ is other.__class__ and all(
-            self.__dict__[attr] == other.__dict__[attr]
+            getattr(self, attr) == getattr(other, attr)
             for attr in self.__attrs__
         )
 
     def __ne__(self, other: t.Any) -> bool:
         return not self.__eq__(other)
 
+    def __hash__(self) -> int:
+        return self._hash
+
+    def __setattr__(self, name: str, value: t.Any) -> None:
+        raise AttributeError(
+            "{} object is immutable".format(self.__class__.__name__)
+        )
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(
+            "{} object is immutable".format(self.__class__.__name__)
+        )
+
+    def __reduce__(self) -> tuple:
+        return (
+            self.__class__,
+            tuple(getattr(self, attr) for attr in self.__attrs__),
+        )
+
     def copy(self: T, **kwargs: t.Any) -> T:
-        obj = self.__class__.__new__(self.__class__)
-        obj.__dict__.update(
-            (attr, kwargs.get(attr, self.__dict__[attr]))
-            for attr in self.__attrs__
+        return self.__class__(
+            **{
+                attr: kwargs.get(attr, getattr(self, attr))
+                for attr in self.__attrs__
+            }
         )
-        return obj
 
 
 class FieldBase(Base):
+    __slots__ = (
+        "name",
+        "options",
+        "alias",
+        "directives",
+        "result_key",
+        "options_key",
+        "options_hash",
+        "index_key",
+        "_hash",
+        "_directives_map",
+    )
+
     name: str
     options: dict[str, t.Any] | None
     alias: str | None
-
-    @cached_property
-    def result_key(self) -> str:
-        if self.alias is not None:
-            return self.alias
-        else:
-            return self.name
-
-    @cached_property
-    def options_hash(self) -> int | None:
-        if self.options:
-            return _compute_hash(self.options)
-        else:
-            return None
-
-    @cached_property
-    def index_key(self) -> str:
-        if self.options_hash is not None:
-            return "{}[{}]".format(self.name, self.options_hash)
+    directives: tuple[Directive, ...]
+    result_key: str
+    options_key: str | None
+    options_hash: int | None
+    index_key: str
+    _directives_map: OrderedDict
+
+    def _init(
+        self,
+        name: str,
+        options: dict[str, t.Any] | None,
+        alias: str | None,
+        directives: tuple[Directive, ...] | None,
+    ) -> int:
+        _set(self, "name", name)
+        _set(self, "options", options)
+        _set(self, "alias", alias)
+        _set(self, "directives", directives or ())
+        _set(self, "result_key", name if alias is None else alias)
+        key = _set(self, "options_key", value_key(options) if options else None)
+        if key is None:
+            _set(self, "options_hash", None)
+            index_key = _set(self, "index_key", name)
         else:
-            return self.name
+            _set(self, "options_hash", hash(key))
+            index_key = _set(self, "index_key", "{}({})".format(name, key))
+        return hash((index_key, alias))
 
-    def __hash__(self) -> int:
-        return hash(self.index_key)
+    @property
+    def directives_map(self) -> OrderedDict:
+        try:
+            return self._directives_map
+        except AttributeError:
+            directives = OrderedDict()
+            for d in self.directives:
+                if d.__directive_info__.name not in directives:
+                    directives[d.__directive_info__.name] = d
+            return _set(self, "_directives_map", directives)
 
 
 class Field(FieldBase):
@@ -134,6 +265,7 @@ class Field(FieldBase):
     :param optional alias: field's name in result
     """
 
+    __slots__ = ()
     __attrs__ = ("name", "options", "alias", "directives")
 
     def __init__(
@@ -143,18 +275,7 @@ class Field(FieldBase):
         alias: str | None = None,
         directives: tuple[Directive, ...] | None = None,
     ):
-        self.name = name
-        self.options = options
-        self.alias = alias
-        self.directives = directives or ()
-
-    @cached_property
-    def directives_map(self) -> OrderedDict:
-        directives = OrderedDict()
-        for d in self.directives:
-            if d.__directive_info__.name not in directives:
-                directives[d.__directive_info__.name] = d
-        return directives
+        _set(self, "_hash", self._init(name, options, alias, directives))
 
     def accept(self, visitor: "QueryVisitor") -> t.Any:
         return visitor.visit_field(self)
@@ -170,6 +291,7 @@ class Link(FieldBase):
     :param optional alias: link's name in result
     """
 
+    __slots__ = ("node",)
     __attrs__ = (
         "name",
         "node",
@@ -178,6 +300,8 @@ class Link(FieldBase):
         "directives",
     )
 
+    node: "Node"
+
     def __init__(
         self,
         name: str,
@@ -186,19 +310,9 @@ class Link(FieldBase):
         alias: str | None = None,
         directives: tuple[Directive, ...] | None = None,
     ):
-        self.name = name
-        self.node = node
-        self.options = options
-        self.alias = alias
-        self.directives = directives or ()
-
-    @cached_property
-    def directives_map(self) -> OrderedDict:
-        directives = OrderedDict()
-        for d in self.directives:
-            if d.__directive_info__.name not in directives:
-                directives[d.__directive_info__.name] = d
-        return directives
+        _set(self, "node", node)
+        key_hash = self._init(name, options, alias, directives)
+        _set(self, "_hash", hash((key_hash, node._hash)))
 
     def accept(self, visitor: "QueryVisitor") -> t.Any:
         return visitor.visit_link(self)
@@ -219,67 +333,164 @@ class Node(Base):
         in order or not
     """
 
+    __slots__ = (
+        "fields",
+        "fragments",
+        "ordered",
+        "_hash",
+        "_fields_map",
+        "_fragments_map",
+        "_result_map",
+    )
     __attrs__ = ("fields", "fragments", "ordered")
 
+    fields: tuple[FieldOrLink, ...]
+    fragments: tuple["Fragment", ...]
+    ordered: bool
+    _fields_map: FieldsMap
+    _fragments_map: FragmentMap
+    _result_map: OrderedDict
+
     def __init__(
         self,
         fields: t.Sequence[FieldOrLink],
         fragments: t.Sequence["Fragment"] | None = None,
         ordered: bool = False,
     ) -> None:
-        self.fields = list(fields)
-        self.fragments = list(fragments or [])
-        self.ordered = ordered
+        fields = _set(self, "fields", tuple(fields))
+        fragments = _set(self, "fragments", tuple(fragments or ()))
+        _set(self, "ordered", ordered)
+        _set(
+            self,
+            "_hash",
+            hash(
+                (
+                    tuple(f._hash for f in fields),
+                    tuple(fr._hash for fr in fragments),
+                    ordered,
+                )
+            ),
+        )
 
-    @cached_property
+    @property
     def fields_map(
         self,
     ) -> FieldsMap:
-        return OrderedDict((f.name, f) for f in self.fields)
+        try:
+            return self._fields_map
+        except AttributeError:
+            return _set(
+                self,
+                "_fields_map",
+                OrderedDict((f.name, f) for f in self.fields),
+            )
 
-    @cached_property
+    @property
     def fragments_map(self) -> FragmentMap:
         """Only named fragments"""
-        return OrderedDict(
-            (f.name, f) for f in self.fragments if f.name is not None
-        )
+        try:
+            return self._fragments_map
+        except AttributeError:
+            return _set(
+                self,
+                "_fragments_map",
+                OrderedDict(
+                    (f.name, f) for f in self.fragments if f.name is not None
+                ),
+            )
 
-    @cached_property
+    @property
     def result_map(self) -> OrderedDict:
-        return OrderedDict((f.result_key, f) for f in self.fields)
+        try:
+            return self._result_map
+        except AttributeError:
+            return _set(
+                self,
+                "_result_map",
+                OrderedDict((f.result_key, f) for f in self.fields),
+            )
 
     def accept(self, visitor: "QueryVisitor") -> t.Any:
         return visitor.visit_node(self)
 
-    def __hash__(self) -> int:
-        return hash(tuple(self.fields)) + hash(tuple(self.fragments))
-
 
 class Fragment(Base):
+    __slots__ = ("name", "type_name", "node", "_hash")
     __attrs__ = ("name", "type_name", "node")
 
+    name: str | None
+    type_name: str | None
+    node: Node
+
     def __init__(
         self,
         name: str | None,
         type_name: str | None,
         node: Node,
     ) -> None:
-        self.name = name  # if None, it's an inline fragment
-        self.type_name = type_name
-        self.node = node
+        _set(self, "name", name)  # if None, it's an inline fragment
+        _set(self, "type_name", type_name)
+        _set(self, "node", node)
+        _set(self, "_hash", hash((name, type_name, node._hash)))
 
     def accept(self, visitor: "QueryVisitor") -> t.Any:
         return visitor.visit_fragment(self)
 
-    def __hash__(self) -> int:
-        return hash(self.type_name) + hash(self.node)
 
+class QueryInterner:
+    """Keeps single instance of the structurally equal query objects, so
+    identical subtrees of the queries from different requests share the
+    same objects and their comparison is reduced to identity check
+
+    :param maxsize: how many query objects to keep
+    """
 
-KeyT = tuple[str, int | None, str | None]
+    def __init__(self, maxsize: int = 10000) -> None:
+        self.maxsize = maxsize
+        self._objects: OrderedDict[Base, Base] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._objects)
+
+    def intern(self, obj: T) -> T:
+        """Returns interned instance of the query object, interning all
+        it's nested objects
+        """
+        with self._lock:
+            return self._intern(obj)
+
+    def _lookup(self, obj: T) -> T:
+        try:
+            interned = self._objects[obj]
+        except KeyError:
+            self._objects[obj] = obj
+            if len(self._objects) > self.maxsize:
+                self._objects.popitem(last=False)
+            return obj
+        self._objects.move_to_end(obj)
+        return t.cast(T, interned)
+
+    def _intern(self, obj: t.Any) -> t.Any:
+        if obj.__class__ is Node:
+            fields = [self._intern(f) for f in obj.fields]
+            fragments = [self._intern(fr) for fr in obj.fragments]
+            if any(a is not b for a, b in zip(fields, obj.fields)) or any(
+                a is not b for a, b in zip(fragments, obj.fragments)
+            ):
+                obj = Node(fields, fragments, obj.ordered)
+        elif obj.__class__ is Link or obj.__class__ is Fragment:
+            node = self._intern(obj.node)
+            if node is not obj.node:
+                obj = obj.copy(node=node)
+        return self._lookup(obj)
+
+
+KeyT = tuple[str, str | None, str | None]
 
 
 def field_key(field: FieldOrLink) -> KeyT:
-    return (field.name, field.options_hash, field.alias)
+    return (field.name, field.options_key, field.alias)
 
 
 def _merge(
@@ -359,7 +570,8 @@ class QueryTransformer:
         return obj.accept(self)
 
     def visit_field(self, obj: Field) -> Field:
-        return obj.copy()
+        # query objects are immutable, so they can be shared
+        return obj
 
     def visit_link(self, obj: Link) -> Link:
         return obj.copy(node=self.visit(obj.node))
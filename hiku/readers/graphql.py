@@ -14,8 +14,14 @@ from graphql.language.parser import parse
 from hiku.utils import ImmutableDict
 
 from ..directives import Cached, Directive
-from ..operation import Operation, OperationType
-from ..query import Field, Fragment, Link, merge, Node
+from ..operation import (
+    NO_DEFAULT,
+    Operation,
+    OperationType,
+    QueryTemplate,
+    VariableDefinition,
+)
+from ..query import Field, Fragment, Link, merge, Node, Variable
 
 
 def parse_query(src: str) -> ast.DocumentNode:
@@ -127,6 +133,12 @@ class FragmentsCollector(NodeVisitor):
 
 
 class SelectionSetVisitMixin:
+    #: return placeholders instead of variables values in options
+    variable_placeholders: bool = False
+    #: names of the variables, used in directives
+    directive_variables: set[str] | None = None
+    _in_directive: bool = False
+
     def transform_fragment(self, name: str) -> Fragment | None:
         raise NotImplementedError(type(self))
 
@@ -141,13 +153,27 @@ class SelectionSetVisitMixin:
     def lookup_variable(self, name: str) -> Any:
         try:
             assert self.query_variables is not None
-            return self.query_variables[name]
+            value = self.query_variables[name]
         except KeyError:
             raise TypeError(
                 "Variable ${} is not defined in query {}".format(
                     name, self.query_name or "<unnamed>"
                 )
             )
+        if self.variable_placeholders:
+            if not self._in_directive:
+                return Variable(name)
+            # directives define structure of the query
+            assert self.directive_variables is not None
+            self.directive_variables.add(name)
+        return value
+
+    def _directive_value(self, obj: ast.ValueNode) -> Any:
+        self._in_directive = True
+        try:
+            return self.visit(obj)  # type: ignore[attr-defined]
+        finally:
+            self._in_directive = False
 
     def visit_selection_set(
         self, obj: ast.SelectionSetNode
@@ -173,7 +199,7 @@ class SelectionSetVisitMixin:
                     '@skip directive does not accept "{}" '
                     "argument".format(skip_arg.name.value)
                 )
-            return self.visit(skip_arg.value)  # type: ignore[attr-defined]
+            return self._directive_value(skip_arg.value)
 
         include = next(
             (d for d in obj.directives if d.name.value == "include"), None
@@ -190,7 +216,7 @@ class SelectionSetVisitMixin:
                     '@include directive does not accept "{}" '
                     "argument".format(include_arg.name.value)
                 )
-            return not self.visit(include_arg.value)  # type: ignore[attr-defined] # noqa: E501
+            return not self._directive_value(include_arg.value)
 
         return None
 
@@ -207,22 +233,24 @@ class SelectionSetVisitMixin:
         if cached is None:
             return None
 
-        if len(cached.arguments) != 1:
-            raise TypeError(
-                "@cached directive accepts exactly one "
-                "argument, {} provided".format(len(cached.arguments))
-            )
-        cached_arg = cached.arguments[0]
-        if cached_arg.name.value != "ttl":
-            raise TypeError(
-                '@cached directive does not accept "{}" '
-                "argument".format(cached_arg.name.value)
-            )
-        ttl = self.visit(cached_arg.value)  # type: ignore[attr-defined]
+        arguments = {}
+        for arg in cached.arguments:
+            if arg.name.value not in ("ttl", "stale"):
+                raise TypeError(
+                    '@cached directive does not accept "{}" '
+                    "argument".format(arg.name.value)
+                )
+            arguments[arg.name.value] = self._directive_value(arg.value)
+        if "ttl" not in arguments:
+            raise TypeError("@cached directive requires ttl argument")
+        ttl = arguments["ttl"]
         if not isinstance(ttl, int):
             raise TypeError("@cached ttl argument must be an integer")
+        stale = arguments.get("stale")
+        if stale is not None and not isinstance(stale, int):
+            raise TypeError("@cached stale argument must be an integer")
 
-        return Cached(ttl=ttl)
+        return Cached(ttl=ttl, stale=stale)
 
     def _collect_fields(
         self,
@@ -338,12 +366,19 @@ class FragmentsTransformer(SelectionSetVisitMixin, NodeVisitor):
     query_variables: dict = {}
 
     def __init__(
-        self, document: ast.DocumentNode, query_name: str, query_variables: dict
+        self,
+        document: ast.DocumentNode,
+        query_name: str,
+        query_variables: dict,
+        variable_placeholders: bool = False,
+        directive_variables: set[str] | None = None,
     ):
         collector = FragmentsCollector()
         collector.visit(document)
         self.query_name = query_name
         self.query_variables = query_variables
+        self.variable_placeholders = variable_placeholders
+        self.directive_variables = directive_variables
         self.fragments_map = collector.fragments_map
         self.cache: dict[str, Node] = {}
         self.pending_fragments: set[str] = set()
@@ -387,9 +422,13 @@ class GraphQLTransformer(SelectionSetVisitMixin, NodeVisitor):
         self,
         document: ast.DocumentNode,
         variables: dict[str, Any] | None = None,
+        variable_placeholders: bool = False,
     ):
         self.document = document
         self.variables = variables
+        self.variable_placeholders = variable_placeholders
+        self.directive_variables = set()
+        self.variable_definitions: list[VariableDefinition] = []
 
     @classmethod
     def transform(
@@ -411,13 +450,25 @@ class GraphQLTransformer(SelectionSetVisitMixin, NodeVisitor):
         variables = self.variables or {}
         query_name = obj.name.value if obj.name else "<unnamed>"
         query_variables = {}
+        self.variable_definitions = []
         for var_defn in obj.variable_definitions or ():
             name = var_defn.variable.name.value
+            if var_defn.default_value is not None:
+                default = self.visit(var_defn.default_value)
+            else:
+                default = NO_DEFAULT
+            self.variable_definitions.append(
+                VariableDefinition(
+                    name,
+                    default,
+                    isinstance(var_defn.type, ast.NonNullTypeNode),
+                )
+            )
             try:
                 value = variables[name]  # TODO: check variable type
             except KeyError:
-                if var_defn.default_value is not None:
-                    value = self.visit(var_defn.default_value)
+                if default is not NO_DEFAULT:
+                    value = default
                 elif isinstance(var_defn.type, ast.NonNullTypeNode):
                     raise TypeError(
                         'Variable "{}" is not provided for query {}'.format(
@@ -432,7 +483,11 @@ class GraphQLTransformer(SelectionSetVisitMixin, NodeVisitor):
         assert self.query_name is not None
         self.query_variables = query_variables
         self.fragments_transformer = FragmentsTransformer(
-            self.document, self.query_name, self.query_variables
+            self.document,
+            self.query_name,
+            self.query_variables,
+            self.variable_placeholders,
+            self.directive_variables,
         )
         ordered = obj.operation is ast.OperationType.MUTATION
         try:
@@ -480,6 +535,64 @@ def read(
     return GraphQLTransformer.transform(doc, op, variables)
 
 
+def _operation_type(op: ast.OperationDefinitionNode) -> OperationType:
+    type_ = cast(
+        OperationType | None,
+        (OperationType._value2member_map_.get(op.operation)),
+    )
+    if type_ is None:
+        raise TypeError("Unsupported operation type: {}".format(op.operation))
+    return type_
+
+
+def read_template(
+    src: str | ast.DocumentNode,
+    variables: dict[str, Any] | ImmutableDict | None = None,
+    operation_name: str | None = None,
+) -> QueryTemplate:
+    """Reads an operation from the GraphQL document as a template, which
+    can be reused for different values of variables
+
+    Example:
+
+    .. code-block:: python
+
+        template = read_template('query($id: ID!) { user(id: $id) { name } }')
+        op = template.bind({"id": "1"})
+
+    :param src: GraphQL query or parsed document
+    :param variables: variables values, only values of the variables used in
+                      the ``@skip``, ``@include`` and ``@cached`` directives
+                      are stored in the template
+    :param str operation_name: Name of the operation to read
+    :return: :py:class:`hiku.operation.QueryTemplate`
+    """
+    if isinstance(src, str):
+        doc = parse_query(src)
+    elif isinstance(src, ast.DocumentNode):
+        doc = src
+    else:
+        raise TypeError("Unsupported type: {}".format(type(src)))
+
+    op = get_operation(doc, operation_name=operation_name)
+    transformer = GraphQLTransformer(doc, variables, variable_placeholders=True)
+    query = transformer.visit(op)
+    template = QueryTemplate(
+        _operation_type(op),
+        query,
+        op.name.value if op.name else None,
+        transformer.variable_definitions,
+        {},
+        doc,
+    )
+    if transformer.directive_variables:
+        values = template.coerce(variables)
+        template.directive_values = {
+            name: values[name] for name in transformer.directive_variables
+        }
+    return template
+
+
 def read_operation(
     src: str | ast.DocumentNode,
     variables: dict[str, Any] | ImmutableDict | None = None,
@@ -506,12 +619,5 @@ def read_operation(
 
     op = get_operation(doc, operation_name=operation_name)
     query = GraphQLTransformer.transform(doc, op, variables)
-    type_ = cast(
-        OperationType | None,
-        (OperationType._value2member_map_.get(op.operation)),
-    )
     name = op.name.value if op.name else None
-    if type_ is None:
-        raise TypeError("Unsupported operation type: {}".format(op.operation))
-
-    return Operation(type_, query, name)
+    return Operation(_operation_type(op), query, name)
@@ -0,0 +1,533 @@
+"""
+hiku.readers.graphql_fast
+~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Reads GraphQL queries directly into :py:class:`hiku.query.Node`, without
+building graphql-core AST.
+
+Document is tokenized once using single regular expression and read by
+recursive descent parser. Documents, which are not supported by this reader
+(block strings, type system definitions, syntax errors, invalid directives,
+undefined variables and fragments, etc.) are read using
+:py:mod:`hiku.readers.graphql`, so results and errors are always the same.
+
+"""
+
+import json
+import re
+from typing import Any
+
+from ..directives import Cached, Directive
+from ..operation import (
+    NO_DEFAULT,
+    Operation,
+    OperationType,
+    QueryTemplate,
+    VariableDefinition,
+)
+from ..query import Field, Fragment, Link, merge, Node, Variable
+from . import graphql
+
+_TOKEN_RE = re.compile(
+    r"""
+    (?P<ignored>[ \t\n\r,\ufeff]+|\#[^\n\r]*)
+    |(?P<punct>\.\.\.|[!$&():=@\[\]{|}])
+    |(?P<name>[_A-Za-z][_0-9A-Za-z]*)
+    |(?P<float>-?(?:0|[1-9][0-9]*)
+        (?:\.[0-9]+(?:[eE][+-]?[0-9]+)?|[eE][+-]?[0-9]+)
+        (?![_A-Za-z0-9.]))
+    |(?P<int>-?(?:0|[1-9][0-9]*)(?![_A-Za-z0-9.]))
+    |(?P<block>\"\"\")
+    |(?P<string>"(?:[^"\\\x00-\x08\x0a-\x1f]|\\.)*")
+    """,
+    re.VERBOSE,
+)
+
+_EOF = "<EOF>"
+
+_OPERATION_TYPES = {
+    "query": OperationType.QUERY,
+    "mutation": OperationType.MUTATION,
+    "subscription": OperationType.SUBSCRIPTION,
+}
+
+_Directives = list[tuple[str, int]] | None
+
+
+class Unsupported(Exception):
+    """Document can't be read by this reader"""
+
+
+def _tokenize(src: str) -> tuple[list[str], list[Any]]:
+    kinds = []
+    values: list[Any] = []
+    pos = 0
+    for match in _TOKEN_RE.finditer(src):
+        if match.start() != pos:
+            raise Unsupported("Unexpected character")
+        pos = match.end()
+        kind = match.lastgroup
+        if kind == "ignored":
+            continue
+        elif kind == "punct":
+            kinds.append(match.group())
+            values.append(None)
+        elif kind == "string":
+            raw = match.group()
+            if "\\" in raw:
+                try:
+                    values.append(json.loads(raw, strict=False))
+                except ValueError:
+                    raise Unsupported("Unsupported escape sequence")
+            else:
+                values.append(raw[1:-1])
+            kinds.append(kind)
+        elif kind == "block":
+            raise Unsupported("Block strings are not supported")
+        else:
+            assert kind is not None
+            kinds.append(kind)
+            values.append(match.group())
+    if pos != len(src):
+        raise Unsupported("Unexpected character")
+    kinds.append(_EOF)
+    values.append(None)
+    return kinds, values
+
+
+class _Reader:
+    def __init__(
+        self,
+        src: str,
+        variables: dict[str, Any] | None,
+        operation_name: str | None,
+        variable_placeholders: bool = False,
+    ) -> None:
+        self._kinds, self._values = _tokenize(src)
+        self._pos = 0
+        self._variables = variables or {}
+        self._operation_name = operation_name
+        self._placeholders = variable_placeholders
+        self._in_directive = False
+        self._query_variables: dict[str, Any] = {}
+        self._fragments: dict[str, tuple[str, int]] = {}
+        self._fragments_cache: dict[str, Node] = {}
+        self._pending_fragments: set[str] = set()
+        self.directive_variables: set[str] = set()
+        self.variable_definitions: list[VariableDefinition] = []
+
+    def _expect(self, kind: str) -> Any:
+        if self._kinds[self._pos] != kind:
+            raise Unsupported("Unexpected token")
+        value = self._values[self._pos]
+        self._pos += 1
+        return value
+
+    def _lookup(self, name: str) -> Any:
+        try:
+            value = self._query_variables[name]
+        except KeyError:
+            raise Unsupported("Undefined variable")
+        if self._placeholders:
+            if not self._in_directive:
+                return Variable(name)
+            self.directive_variables.add(name)
+        return value
+
+    def _value(self, const: bool, build: bool) -> Any:
+        kind = self._kinds[self._pos]
+        value = self._values[self._pos]
+        self._pos += 1
+        if kind == "name":
+            if value == "true":
+                return True
+            elif value == "false":
+                return False
+            elif value == "null":
+                return None
+            return value
+        elif kind == "string":
+            return value
+        elif kind == "int":
+            return int(value) if build else None
+        elif kind == "float":
+            return float(value) if build else None
+        elif kind == "$" and not const:
+            name = self._expect("name")
+            return self._lookup(name) if build else None
+        elif kind == "[":
+            items = []
+            while self._kinds[self._pos] != "]":
+                items.append(self._value(const, build))
+            self._pos += 1
+            return items
+        elif kind == "{":
+            obj = {}
+            while self._kinds[self._pos] != "}":
+                key = self._expect("name")
+                self._expect(":")
+                obj[key] = self._value(const, build)
+            self._pos += 1
+            return obj
+        raise Unsupported("Unexpected token")
+
+    def _arguments(self, const: bool, build: bool) -> list[tuple[str, Any]]:
+        self._expect("(")
+        if self._kinds[self._pos] == ")":
+            raise Unsupported("Empty arguments")
+        arguments = []
+        while self._kinds[self._pos] != ")":
+            name = self._expect("name")
+            self._expect(":")
+            arguments.append((name, self._value(const, build)))
+        self._pos += 1
+        return arguments
+
+    def _arguments_at(self, pos: int) -> list[tuple[str, Any]]:
+        saved = self._pos
+        self._pos = pos
+        try:
+            return self._arguments(False, True)
+        finally:
+            self._pos = saved
+
+    def _directives(self, const: bool) -> _Directives:
+        directives = None
+        while self._kinds[self._pos] == "@":
+            self._pos += 1
+            name = self._expect("name")
+            arguments_pos = -1
+            if self._kinds[self._pos] == "(":
+                arguments_pos = self._pos
+                self._arguments(const, False)
+            if directives is None:
+                directives = []
+            directives.append((name, arguments_pos))
+        return directives
+
+    def _directive_arguments(
+        self, directives: list[tuple[str, int]], name: str
+    ) -> dict[str, Any] | None:
+        pos = next((p for n, p in directives if n == name), None)
+        if pos is None:
+            return None
+        if pos < 0:
+            raise Unsupported("Invalid directive arguments")
+        self._in_directive = True
+        try:
+            return dict(self._arguments_at(pos))
+        finally:
+            self._in_directive = False
+
+    def _directive_argument(
+        self, directives: list[tuple[str, int]], name: str, argument: str
+    ) -> tuple[bool, Any]:
+        arguments = self._directive_arguments(directives, name)
+        if arguments is None:
+            return False, None
+        if len(arguments) != 1 or argument not in arguments:
+            raise Unsupported("Invalid directive arguments")
+        return True, arguments[argument]
+
+    def _should_skip(self, directives: _Directives) -> bool:
+        if not directives:
+            return False
+        found, value = self._directive_argument(directives, "skip", "if")
+        if found:
+            return value
+        found, value = self._directive_argument(directives, "include", "if")
+        if found:
+            return not value
+        return False
+
+    def _directives_tuple(
+        self, directives: _Directives
+    ) -> tuple[Directive, ...]:
+        if not directives:
+            return ()
+        arguments = self._directive_arguments(directives, "cached")
+        if arguments is None:
+            return ()
+        ttl = arguments.pop("ttl", None)
+        stale = arguments.pop("stale", None)
+        if arguments or not isinstance(ttl, int):
+            raise Unsupported("Invalid @cached arguments")
+        if stale is not None and not isinstance(stale, int):
+            raise Unsupported("Invalid @cached stale")
+        return (Cached(ttl=ttl, stale=stale),)
+
+    def _fragment(self, name: str) -> Fragment:
+        try:
+            type_name, pos = self._fragments[name]
+        except KeyError:
+            raise Unsupported("Undefined fragment")
+
+        node = self._fragments_cache.get(name)
+        if node is None:
+            if name in self._pending_fragments:
+                raise Unsupported("Cyclic fragment usage")
+            self._pending_fragments.add(name)
+            saved = self._pos
+            self._pos = pos
+            try:
+                node = self._node(build=True)
+            finally:
+                self._pos = saved
+                self._pending_fragments.discard(name)
+            self._fragments_cache[name] = node
+        return Fragment(name, type_name, node)
+
+    def _node(self, build: bool, ordered: bool = False) -> Node:
+        kinds = self._kinds
+        values = self._values
+        self._expect("{")
+        if kinds[self._pos] == "}":
+            raise Unsupported("Empty selection set")
+
+        fields: list[Field | Link] = []
+        fragments: list[Fragment] = []
+        while kinds[self._pos] != "}":
+            if kinds[self._pos] == "...":
+                self._pos += 1
+                if kinds[self._pos] == "name" and values[self._pos] != "on":
+                    name = values[self._pos]
+                    self._pos += 1
+                    directives = self._directives(False)
+                    if build and not self._should_skip(directives):
+                        fragments.append(self._fragment(name))
+                    continue
+
+                type_name = None
+                if kinds[self._pos] == "name":
+                    self._pos += 1
+                    type_name = self._expect("name")
+                directives = self._directives(False)
+                if build and not self._should_skip(directives):
+                    fragments.append(
+                        Fragment(None, type_name, self._node(build=True))
+                    )
+                else:
+                    self._node(build=False)
+                continue
+
+            alias = None
+            name = self._expect("name")
+            if kinds[self._pos] == ":":
+                self._pos += 1
+                alias = name
+                name = self._expect("name")
+            arguments_pos = -1
+            if kinds[self._pos] == "(":
+                arguments_pos = self._pos
+                self._arguments(False, False)
+            directives = self._directives(False)
+            is_link = kinds[self._pos] == "{"
+
+            if not build or self._should_skip(directives):
+                if is_link:
+                    self._node(build=False)
+                continue
+
+            field_directives = self._directives_tuple(directives)
+            if arguments_pos >= 0:
+                options = dict(self._arguments_at(arguments_pos))
+            else:
+                options = None
+            if is_link:
+                fields.append(
+                    Link(
+                        name,
+                        self._node(build=True),
+                        options=options,
+                        alias=alias,
+                        directives=field_directives,
+                    )
+                )
+            else:
+                fields.append(
+                    Field(
+                        name,
+                        options=options,
+                        alias=alias,
+                        directives=field_directives,
+                    )
+                )
+        self._pos += 1
+        return Node(fields, fragments, ordered=ordered)
+
+    def _type(self) -> bool:
+        if self._kinds[self._pos] == "[":
+            self._pos += 1
+            self._type()
+            self._expect("]")
+        else:
+            self._expect("name")
+        if self._kinds[self._pos] == "!":
+            self._pos += 1
+            return True
+        return False
+
+    def _variable_definitions(self, build: bool) -> None:
+        if self._kinds[self._pos] != "(":
+            return
+        self._pos += 1
+        if self._kinds[self._pos] == ")":
+            raise Unsupported("Empty variable definitions")
+        while self._kinds[self._pos] != ")":
+            self._expect("$")
+            name = self._expect("name")
+            self._expect(":")
+            required = self._type()
+            default = NO_DEFAULT
+            if self._kinds[self._pos] == "=":
+                self._pos += 1
+                default = self._value(True, build)
+            self._directives(True)
+            if build:
+                self.variable_definitions.append(
+                    VariableDefinition(name, default, required)
+                )
+        self._pos += 1
+
+    def read_definitions(self) -> dict[str | None, tuple[OperationType, int]]:
+        """Checks syntax of the whole document and returns positions of
+        the operations
+
+        :raises Unsupported: when document can't be read
+        """
+        kinds = self._kinds
+        values = self._values
+        operations: dict[str | None, tuple[OperationType, int]] = {}
+        while kinds[self._pos] != _EOF:
+            name = None
+            if kinds[self._pos] == "{":
+                if None in operations:
+                    raise Unsupported("Duplicate operation")
+                operations[None] = (OperationType.QUERY, self._pos)
+                self._node(build=False)
+            elif kinds[self._pos] != "name":
+                raise Unsupported("Unexpected token")
+            elif values[self._pos] == "fragment":
+                self._pos += 1
+                name = self._expect("name")
+                if name == "on" or name in self._fragments:
+                    raise Unsupported("Invalid fragment name")
+                if self._expect("name") != "on":
+                    raise Unsupported("Expected type condition")
+                type_name = self._expect("name")
+                self._directives(True)
+                self._fragments[name] = (type_name, self._pos)
+                self._node(build=False)
+            elif values[self._pos] in _OPERATION_TYPES:
+                type_ = _OPERATION_TYPES[values[self._pos]]
+                self._pos += 1
+                if kinds[self._pos] == "name":
+                    name = values[self._pos]
+                    self._pos += 1
+                if name in operations:
+                    raise Unsupported("Duplicate operation")
+                operations[name] = (type_, self._pos)
+                self._variable_definitions(build=False)
+                self._directives(False)
+                self._node(build=False)
+            else:
+                raise Unsupported("Unsupported definition")
+        if not operations:
+            raise Unsupported("No operations")
+        return operations
+
+    def _read_document(self) -> tuple[OperationType, str | None, int]:
+        operations = self.read_definitions()
+        if self._operation_name is None:
+            if len(operations) != 1:
+                raise Unsupported("Expected exactly one operation")
+            ((name, (type_, pos)),) = operations.items()
+        else:
+            name = self._operation_name
+            try:
+                type_, pos = operations[name]
+            except KeyError:
+                raise Unsupported("Undefined operation")
+        return type_, name, pos
+
+    def read(self) -> tuple[OperationType, str | None, Node]:
+        type_, name, pos = self._read_document()
+        self._pos = pos
+        self._variable_definitions(build=True)
+        self._directives(False)
+
+        for var in self.variable_definitions:
+            try:
+                value = self._variables[var.name]
+            except KeyError:
+                if var.default is not NO_DEFAULT:
+                    value = var.default
+                elif var.required:
+                    raise Unsupported("Variable is not provided")
+                else:
+                    value = None
+            self._query_variables[var.name] = value
+
+        ordered = type_ is OperationType.MUTATION
+        node = self._node(build=True, ordered=ordered)
+        return type_, name, merge([node])
+
+
+def read(
+    src: str,
+    variables: dict[str, Any] | None = None,
+    operation_name: str | None = None,
+) -> Node:
+    """Reads a query from the GraphQL document, same as
+    :py:func:`hiku.readers.graphql.read`
+    """
+    try:
+        type_, _, query = _Reader(src, variables, operation_name).read()
+    except Unsupported:
+        return graphql.read(src, variables, operation_name)
+    if type_ is not OperationType.QUERY:
+        return graphql.read(src, variables, operation_name)
+    return query
+
+
+def read_operation(
+    src: str,
+    variables: dict[str, Any] | None = None,
+    operation_name: str | None = None,
+) -> Operation:
+    """Reads an operation from the GraphQL document, same as
+    :py:func:`hiku.readers.graphql.read_operation`
+    """
+    try:
+        type_, name, query = _Reader(src, variables, operation_name).read()
+    except Unsupported:
+        return graphql.read_operation(src, variables, operation_name)
+    return Operation(type_, query, name)
+
+
+def read_template(
+    src: str,
+    variables: dict[str, Any] | None = None,
+    operation_name: str | None = None,
+) -> QueryTemplate:
+    """Reads an operation from the GraphQL document as a template, same as
+    :py:func:`hiku.readers.graphql.read_template`, but template's
+    ``document`` is not set
+    """
+    try:
+        reader = _Reader(
+            src, variables, operation_name, variable_placeholders=True
+        )
+        type_, name, query = reader.read()
+    except Unsupported:
+        return graphql.read_template(src, variables, operation_name)
+
+    template = QueryTemplate(
+        type_, query, name, reader.variable_definitions, {}
+    )
+    if reader.directive_variables:
+        values = template.coerce(variables)
+        template.directive_values = {
+            name: values[name] for name in reader.directive_variables
+        }
+    return template
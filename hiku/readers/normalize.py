@@ -0,0 +1,130 @@
+"""
+hiku.readers.normalize
+~~~~~~~~~~~~~~~~~~~~~~
+
+Canonical form of the GraphQL documents: queries, which differ only in
+whitespace, comments, commas, order of the fragment definitions and names of
+the fragments, have the same canonical form.
+
+Order of the fields is not changed, because it defines order of the keys in
+the result.
+
+"""
+
+import hashlib
+
+from .graphql_fast import _TOKEN_RE, _Reader
+
+_WORDS = frozenset(["name", "int", "float"])
+_NUMBERS = frozenset(["int", "float"])
+_OPEN = frozenset(["{", "(", "["])
+_CLOSE = frozenset(["}", ")", "]"])
+
+_Token = tuple[str, str]
+
+
+def _tokens(src: str) -> list[_Token]:
+    tokens = []
+    for match in _TOKEN_RE.finditer(src):
+        kind = match.lastgroup
+        if kind == "ignored":
+            continue
+        assert kind is not None
+        text = match.group()
+        tokens.append((text if kind == "punct" else kind, text))
+    return tokens
+
+
+def _definitions(tokens: list[_Token]) -> list[list[_Token]]:
+    definitions = []
+    start = 0
+    depth = 0
+    for i, (kind, _) in enumerate(tokens):
+        if kind in _OPEN:
+            depth += 1
+        elif kind in _CLOSE:
+            depth -= 1
+            if depth == 0 and kind == "}":
+                definitions.append(tokens[start : i + 1])
+                start = i + 1
+    return definitions
+
+
+def _spreads(tokens: list[_Token]) -> list[str]:
+    return [
+        tokens[i + 1][1]
+        for i, (kind, _) in enumerate(tokens)
+        if kind == "..."
+        and tokens[i + 1][0] == "name"
+        and tokens[i + 1][1] != "on"
+    ]
+
+
+def _join(tokens: list[_Token]) -> str:
+    parts = []
+    prev = ""
+    for kind, text in tokens:
+        if prev in _WORDS and (
+            kind in _WORDS or (kind == "..." and prev in _NUMBERS)
+        ):
+            parts.append(" ")
+        parts.append(text)
+        prev = kind
+    return "".join(parts)
+
+
+def normalize_query(src: str) -> str:
+    """Returns canonical form of the GraphQL document
+
+    Comments, commas and redundant whitespace are removed, fragments are
+    renamed in order of their first usage and their definitions are placed
+    after operations in the same order.
+
+    :raises hiku.readers.graphql_fast.Unsupported: when document can't be
+        normalized, e.g. it is invalid or contains block strings
+    """
+    # checks syntax of the whole document
+    _Reader(src, None, None).read_definitions()
+
+    operations = []
+    fragments: dict[str, list[_Token]] = {}
+    for definition in _definitions(_tokens(src)):
+        if definition[0] == ("name", "fragment"):
+            fragments[definition[1][1]] = definition
+        else:
+            operations.append(definition)
+
+    order: list[str] = []
+    pending = [_spreads(op) for op in reversed(operations)]
+    seen: set[str] = set()
+    while pending:
+        names = pending.pop()
+        for i, name in enumerate(names):
+            if name in fragments and name not in seen:
+                seen.add(name)
+                order.append(name)
+                # depth-first: visit nested spreads, then the rest
+                pending.append(names[i + 1 :])
+                pending.append(_spreads(fragments[name]))
+                break
+    order.extend(sorted(name for name in fragments if name not in seen))
+    names_map = {name: "F{}".format(i) for i, name in enumerate(order)}
+
+    def rename(tokens: list[_Token]) -> list[_Token]:
+        result = list(tokens)
+        for i, (kind, _) in enumerate(tokens):
+            if kind == "..." or (i == 1 and tokens[0] == ("name", "fragment")):
+                j = i + 1 if kind == "..." else i
+                name = tokens[j][1]
+                if tokens[j][0] == "name" and name in names_map:
+                    result[j] = ("name", names_map[name])
+        return result
+
+    definitions = [rename(op) for op in operations]
+    definitions.extend(rename(fragments[name]) for name in order)
+    return " ".join(_join(definition) for definition in definitions)
+
+
+def query_key(normalized: str) -> str:
+    """Returns hash of the normalized query"""
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
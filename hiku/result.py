@@ -19,12 +19,15 @@ approach has lots of advantages:
 
 """
 
+import dataclasses
 import typing as t
 
 from functools import cached_property
+from operator import itemgetter
 from collections import defaultdict
 
 from .scalar import ScalarMeta
+from .utils import Const
 from .types import (
     RecordMeta,
     OptionalMeta,
@@ -62,8 +65,19 @@ ROOT = Reference("__root__", "__root__")
 
 
 class Index(defaultdict):
+    """Stores results of the query in a normalized form: every object of the
+    node is stored in a separate dict, which is accessible by node name and
+    object's ident: ``index[node][ident][index_key]``
+
+    Links to unions and interfaces are stored as :py:class:`Reference`
+    objects, other links are stored as raw idents, their target nodes and
+    link types are stored in ``targets`` mapping by node name and link's
+    index key.
+    """
+
     def __init__(self) -> None:
         super(Index, self).__init__(lambda: defaultdict(dict))
+        self.targets: dict[tuple[str, str], tuple[str, Const]] = {}
 
     @cached_property
     def root(self) -> dict:
@@ -74,6 +88,201 @@ class Index(defaultdict):
             value.default_factory = None
         self.default_factory = None
 
+    def store_rows(
+        self,
+        node_name: str,
+        ids: t.Iterable,
+        keys: list[str],
+        rows: t.Iterable[t.Sequence],
+    ) -> None:
+        """Stores values of the ``keys`` for every object with ``ids``"""
+        node_idx = self[node_name]
+        for i, row in zip(ids, rows):
+            node_idx[i].update(zip(keys, row))
+
+    def store_column(
+        self,
+        node_name: str,
+        ids: t.Iterable,
+        key: str,
+        values: t.Iterable,
+    ) -> None:
+        """Stores value of the ``key`` for every object with ``ids``"""
+        node_idx = self[node_name]
+        for i, value in zip(ids, values):
+            node_idx[i][key] = value
+
+
+_MISSING = object()
+
+
+class _Row(t.MutableMapping[str, t.Any]):
+    """Dict-like view of the object stored in the :py:class:`ColumnarIndex`"""
+
+    __slots__ = ("_node", "_num")
+
+    def __init__(self, node: "ColumnarNodeIndex", num: int) -> None:
+        self._node = node
+        self._num = num
+
+    def __repr__(self) -> str:
+        return repr(dict(self))
+
+    def __getitem__(self, key: str) -> t.Any:
+        column = self._node.columns.get(key)
+        if column is not None and self._num < len(column):
+            value = column[self._num]
+            if value is not _MISSING:
+                return value
+        raise KeyError(key)
+
+    def __contains__(self, key: object) -> bool:
+        column = self._node.columns.get(key)  # type: ignore[call-overload]
+        return (
+            column is not None
+            and self._num < len(column)
+            and column[self._num] is not _MISSING
+        )
+
+    def __setitem__(self, key: str, value: t.Any) -> None:
+        self._node.column(key)[self._num] = value
+
+    def __delitem__(self, key: str) -> None:
+        if key not in self:
+            raise KeyError(key)
+        self._node.columns[key][self._num] = _MISSING
+
+    def __iter__(self) -> t.Iterator[str]:
+        return (key for key in self._node.columns if key in self)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+
+class ColumnarNodeIndex(t.MutableMapping[t.Any, _Row]):
+    """Objects of the node stored by columns: objects idents are mapped to
+    row numbers and values of every index key are stored in a separate list
+
+    Objects are accessible as dict-like views.
+    """
+
+    __slots__ = ("rows", "columns", "autocreate")
+
+    def __init__(self) -> None:
+        self.rows: dict[t.Any, int] = {}
+        self.columns: dict[str, list] = {}
+        self.autocreate = True
+
+    def __repr__(self) -> str:
+        return repr(dict(self))
+
+    def _num(self, ident: t.Any) -> int:
+        num = self.rows.get(ident)
+        if num is None:
+            num = self.rows[ident] = len(self.rows)
+        return num
+
+    def column(self, key: str) -> list:
+        """Returns column of the ``key`` with a slot for every row"""
+        column = self.columns.get(key)
+        if column is None:
+            column = self.columns[key] = []
+        if len(column) < len(self.rows):
+            column.extend([_MISSING] * (len(self.rows) - len(column)))
+        return column
+
+    def __getitem__(self, ident: t.Any) -> _Row:
+        num = self.rows.get(ident)
+        if num is None:
+            if not self.autocreate:
+                raise KeyError(ident)
+            num = self._num(ident)
+        return _Row(self, num)
+
+    def get(self, ident: t.Any, default: t.Any = None) -> t.Any:
+        num = self.rows.get(ident)
+        if num is None:
+            return default
+        return _Row(self, num)
+
+    def __contains__(self, ident: object) -> bool:
+        return ident in self.rows
+
+    def __setitem__(self, ident: t.Any, value: t.Mapping) -> None:
+        row = _Row(self, self._num(ident))
+        row.clear()
+        row.update(value)
+
+    def __delitem__(self, ident: t.Any) -> None:
+        num = self.rows.pop(ident)
+        for column in self.columns.values():
+            if num < len(column):
+                column[num] = _MISSING
+
+    def __iter__(self) -> t.Iterator:
+        return iter(self.rows)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def store_rows(
+        self, ids: t.Iterable, keys: list[str], rows: t.Iterable[t.Sequence]
+    ) -> None:
+        nums = [self._num(i) for i in ids]
+        rows = list(rows)
+        for pos, key in enumerate(keys):
+            column = self.column(key)
+            for num, row in zip(nums, rows):
+                column[num] = row[pos]
+
+    def store_column(
+        self, ids: t.Iterable, key: str, values: t.Iterable
+    ) -> None:
+        nums = [self._num(i) for i in ids]
+        column = self.column(key)
+        for num, value in zip(nums, values):
+            column[num] = value
+
+
+class ColumnarIndex(Index):
+    """Alternative :py:class:`Index` implementation, which stores objects of
+    every node by columns, instead of separate dict for every object.
+
+    Index keys are not repeated for every object, so it uses much less
+    memory for large results and produces less objects for garbage collector.
+    Objects are still accessible as ``index[node][ident][index_key]``.
+
+    Can be enabled using ``index_class`` argument of the
+    :py:class:`hiku.engine.Engine`.
+    """
+
+    def __init__(self) -> None:
+        super(Index, self).__init__(ColumnarNodeIndex)
+        self.targets = {}
+
+    def finish(self) -> None:
+        for value in self.values():
+            value.autocreate = False
+        self.default_factory = None
+
+    def store_rows(
+        self,
+        node_name: str,
+        ids: t.Iterable,
+        keys: list[str],
+        rows: t.Iterable[t.Sequence],
+    ) -> None:
+        self[node_name].store_rows(ids, keys, rows)
+
+    def store_column(
+        self,
+        node_name: str,
+        ids: t.Iterable,
+        key: str,
+        values: t.Iterable,
+    ) -> None:
+        self[node_name].store_column(ids, key, values)
+
 
 class Proxy:
     """Proxy is a dict-like interface to index."""
@@ -116,6 +325,26 @@ class Proxy:
 
         if isinstance(field, Field):
             return value
+
+        target = self.__idx__.targets.get((self.__ref__.node, field.index_key))
+        if target is not None:
+            node_name, link_type = target
+            if link_type is Many or link_type is MaybeMany:
+                return [
+                    (
+                        None
+                        if val is None and link_type is MaybeMany
+                        else self.__class__(
+                            self.__idx__, Reference(node_name, val), field.node
+                        )
+                    )
+                    for val in value
+                ]
+            elif link_type is Maybe and value is None:
+                return None
+            return self.__class__(
+                self.__idx__, Reference(node_name, value), field.node
+            )
         elif isinstance(value, Reference):
             return self.__class__(self.__idx__, value, field.node)
         elif isinstance(value, list) and value:
@@ -137,6 +366,195 @@ class Proxy:
             raise AttributeError(e)
 
 
+class CachedProxy(Proxy):
+    """Same as :py:class:`Proxy`, but remembers values it returns, so
+    repeated access to the same field or link doesn't resolve it again and
+    doesn't allocate new child proxies. Child proxies are also cached.
+
+    Can be enabled using ``proxy_class`` argument of the
+    :py:class:`hiku.engine.Engine`.
+    """
+
+    __slots__ = ("__children__",)
+
+    def __init__(self, index: Index, reference: Reference, node: Node) -> None:
+        super().__init__(index, reference, node)
+        self.__children__: dict[str, t.Any] = {}
+
+    def __getitem__(self, item: str) -> t.Any:
+        try:
+            return self.__children__[item]
+        except KeyError:
+            value = self.__children__[item] = super().__getitem__(item)
+            return value
+
+
+_RowReader = t.Callable[[t.Any], t.Any]
+
+
+def _row_reader(
+    index: Index,
+    node_name: str,
+    node: Node,
+    keys: list[str],
+    factory: t.Callable[[tuple], t.Any] | None,
+) -> _RowReader:
+    table = index[node_name]
+    fields = [node.result_map[key] for key in keys]
+
+    if (
+        all(isinstance(f, Field) and f.name != "__typename" for f in fields)
+        and len(fields) > 1
+    ):
+        get = itemgetter(*[f.index_key for f in fields])
+
+        def read(ident: t.Any) -> tuple:
+            return get(table[ident])
+
+    else:
+        getters: list[t.Callable[[t.Any, dict], t.Any]] = []
+        for f in fields:
+            if f.name == "__typename":
+                getters.append(lambda ident, obj: node_name)
+            elif isinstance(f, Field):
+                getters.append(
+                    lambda ident, obj, key=f.index_key: obj[key]  # type: ignore
+                )
+            else:
+                getters.append(
+                    lambda ident, obj, key=f.result_key: Proxy(  # type: ignore
+                        index, Reference(node_name, ident), node
+                    )[key]
+                )
+
+        def read(ident: t.Any) -> tuple:
+            obj = table[ident]
+            return tuple(get(ident, obj) for get in getters)
+
+    if factory is None:
+        return read
+    return lambda ident: factory(read(ident))
+
+
+def _iter_rows(
+    result: Proxy,
+    name: str,
+    keys: list[str] | None,
+    factory: t.Callable[[tuple], t.Any] | None,
+) -> t.Iterator[t.Any]:
+    try:
+        link = result.__node__.result_map[name]
+    except KeyError:
+        raise KeyError("Field {!r} wasn't requested in the query".format(name))
+    if not isinstance(link, Link):
+        raise TypeError("Field {!r} is not a link".format(name))
+
+    if keys is None:
+        keys = list(link.node.result_map)
+    else:
+        for key in keys:
+            if key not in link.node.result_map:
+                raise KeyError(
+                    "Field {!r} wasn't requested in the query".format(key)
+                )
+
+    index = result.__idx__
+    ref = result.__ref__
+    value = index[ref.node][ref.ident][link.index_key]
+    readers: dict[str, _RowReader] = {}
+
+    def reader(node_name: str) -> _RowReader:
+        try:
+            return readers[node_name]
+        except KeyError:
+            readers[node_name] = _row_reader(
+                index, node_name, link.node, keys, factory
+            )
+            return readers[node_name]
+
+    target = index.targets.get((ref.node, link.index_key))
+    if target is not None:
+        node_name, link_type = target
+        read = reader(node_name)
+        if link_type is Many:
+            yield from map(read, value)
+        elif link_type is MaybeMany:
+            for ident in value:
+                yield None if ident is None else read(ident)
+        elif not (link_type is Maybe and value is None):
+            yield read(value)
+    elif isinstance(value, list):
+        for item in value:
+            yield None if item is None else reader(item.node)(item.ident)
+    elif value is not None:
+        yield reader(value.node)(value.ident)
+
+
+def iter_tuples(result: Proxy, name: str) -> t.Iterator[tuple | None]:
+    """Iterates over objects of the ``name`` link and yields values of the
+    requested fields as tuples, in the same order as they are requested in
+    the query
+
+    Values of the fields are read directly from the index, without creating
+    :py:class:`Proxy` object for every item, only values of the nested links
+    are returned as :py:class:`Proxy`. For the missing items of the
+    ``Sequence[Optional[...]]`` links ``None`` is yielded.
+
+    Example:
+
+    .. code-block:: python
+
+        for id_, name in iter_tuples(result, "users"):
+            ...
+
+    :param result: result of the query execution, or a nested proxy
+    :param name: result key of the link
+    """
+    return _iter_rows(result, name, None, None)
+
+
+_DC = t.TypeVar("_DC")
+
+
+def iter_dataclasses(
+    result: Proxy, name: str, cls: type[_DC]
+) -> t.Iterator[_DC | None]:
+    """Same as :py:func:`iter_tuples`, but yields instances of the ``cls``
+    dataclass. Dataclass fields are filled by the values of the requested
+    fields with the same result keys.
+
+    Example:
+
+    .. code-block:: python
+
+        @dataclass
+        class User:
+            id: int
+            name: str
+
+        for user in iter_dataclasses(result, "users", User):
+            ...
+
+    :param result: result of the query execution, or a nested proxy
+    :param name: result key of the link
+    :param cls: dataclass to create for every item
+    """
+    init_fields = [f for f in dataclasses.fields(cls) if f.init]  # type: ignore
+    keys = [f.name for f in init_fields]
+    factory: t.Callable[[tuple], t.Any]
+    if any(f.kw_only for f in init_fields):
+
+        def factory(row: tuple) -> t.Any:
+            return cls(**dict(zip(keys, row)))
+
+    else:
+
+        def factory(row: tuple) -> t.Any:
+            return cls(*row)
+
+    return _iter_rows(result, name, keys, factory)
+
+
 def _denormalize_type(
     type_: GenericMeta | ScalarMeta,
     result: t.Any,
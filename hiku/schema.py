@@ -1,3 +1,5 @@
+import threading
+from collections import OrderedDict
 from dataclasses import dataclass
 from typing import (
     Any,
@@ -13,7 +15,9 @@ from hiku.context import (
     ExecutionContextFinal,
     create_execution_context,
 )
+from hiku.denormalize.compiler import DenormalizeCache
 from hiku.denormalize.graphql import DenormalizeGraphQL
+from hiku.denormalize.json import DenormalizeGraphQLJSON
 from hiku.engine import _ExecutorType, Engine
 from hiku.error import GraphQLError
 from hiku.executors.base import (
@@ -25,10 +29,15 @@ from hiku.extensions.base_validator import QueryValidator
 from hiku.graph import Graph, GraphTransformer, apply
 from hiku.introspection.graphql import GraphQLIntrospection
 from hiku.merge import QueryMerger
-from hiku.operation import OperationType
-from hiku.query import Node
-from hiku.readers.graphql import parse_query, read_operation
-from hiku.validate.query import validate
+from hiku.operation import OperationType, QueryTemplate
+from hiku.query import Node, QueryInterner
+from hiku.readers import graphql_fast
+from hiku.readers.graphql import parse_query, read_operation, read_template
+from hiku.validate.query import validate, validate_template, validate_variables
+
+# how many templates to keep for the same query text, templates differ by
+# values of the variables, used in directives
+_TEMPLATES_PER_QUERY = 16
 
 
 class ValidationError(Exception):
@@ -54,6 +63,8 @@ class ExecutionResult:
     data: dict[str, Any] | None
     errors: list[GraphQLError] | None
     result: Proxy | None
+    data_json: bytes | None = None
+    """Data encoded as JSON, when requested with ``encode=True``"""
 
 
 class Schema(Generic[_ExecutorType]):
@@ -75,6 +86,10 @@ class Schema(Generic[_ExecutorType]):
         extensions: Sequence[Extension | type[Extension]] | None = None,
         transformers: list[GraphTransformer] | None = None,
         cache: CacheSettings | None = None,
+        compile_denormalize: bool = False,
+        template_cache_size: int = 0,
+        intern_queries: bool = False,
+        fast_reader: bool = False,
     ):
         self.engine = Engine(
             executor=executor,
@@ -83,6 +98,16 @@ class Schema(Generic[_ExecutorType]):
         self.batching = batching
         self.introspection = introspection
         self.extensions = extensions or []
+        self.denormalize_cache = (
+            DenormalizeCache() if compile_denormalize else None
+        )
+        self.template_cache_size = template_cache_size
+        self.query_interner = QueryInterner() if intern_queries else None
+        self.fast_reader = fast_reader
+        self._templates: OrderedDict[
+            tuple[str, str | None], list[QueryTemplate]
+        ] = OrderedDict()
+        self._templates_lock = threading.Lock()
 
         if not transformers:
             transformers = []
@@ -111,6 +136,8 @@ class Schema(Generic[_ExecutorType]):
         variables: dict[str, Any] | None = None,
         operation_name: str | None = None,
         context: dict[str, Any] | None = None,
+        encode: bool = False,
+        extensions: dict[str, Any] | None = None,
     ) -> ExecutionResult:
         if isinstance(query, Node):
             execution_context = create_execution_context(
@@ -127,6 +154,7 @@ class Schema(Generic[_ExecutorType]):
                 context=context,
                 query_graph=self.graph,
                 mutation_graph=self.mutation,
+                request_extensions=extensions,
             )
 
         execution_context = cast(ExecutionContextFinal, execution_context)
@@ -146,13 +174,7 @@ class Schema(Generic[_ExecutorType]):
                     result = self.engine.execute(execution_context)
                     execution_context.result = result
 
-                data = DenormalizeGraphQL(
-                    execution_context.graph,
-                    result,
-                    execution_context.operation_type_name,
-                ).process(execution_context.query)
-
-            return ExecutionResult(data, None, result)
+                return self._result(execution_context, result, encode)
         except ValidationError as e:
             return ExecutionResult(
                 None, [GraphQLError(message) for message in e.errors], None
@@ -166,6 +188,8 @@ class Schema(Generic[_ExecutorType]):
         variables: dict[str, Any] | None = None,
         operation_name: str | None = None,
         context: dict[str, Any] | None = None,
+        encode: bool = False,
+        extensions: dict[str, Any] | None = None,
     ) -> ExecutionResult:
         if isinstance(query, Node):
             execution_context = create_execution_context(
@@ -182,6 +206,7 @@ class Schema(Generic[_ExecutorType]):
                 context=context,
                 query_graph=self.graph,
                 mutation_graph=self.mutation,
+                request_extensions=extensions,
             )
 
         execution_context = cast(ExecutionContextFinal, execution_context)
@@ -201,13 +226,7 @@ class Schema(Generic[_ExecutorType]):
                     result = await self.engine.execute(execution_context)
                     execution_context.result = result
 
-                data = DenormalizeGraphQL(
-                    execution_context.graph,
-                    result,
-                    execution_context.operation_type_name,
-                ).process(execution_context.query)
-
-            return ExecutionResult(data, None, result)
+                return self._result(execution_context, result, encode)
         except ValidationError as e:
             return ExecutionResult(
                 None, [GraphQLError(message) for message in e.errors], None
@@ -215,6 +234,35 @@ class Schema(Generic[_ExecutorType]):
         except GraphQLError as e:
             return ExecutionResult(None, [e], None)
 
+    def _result(
+        self,
+        execution_context: ExecutionContextFinal,
+        result: Proxy,
+        encode: bool,
+    ) -> ExecutionResult:
+        if encode:
+            data_json = DenormalizeGraphQLJSON(
+                execution_context.graph,
+                result,
+                execution_context.operation_type_name,
+            ).process(execution_context.query)
+            return ExecutionResult(None, None, result, data_json)
+
+        if self.denormalize_cache is not None:
+            denormalize = self.denormalize_cache.get(
+                execution_context.graph,
+                execution_context.query,
+                execution_context.operation_type_name,
+            )
+            return ExecutionResult(denormalize(result.__idx__), None, result)
+
+        data = DenormalizeGraphQL(
+            execution_context.graph,
+            result,
+            execution_context.operation_type_name,
+        ).process(execution_context.query)
+        return ExecutionResult(data, None, result)
+
     def _validate(
         self,
         graph: Graph,
@@ -223,15 +271,155 @@ class Schema(Generic[_ExecutorType]):
     ) -> list[str]:
         return _run_validation(graph, query, validators)
 
+    def _validate_template(
+        self,
+        graph: Graph,
+        template: QueryTemplate,
+        query: Node,
+        variables: dict[str, Any] | None,
+        validators: tuple[QueryValidator, ...],
+    ) -> list[str]:
+        try:
+            errors, usages, deferred = template.validation[graph]
+        except KeyError:
+            errors, usages, deferred = validate_template(graph, template.query)
+            template.validation[graph] = (errors, usages, deferred)
+
+        if errors:
+            return list(errors)
+        if deferred:
+            # fields conflicts depend on values of the variables
+            errors = validate(graph, query)
+        else:
+            errors = validate_variables(
+                graph, usages, template.coerce(variables)
+            )
+        if errors:
+            return errors
+        # custom validators may check options values, so they are applied
+        # to the query with bound variables on every request
+        for validator in validators:
+            errors.extend(validator.validate(query, graph))
+        return errors
+
+    def _get_template(
+        self, execution_context: ExecutionContext
+    ) -> QueryTemplate | None:
+        key = (
+            execution_context.query_src,
+            execution_context.request_operation_name,
+        )
+        with self._templates_lock:
+            templates = self._templates.get(key)
+            if templates is None:
+                return None
+            self._templates.move_to_end(key)
+            for template in templates:
+                if template.matches(execution_context.variables):
+                    return template
+        return None
+
+    def _store_template(
+        self, execution_context: ExecutionContext, template: QueryTemplate
+    ) -> None:
+        key = (
+            execution_context.query_src,
+            execution_context.request_operation_name,
+        )
+        with self._templates_lock:
+            templates = self._templates.setdefault(key, [])
+            templates.insert(0, template)
+            del templates[_TEMPLATES_PER_QUERY:]
+            self._templates.move_to_end(key)
+            while len(self._templates) > self.template_cache_size:
+                self._templates.popitem(last=False)
+
+    def _read_template(
+        self, execution_context: ExecutionContext
+    ) -> QueryTemplate:
+        template = self._get_template(execution_context)
+        if template is not None:
+            return template
+
+        if execution_context.graphql_document is None:
+            assert execution_context.query_src, "query string not provided"
+            if self.fast_reader:
+                try:
+                    template = graphql_fast.read_template(
+                        execution_context.query_src,
+                        execution_context.variables,
+                        execution_context.request_operation_name,
+                    )
+                except TypeError as e:
+                    raise GraphQLError("Failed to read query: {}".format(e))
+                self._store_template(execution_context, template)
+                return template
+
+            execution_context.graphql_document = parse_query(
+                execution_context.query_src
+            )
+        try:
+            template = read_template(
+                execution_context.graphql_document,
+                execution_context.variables,
+                execution_context.request_operation_name,
+            )
+        except TypeError as e:
+            raise GraphQLError("Failed to read query: {}".format(e))
+
+        self._store_template(execution_context, template)
+        return template
+
     def _init_execution_context(
         self,
         execution_context: ExecutionContext,
         extensions_manager: ExtensionsManager,
     ) -> None:
         with extensions_manager.parsing():
-            # do not parse query if query of type Node was provided
+            if (
+                self.template_cache_size
+                or execution_context.template is not None
+            ) and (
+                execution_context.operation is None
+                and execution_context.query is None
+            ):
+                # template doesn't depend on variables values, so it is
+                # parsed and validated once for the same query text
+                if execution_context.template is None:
+                    execution_context.template = self._read_template(
+                        execution_context
+                    )
+                template = execution_context.template
+                if execution_context.graphql_document is None:
+                    execution_context.graphql_document = template.document
+                try:
+                    execution_context.operation = template.bind(
+                        execution_context.variables
+                    )
+                except TypeError as e:
+                    raise GraphQLError("Failed to read query: {}".format(e))
+
+            if (
+                self.fast_reader
+                and execution_context.graphql_document is None
+                and execution_context.operation is None
+                and execution_context.query is None
+            ):
+                assert execution_context.query_src, "query string not provided"
+                try:
+                    execution_context.operation = graphql_fast.read_operation(
+                        execution_context.query_src,
+                        execution_context.variables,
+                        execution_context.request_operation_name,
+                    )
+                except TypeError as e:
+                    raise GraphQLError("Failed to read query: {}".format(e))
+
+            # do not parse query if query of type Node was provided or
+            # operation was already read
             if (
                 execution_context.graphql_document is None
+                and execution_context.operation is None
                 and execution_context.query is None
             ):
                 assert execution_context.query_src, "query string not provided"
@@ -264,7 +452,18 @@ class Schema(Generic[_ExecutorType]):
         # Validation works with original query, not merged one.
         # Merged query only used for execution.
         with extensions_manager.validation():
-            if execution_context.errors is None:
+            if (
+                execution_context.errors is None
+                and execution_context.template is not None
+            ):
+                execution_context.errors = self._validate_template(
+                    execution_context.graph,
+                    execution_context.template,
+                    execution_context.query,
+                    execution_context.variables,
+                    execution_context.validators,
+                )
+            elif execution_context.errors is None:
                 execution_context.errors = self._validate(
                     execution_context.graph,
                     execution_context.query,
@@ -278,4 +477,10 @@ class Schema(Generic[_ExecutorType]):
         # by hiku itsef and will be used as is in execution.
         merger = QueryMerger(execution_context.graph)
         execution_context.query = merger.merge(execution_context.query)
+        if self.query_interner is not None:
+            # merged queries of the different requests share the same
+            # objects, so caches keyed by them compare queries by identity
+            execution_context.query = self.query_interner.intern(
+                execution_context.query
+            )
         execution_context.operation.query = execution_context.query
@@ -22,7 +22,7 @@ from hiku.query import Field as QueryField
 from hiku.query import FieldBase, Fragment
 from hiku.query import Link as QueryLink
 from hiku.query import Node as QueryNode
-from hiku.query import QueryVisitor
+from hiku.query import QueryVisitor, Variable
 from hiku.scalar import Scalar, ScalarMeta
 
 from ..types import (
@@ -163,6 +163,32 @@ class _OptionTypeError(_OptionError):
         super(_OptionTypeError, self).__init__(description)
 
 
+@dataclass
+class VariableUsage:
+    """Describes usage of the variable in the option value of the query
+    template, variable value is checked by :py:func:`validate_variables`
+    """
+
+    name: str
+    type: GenericMeta | type[Scalar]
+    for_: tuple[t.Any, ...]
+    option: str
+    field: str | None
+
+
+def _option_error(
+    for_: tuple[t.Any, ...], option: str, field: str | None, description: str
+) -> str:
+    node, field_name = for_
+    if field is not None:
+        return 'Invalid value for option "{}.{}:{}.{}", {}'.format(
+            node, field_name, option, field, description
+        )
+    return 'Invalid value for option "{}.{}:{}", {}'.format(
+        node, field_name, option, description
+    )
+
+
 class _OptionTypeValidator:
     def __init__(
         self,
@@ -173,6 +199,10 @@ class _OptionTypeValidator:
         self._data_types = data_types
         self._inputs_map = inputs_map
         self._value = [value]
+        self._fields: list[str] = []
+        #: variables placeholders found in the value: name, type and field
+        self.variables: list[tuple[str, GenericMeta | type[Scalar], str | None]]
+        self.variables = []
 
     @property
     def value(self) -> OptionValue:
@@ -187,6 +217,11 @@ class _OptionTypeValidator:
             self._value.pop()
 
     def visit(self, type_: GenericMeta | type[Scalar]) -> None:
+        if isinstance(self.value, Variable):
+            # value of the variable is checked when query template is bound
+            field = self._fields[0] if self._fields else None
+            self.variables.append((self.value.name, type_, field))
+            return
         type_.accept(self)  # type: ignore
 
     def visit_any(self, type_: AnyMeta) -> None:
@@ -315,11 +350,14 @@ class _OptionTypeValidator:
             if value_type.type is None:
                 raise _OptionError("type is not specified", key)
             with self.push_value(value):
+                self._fields.append(key)
                 try:
                     self.visit(value_type.type)
                 except _OptionError as err:
                     err.field = key
                     raise err
+                finally:
+                    self._fields.pop()
 
         return None
 
@@ -332,6 +370,7 @@ class _ValidateOptions(GraphVisitor):
     :param options: Options to validate.
     :param for_: Path to the field or link. Used in error messages.
     :param errors: Errors container.
+    :param variables: Collects usages of the variables placeholders.
     """
 
     def __init__(
@@ -341,12 +380,14 @@ class _ValidateOptions(GraphVisitor):
         options: dict | None,
         for_: tuple[t.Any, ...],
         errors: Errors,
+        variables: list[VariableUsage] | None = None,
     ) -> None:
         self._data_types = data_types
         self._inputs_map = inputs_map
         self.options = options
         self.for_ = for_
         self.errors = errors
+        self.variables = variables
         self._options = options or {}
 
     def visit_link(self, obj: Link) -> None:
@@ -383,21 +424,22 @@ class _ValidateOptions(GraphVisitor):
             self.errors.report(error)
 
         elif obj.type is not None:
+            validator = _OptionTypeValidator(
+                self._data_types, self._inputs_map, value
+            )
             try:
-                _OptionTypeValidator(
-                    self._data_types, self._inputs_map, value
-                ).visit(obj.type)
+                validator.visit(obj.type)
             except _OptionError as err:
-                node, field = self.for_
-                if err.field is not None:
-                    error = 'Invalid value for option "{}.{}:{}.{}", {}'.format(
-                        node, field, obj.name, err.field, err.description
-                    )
-                else:
-                    error = 'Invalid value for option "{}.{}:{}", {}'.format(
-                        node, field, obj.name, err.description
+                self.errors.report(
+                    _option_error(
+                        self.for_, obj.name, err.field, err.description
                     )
-                self.errors.report(error)
+                )
+            if self.variables is not None:
+                self.variables.extend(
+                    VariableUsage(name, type_, self.for_, obj.name, field)
+                    for name, type_, field in validator.variables
+                )
 
         return None
 
@@ -453,6 +495,16 @@ def _field_eq(a: FieldBase, b: FieldBase) -> bool:
     return a.name == b.name and a.options == b.options
 
 
+def _has_variables(value: t.Any) -> bool:
+    if isinstance(value, Variable):
+        return True
+    if isinstance(value, dict):
+        return any(_has_variables(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return any(_has_variables(v) for v in value)
+    return False
+
+
 class DefaultQueryValidator(QueryVisitor):
     """
     Validate query against graph.
@@ -467,6 +519,10 @@ class DefaultQueryValidator(QueryVisitor):
         self._type = [graph.root]
         self._path: Path = Path(None, "root")
         self.errors = Errors()
+        self.variables: list[VariableUsage] = []
+        #: fields with the same resulting name, which options depend on
+        #: values of the variables, they are checked with bound values
+        self.deferred = False
         self._visited_fields: dict[Path, dict] = {}
 
     def visit_field(self, obj: QueryField) -> None:
@@ -482,6 +538,7 @@ class DefaultQueryValidator(QueryVisitor):
                     obj.options,
                     for_,
                     self.errors,
+                    self.variables,
                 ).visit(field)
         else:
             self.errors.report(
@@ -501,6 +558,7 @@ class DefaultQueryValidator(QueryVisitor):
                 obj.options,
                 for_,
                 self.errors,
+                self.variables,
             ).visit(graph_obj)
 
             field_types = _AssumeRecord(self.graph.data_types).visit(
@@ -533,6 +591,7 @@ class DefaultQueryValidator(QueryVisitor):
                 obj.options,
                 for_,
                 self.errors,
+                self.variables,
             ).visit(graph_obj)
 
             self._type.append(linked_node)
@@ -674,7 +733,15 @@ class DefaultQueryValidator(QueryVisitor):
 
             seen = fields.get(field.result_key)
             if seen is not None:
-                if not _field_eq(field, seen):
+                if _field_eq(field, seen):
+                    pass
+                elif field.name == seen.name and (
+                    _has_variables(field.options)
+                    or _has_variables(seen.options)
+                ):
+                    # options are compared when variables are bound
+                    self.deferred = True
+                else:
                     node = self._type[-1].name or "root"
                     self.errors.report(
                         "Found distinct fields with the same "
@@ -697,3 +764,38 @@ def validate(graph: Graph, query: QueryNode) -> list[str]:
     query_validator = DefaultQueryValidator(graph)
     query_validator.visit(query)
     return query_validator.errors.list
+
+
+def validate_template(
+    graph: Graph, query: QueryNode
+) -> tuple[list[str], list[VariableUsage], bool]:
+    """Validates query template, returns errors, usages of the variables
+    placeholders, which values should be checked by
+    :py:func:`validate_variables` for every set of variables, and whether
+    query with bound variables should be validated by :py:func:`validate`,
+    because fields with the same resulting name differ only by variables
+    """
+    query_validator = DefaultQueryValidator(graph)
+    query_validator.visit(query)
+    return (
+        query_validator.errors.list,
+        query_validator.variables,
+        query_validator.deferred,
+    )
+
+
+def validate_variables(
+    graph: Graph, usages: list[VariableUsage], variables: dict[str, t.Any]
+) -> list[str]:
+    errors = Errors()
+    for usage in usages:
+        try:
+            _OptionTypeValidator(
+                graph.data_types, graph.inputs_map, variables[usage.name]
+            ).visit(usage.type)
+        except _OptionError as err:
+            field = usage.field if usage.field is not None else err.field
+            errors.report(
+                _option_error(usage.for_, usage.option, field, err.description)
+            )
+    return errors.list
@@ -9,10 +9,15 @@ The graph topology mirrors test_engine_execute.py:
 
 We pre-execute each query once to obtain the Proxy result and merged
 query AST, then benchmark only DenormalizeGraphQL.process().
+
+Compiled variants benchmark functions generated by DenormalizeCompiler
+for the same queries (compilation itself is done once, outside of the
+benchmark, as compiled functions are cached per query).
 """
 
 import pytest
 
+from hiku.denormalize.compiler import DenormalizeCompiler
 from hiku.denormalize.graphql import DenormalizeGraphQL
 from hiku.engine import Engine
 from hiku.executors.sync import SyncExecutor
@@ -466,3 +471,74 @@ def test_denormalize_deep_large(benchmark, deep_result_large):
     assert len(companies) == 10
     assert len(companies[0]["departments"]) == 5
     assert len(companies[0]["departments"][0]["employees"]) == 10
+
+
+def _compiled(graph, result, query):
+    denormalize = DenormalizeCompiler(graph, "Query").compile(query)
+    data = denormalize(result.__idx__)
+    assert data == DenormalizeGraphQL(graph, result, "Query").process(query)
+    return denormalize
+
+
+def test_denormalize_compiled_shallow(benchmark, shallow_result):
+    """Compiled: 1 level: 3 companies, 2 fields each."""
+    graph, result, query = shallow_result
+    denormalize = _compiled(graph, result, query)
+    index = result.__idx__
+
+    data = benchmark.pedantic(
+        lambda: denormalize(index),
+        iterations=10,
+        rounds=5000,
+    )
+    assert len(data["companies"]) == 3
+
+
+def test_denormalize_compiled_deep(benchmark, deep_result):
+    """Compiled: 4 levels: 3 companies, 9 departments, 45 employees."""
+    graph, result, query = deep_result
+    denormalize = _compiled(graph, result, query)
+    index = result.__idx__
+
+    data = benchmark.pedantic(
+        lambda: denormalize(index),
+        iterations=10,
+        rounds=2000,
+    )
+    companies = data["companies"]
+    assert len(companies) == 3
+    assert "bio" in companies[0]["departments"][0]["employees"][0]["profile"]
+
+
+def test_denormalize_compiled_deep_named_fragments(
+    benchmark, deep_named_fragments_result
+):
+    """Compiled: 4 levels with overlapping named fragments."""
+    graph, result, query = deep_named_fragments_result
+    denormalize = _compiled(graph, result, query)
+    index = result.__idx__
+
+    data = benchmark.pedantic(
+        lambda: denormalize(index),
+        iterations=10,
+        rounds=2000,
+    )
+    emp = data["companies"][0]["departments"][0]["employees"][0]
+    assert "salary" in emp
+    assert "joined_at" in emp["profile"]
+
+
+def test_denormalize_compiled_deep_large(benchmark, deep_result_large):
+    """Compiled: 4 levels, large dataset: 500 employees, 500 profiles."""
+    graph, result, query = deep_result_large
+    denormalize = _compiled(graph, result, query)
+    index = result.__idx__
+
+    data = benchmark.pedantic(
+        lambda: denormalize(index),
+        iterations=5,
+        rounds=500,
+    )
+    companies = data["companies"]
+    assert len(companies) == 10
+    assert len(companies[0]["departments"][0]["employees"]) == 10
@@ -2,7 +2,31 @@ from hiku.query import (
     Fragment, Link, Node,
     Field,
 )
-from hiku.readers.graphql import read
+import pytest
+
+from hiku.readers import graphql, graphql_fast
+
+QUERY = """
+query Feed($first: Int = 10) {
+    viewer { id name avatar(size: 64) }
+    feed(first: $first, filter: {kind: POST, tags: ["a", "b"]}) {
+        id
+        title
+        author { id name ...UserFields }
+        comments(first: 5) { id text author { ...UserFields } }
+        ... on Video { duration url @include(if: true) }
+    }
+}
+
+fragment UserFields on User {
+    id
+    name
+    avatar(size: 32)
+    followers { count }
+}
+"""
+
+read = graphql.read
 
 
 def test_field(benchmark):
@@ -57,3 +81,11 @@ def test_link_fragment(benchmark):
             ]
         ))
     ])
+
+
+@pytest.mark.parametrize(
+    "reader", [graphql.read, graphql_fast.read], ids=["graphql-core", "fast"]
+)
+def test_query(benchmark, reader):
+    parsed_query = benchmark(reader, QUERY, None)
+    assert parsed_query == graphql.read(QUERY)
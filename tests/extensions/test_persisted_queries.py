@@ -0,0 +1,150 @@
+from unittest.mock import patch
+
+import pytest
+
+from hiku.endpoint.graphql import GraphQLEndpoint
+from hiku.executors.sync import SyncExecutor
+from hiku.extensions.persisted_queries import (
+    InMemoryPersistedQueryStore,
+    PersistedQueries,
+    query_hash,
+)
+from hiku.graph import Field, Graph, Option, Root
+from hiku.readers.graphql import parse_query
+from hiku.schema import Schema
+from hiku.types import Integer, String
+from hiku.validate.query import validate_template
+
+QUERY = "query Answer($n: Int = 42) { answer(n: $n) question }"
+HASH = query_hash(QUERY)
+
+
+@pytest.fixture(name="sync_graph")
+def sync_graph_fixture():
+    def question(fields):
+        return ["Number?" for _ in fields]
+
+    def answer(fields):
+        return [str(f.options["n"]) for f in fields]
+
+    return Graph([Root([
+        Field("question", String, question),
+        Field("answer", String, answer, options=[
+            Option("n", Integer, default=42),
+        ]),
+    ])])
+
+
+def _request(query=None, hash_=HASH, variables=None):
+    data = {
+        "extensions": {
+            "persistedQuery": {"version": 1, "sha256Hash": hash_},
+        },
+    }
+    if query is not None:
+        data["query"] = query
+    if variables is not None:
+        data["variables"] = variables
+    return data
+
+
+def test_persisted_queries(sync_graph):
+    extension = PersistedQueries()
+    endpoint = GraphQLEndpoint(Schema(
+        SyncExecutor(), sync_graph, extensions=[extension],
+    ))
+
+    assert endpoint.dispatch(_request()) == {
+        "data": None,
+        "errors": [{"message": "PersistedQueryNotFound"}],
+    }
+
+    expected = {"data": {"answer": "42", "question": "Number?"}}
+    assert endpoint.dispatch(_request(QUERY)) == expected
+
+    with (
+        patch(
+            "hiku.extensions.persisted_queries.parse_query", wraps=parse_query
+        ) as parse,
+        patch("hiku.schema.parse_query", wraps=parse_query) as schema_parse,
+        patch(
+            "hiku.schema.validate_template", wraps=validate_template
+        ) as validate_,
+    ):
+        # query template is prepared only once, for any variables
+        assert endpoint.dispatch(_request()) == expected
+        assert endpoint.dispatch(_request(variables={"n": 7})) == {
+            "data": {"answer": "7", "question": "Number?"},
+        }
+        assert not parse.called
+        assert not schema_parse.called
+        assert not validate_.called
+    assert len(extension._prepared) == 1
+
+    # values of the variables are validated on every request
+    result = endpoint.dispatch(_request(variables={"n": "foo"}))
+    assert result["data"] is None
+    assert result["errors"] == [{
+        "message": 'Invalid value for option "root.answer:n", '
+        '"str" instead of Integer',
+    }]
+
+
+def test_hash_mismatch(sync_graph):
+    endpoint = GraphQLEndpoint(Schema(
+        SyncExecutor(), sync_graph, extensions=[PersistedQueries()],
+    ))
+    assert endpoint.dispatch(_request("{ question }")) == {
+        "data": None,
+        "errors": [{"message": "Provided sha does not match query"}],
+    }
+
+
+def test_regular_queries(sync_graph):
+    endpoint = GraphQLEndpoint(Schema(
+        SyncExecutor(), sync_graph, extensions=[PersistedQueries()],
+    ))
+    assert endpoint.dispatch({"query": "{ question }"}) == {
+        "data": {"question": "Number?"},
+    }
+
+
+def test_persisted_only(sync_graph):
+    store = InMemoryPersistedQueryStore({HASH: QUERY})
+    endpoint = GraphQLEndpoint(Schema(
+        SyncExecutor(), sync_graph, extensions=[
+            PersistedQueries(store, persisted_only=True),
+        ],
+    ))
+
+    assert endpoint.dispatch(_request()) == {
+        "data": {"answer": "42", "question": "Number?"},
+    }
+    assert endpoint.dispatch(_request(QUERY)) == {
+        "data": {"answer": "42", "question": "Number?"},
+    }
+
+    not_allowed = {
+        "data": None,
+        "errors": [{"message": "Only persisted queries are allowed"}],
+    }
+    assert endpoint.dispatch({"query": "{ question }"}) == not_allowed
+    query = "{ question }"
+    assert endpoint.dispatch(_request(query, query_hash(query))) == not_allowed
+    assert store.get(query_hash(query)) is None
+
+    assert endpoint.dispatch(_request(hash_="unknown")) == {
+        "data": None,
+        "errors": [{"message": "PersistedQueryNotFound"}],
+    }
+
+
+def test_in_memory_store():
+    store = InMemoryPersistedQueryStore(maxsize=2)
+    store.set("a", "{ a }")
+    store.set("b", "{ b }")
+    assert store.get("a") == "{ a }"
+    store.set("c", "{ c }")
+    assert store.get("a") == "{ a }"
+    assert store.get("b") is None
+    assert store.get("c") == "{ c }"
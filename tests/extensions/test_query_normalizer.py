@@ -0,0 +1,94 @@
+from unittest.mock import patch
+
+import pytest
+
+from graphql import parse
+
+from hiku.executors.sync import SyncExecutor
+from hiku.extensions.query_normalizer import QueryNormalizer
+from hiku.extensions.query_parse_cache import QueryParserCache
+from hiku.graph import Field, Root, Graph
+from hiku.readers.normalize import normalize_query, query_key
+from hiku.schema import Schema
+from hiku.types import String
+
+
+@pytest.fixture(name="sync_graph")
+def sync_graph_fixture():
+    def question(fields):
+        return ["Number?" for _ in fields]
+
+    def answer(fields):
+        return ["42" for _ in fields]
+
+    return Graph([Root([
+        Field("question", String, question),
+        Field("answer", String, answer),
+    ])])
+
+
+def test_normalize_query():
+    src1 = """
+    # comment
+    query Q($a: Int = 1) {
+      x(a: $a) { ...Foo, ...Bar }
+      y: z
+    }
+    fragment Bar on T { b ...Foo }
+    fragment Foo on T { a, c(d: 1.5) }
+    """
+    src2 = (
+        "query Q($a:Int=1){x(a:$a){...X ...Y} y:z} "
+        "fragment Y on T{b ...X} fragment X on T{a c(d:1.5)}"
+    )
+    expected = (
+        "query Q($a:Int=1){x(a:$a){...F0...F1}y:z} "
+        "fragment F0 on T{a c(d:1.5)} fragment F1 on T{b...F0}"
+    )
+    assert normalize_query(src1) == expected
+    assert normalize_query(src2) == expected
+    assert parse(expected)
+
+
+def test_query_normalizer_extension(sync_graph):
+    normalizer = QueryNormalizer()
+    schema = Schema(
+        SyncExecutor(),
+        sync_graph,
+        extensions=[normalizer, QueryParserCache(2)],
+        template_cache_size=0,
+    )
+
+    with patch("hiku.readers.graphql.parse", wraps=parse) as mock_parse:
+        for src in [
+            "{answer}",
+            "{ answer }",
+            "# comment\n{\n  answer,\n}",
+        ]:
+            result = schema.execute_sync(src)
+            assert result.data == {"answer": "42"}
+
+        # all variants share the same parsed document
+        assert mock_parse.call_count == 1
+
+        result = schema.execute_sync("{ question }")
+        assert result.data == {"question": "Number?"}
+        assert mock_parse.call_count == 2
+
+    assert normalizer.variants(query_key("{answer}")) == 3
+    assert normalizer.variants(query_key("{question}")) == 1
+
+
+def test_query_normalizer_unsupported(sync_graph):
+    normalizer = QueryNormalizer(maxsize=1)
+    schema = Schema(SyncExecutor(), sync_graph, extensions=[normalizer])
+
+    result = schema.execute_sync('{ answer(x: """block""") }')
+    assert normalizer.normalize('{ answer(x: """block""") }') is None
+    assert result.errors
+
+    result = schema.execute_sync("{ answer }")
+    assert result.data == {"answer": "42"}
+    assert normalizer.variants(query_key("{answer}")) == 1
+    normalizer.normalize("{ question }")
+    assert normalizer.variants(query_key("{answer}")) == 0
@@ -28,6 +28,8 @@ def test_query_validation_cache_extension(sync_graph):
     schema = Schema(
         SyncExecutor(), sync_graph,
         extensions=[QueryValidationCache(2)],
+        # query templates are validated once by schema itself
+        template_cache_size=0,
     )
 
     with patch("hiku.schema.validate", wraps=validate) as mock_validate:
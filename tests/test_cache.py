@@ -1,3 +1,7 @@
+import asyncio
+import inspect
+import threading
+import time
 import typing as t
 
 from concurrent.futures import ThreadPoolExecutor
@@ -7,6 +11,7 @@ from unittest.mock import (
 )
 
 import pytest
+from prometheus_client import REGISTRY
 from sqlalchemy import (
     MetaData,
     Table,
@@ -18,6 +23,9 @@ from sqlalchemy import (
 )
 from sqlalchemy.pool import StaticPool
 
+from hiku.engine import Engine, pass_context
+from hiku.executors.asyncio import AsyncIOExecutor
+from hiku.executors.sync import SyncExecutor
 from hiku.executors.threads import ThreadsExecutor
 from hiku.expr.core import (
     define,
@@ -47,6 +55,11 @@ from hiku.cache import (
     BaseCache,
     CacheSettings,
     CacheInfo,
+    CacheMetrics,
+    TieredCache,
+    InMemoryAsyncCache,
+    CacheWriter,
+    SingleFlight,
 )
 from tests.base import check_result
 
@@ -638,6 +651,12 @@ def assert_deep_equal(got, exp):
         assert got == exp
 
 
+def cache_data(items: dict) -> dict:
+    for payload in items.values():
+        assert payload["expires"] > payload["created"]
+    return {key: payload["data"] for key, payload in items.items()}
+
+
 def get_field(query: QueryNode, path: list[str]) -> FieldOrLink:
     node = query
     path_size = len(path)
@@ -704,12 +723,12 @@ def test_cached_link_one__sqlalchemy(sync_graph_sqlalchemy):
                 "id": 10,
                 "name": "apple",
                 "address": {"city": "Kyiv"},
-                "owner": Reference("User", 100),
+                "owner": 100,
                 "emptyOwner": None,
                 logo_image_field.index_key: "https://example.com/logo10.jpg?size=100",
             },
         },
-        "Product": {"company": Reference("Company", 10)},
+        "Product": {"company": 10},
     }
 
     attributes_cache = {
@@ -722,16 +741,16 @@ def test_cached_link_one__sqlalchemy(sync_graph_sqlalchemy):
                 "id": 11,
                 "name": "color",
                 "values": [
-                    Reference("AttributeValue", 111),
-                    Reference("AttributeValue", 112),
+                    111,
+                    112,
                 ],
             },
             12: {"id": 12, "name": "year", "values": []},
         },
         "Product": {
             "attributes": [
-                Reference("Attribute", 11),
-                Reference("Attribute", 12),
+                11,
+                12,
             ]
         },
     }
@@ -785,10 +804,10 @@ def test_cached_link_one__sqlalchemy(sync_graph_sqlalchemy):
     if not company_call or not attributes_call:
         pytest.fail("Expected cache.set_many call")
 
-    assert_deep_equal(company_call[0], {company_key: company_cache})
+    assert_deep_equal(cache_data(company_call[0]), {company_key: company_cache})
     assert company_call[1] == 10
 
-    assert_deep_equal(attributes_call[0], {attributes_key: attributes_cache})
+    assert_deep_equal(cache_data(attributes_call[0]), {attributes_key: attributes_cache})
     assert attributes_call[1] == 15
 
     cache.reset_mock()
@@ -854,11 +873,11 @@ def test_cached_link_many__sqlalchemy(sync_graph_sqlalchemy):
                 "id": 10,
                 "name": "apple",
                 "address": {"city": "Kyiv"},
-                "owner": Reference("User", 100),
+                "owner": 100,
                 logo_image_field.index_key: "https://example.com/logo10.jpg?size=100",
             },
         },
-        "Product": {"company": Reference("Company", 10)},
+        "Product": {"company": 10},
     }
     company20_cache = {
         "User": {
@@ -872,11 +891,11 @@ def test_cached_link_many__sqlalchemy(sync_graph_sqlalchemy):
                 "id": 20,
                 "name": "microsoft",
                 "address": {"city": "Kyiv"},
-                "owner": Reference("User", 200),
+                "owner": 200,
                 logo_image_field.index_key: "https://example.com/logo20.jpg?size=100",
             },
         },
-        "Product": {"company": Reference("Company", 20)},
+        "Product": {"company": 20},
     }
 
     attributes11_12_cache = {
@@ -889,16 +908,16 @@ def test_cached_link_many__sqlalchemy(sync_graph_sqlalchemy):
                 "id": 11,
                 "name": "color",
                 "values": [
-                    Reference("AttributeValue", 111),
-                    Reference("AttributeValue", 112),
+                    111,
+                    112,
                 ],
             },
             12: {"id": 12, "name": "year", "values": []},
         },
         "Product": {
             "attributes": [
-                Reference("Attribute", 11),
-                Reference("Attribute", 12),
+                11,
+                12,
             ]
         },
     }
@@ -985,10 +1004,10 @@ def test_cached_link_many__sqlalchemy(sync_graph_sqlalchemy):
     if not company_call or not attributes_call:
         pytest.fail("Expected cache.set_many call")
 
-    assert_deep_equal(company_call[0], {company10_key: company10_cache, company20_key: company20_cache})
+    assert_deep_equal(cache_data(company_call[0]), {company10_key: company10_cache, company20_key: company20_cache})
     assert company_call[1] == 10
 
-    assert_deep_equal(attributes_call[0], {attributes11_12_key: attributes11_12_cache, attributes_none_key: attributes_none_cache})
+    assert_deep_equal(cache_data(attributes_call[0]), {attributes11_12_key: attributes11_12_cache, attributes_none_key: attributes_none_cache})
     assert attributes_call[1] == 15
 
     cache.reset_mock()
@@ -1005,3 +1024,678 @@ def test_cached_link_many__sqlalchemy(sync_graph_sqlalchemy):
     }
 
     cache.set_many.assert_not_called()
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _tiered_metric(name: str, cache: str) -> float:
+    value = REGISTRY.get_sample_value(name + "_total", {"cache": cache})
+    return value or 0.0
+
+
+def test_tiered_cache_read_through():
+    l2 = InMemoryCache()
+    l2.set_many({"a": 1, "b": 2}, 10)
+    clock = _Clock()
+    cache = TieredCache(l2, read_ttl=5, name="read_through", clock=clock)
+
+    assert cache.get_many(["a", "c"]) == {"a": 1}
+    assert len(cache) == 1
+    assert _tiered_metric("hiku_tiered_cache_l2_hits", "read_through") == 1
+    assert _tiered_metric("hiku_tiered_cache_misses", "read_through") == 1
+
+    l2._store["a"] = 3
+    assert cache.get_many(["a", "b"]) == {"a": 1, "b": 2}
+    assert _tiered_metric("hiku_tiered_cache_l1_hits", "read_through") == 1
+    assert _tiered_metric("hiku_tiered_cache_l2_hits", "read_through") == 2
+
+    clock.now = 5
+    assert cache.get_many(["a"]) == {"a": 3}
+
+
+def test_tiered_cache_read_ttl_capped_by_expires():
+    now = time.time()
+    l2 = InMemoryCache()
+    l2.set_many(
+        {
+            "fresh": {"data": {}, "created": now, "expires": now + 60},
+            "expiring": {"data": {}, "created": now, "expires": now + 2},
+            "stale": {"data": {}, "created": now, "expires": now - 1},
+        },
+        120,
+    )
+    clock = _Clock()
+    cache = TieredCache(l2, read_ttl=10, clock=clock)
+
+    assert len(cache.get_many(["fresh", "expiring", "stale"])) == 3
+    assert set(cache._l1) == {"fresh", "expiring"}
+    assert cache._l1["fresh"][0] == 10
+    assert 0 < cache._l1["expiring"][0] <= 2
+
+
+def test_tiered_cache_write_through():
+    l2 = InMemoryCache()
+    clock = _Clock()
+    cache = TieredCache(l2, name="write_through", clock=clock)
+
+    cache.set_many({"a": 1}, 20)
+    assert l2._store == {"a": 1}
+
+    clock.now = 19
+    del l2._store["a"]
+    assert cache.get_many(["a"]) == {"a": 1}
+
+    clock.now = 20
+    assert cache.get_many(["a"]) == {}
+    assert len(cache) == 0
+
+
+def test_tiered_cache_limits():
+    l2 = InMemoryCache()
+    cache = TieredCache(l2, maxsize=2, max_bytes=100, sizeof=len)
+
+    cache.set_many({"a": "x" * 10, "b": "x" * 10}, 10)
+    cache.get_many(["a"])
+    cache.set_many({"c": "x" * 10}, 10)
+    assert list(cache._l1) == ["a", "c"]
+    assert cache.size == 20
+
+    cache.set_many({"d": "x" * 90}, 10)
+    assert list(cache._l1) == ["c", "d"]
+    assert cache.size == 100
+
+    # too big for L1, stored only in L2
+    cache.set_many({"e": "x" * 101}, 10)
+    assert list(cache._l1) == ["c", "d"]
+    assert "e" in l2._store
+
+
+def _cached_graph(company_fields: t.Callable) -> Graph:
+    """Resolvers are asynchronous, when ``company_fields`` is asynchronous"""
+    is_async = inspect.iscoroutinefunction(company_fields)
+
+    def resolver(func):
+        if not is_async:
+            return func
+
+        async def wrapper(*args):
+            return func(*args)
+
+        return wrapper
+
+    @resolver
+    def product_fields(fields, ids):
+        products = DB["products"]
+        return [[getattr(products[i], f.name) for f in fields] for i in ids]
+
+    @resolver
+    def product_company(ids):
+        return ids
+
+    @resolver
+    def root_product(opts):
+        return opts["id"]
+
+    return Graph(
+        [
+            Node(
+                "Company",
+                [
+                    Field("id", Integer, company_fields),
+                    Field("name", String, company_fields),
+                ],
+            ),
+            Node(
+                "Product",
+                [
+                    Field("id", Integer, product_fields),
+                    Field("company_id", Integer, product_fields),
+                    Link(
+                        "company",
+                        TypeRef["Company"],
+                        product_company,
+                        requires="company_id",
+                    ),
+                ],
+            ),
+            Root(
+                [
+                    Link(
+                        "product",
+                        TypeRef["Product"],
+                        root_product,
+                        requires=None,
+                        options=[Option("id", Integer)],
+                    ),
+                ]
+            ),
+        ]
+    )
+
+
+def _company_fields(fields, ids):
+    companies = DB["companies"]
+    return [[getattr(companies[i], f.name) for f in fields] for i in ids]
+
+
+def _async_cached_graph(calls: list) -> Graph:
+    async def company_fields(fields, ids):
+        calls.append(ids)
+        await asyncio.sleep(0)
+        return _company_fields(fields, ids)
+
+    return _cached_graph(company_fields)
+
+
+@pytest.mark.asyncio
+async def test_async_cache():
+    calls = []
+    cache = InMemoryAsyncCache()
+    schema = Schema(
+        AsyncIOExecutor(deny_sync=True),
+        _async_cached_graph(calls),
+        cache=CacheSettings(cache),
+    )
+    query = """
+    query GetProduct {
+      product(id: 1) {
+        id
+        company @cached(ttl: 10) { id name }
+      }
+    }
+    """
+    expected = {"product": {"id": 1, "company": {"id": 10, "name": "apple"}}}
+
+    result = await schema.execute(query)
+    assert result.errors is None
+    assert result.data == expected
+    assert calls == [[10]]
+    assert len(cache) == 1
+
+    result = await schema.execute(query)
+    assert result.errors is None
+    assert result.data == expected
+    assert calls == [[10]]
+
+
+def test_async_cache_requires_async_executor():
+    with pytest.raises(TypeError, match="requires asynchronous executor"):
+        Engine(SyncExecutor(), CacheSettings(InMemoryAsyncCache()))
+
+
+class _BlockingCache(InMemoryCache):
+    def __init__(self) -> None:
+        super().__init__()
+        self.release = threading.Event()
+        self.calls: list[dict] = []
+
+    def set_many(self, items: dict[str, t.Any], ttl: int) -> None:
+        self.release.wait(5)
+        self.calls.append(items)
+        super().set_many(items, ttl)
+
+
+_CACHED_PRODUCT_QUERY = """
+query GetProduct {
+  product(id: 1) {
+    id
+    company @cached(ttl: 10) { id name }
+  }
+}
+"""
+
+
+@pytest.mark.asyncio
+async def test_cache_writer():
+    cache = _BlockingCache()
+    writer = CacheWriter()
+    schema = Schema(
+        AsyncIOExecutor(),
+        _async_cached_graph([]),
+        cache=CacheSettings(cache, writer=writer),
+    )
+    result = await schema.execute(_CACHED_PRODUCT_QUERY)
+    assert result.errors is None
+    # result is returned while the cache write is still in progress
+    assert cache._store == {}
+
+    cache.release.set()
+    assert writer.flush(5)
+    assert len(cache._store) == 1
+
+
+@pytest.mark.asyncio
+async def test_cache_writer_async():
+    calls = []
+    cache = InMemoryAsyncCache()
+    writer = CacheWriter()
+    schema = Schema(
+        AsyncIOExecutor(deny_sync=True),
+        _async_cached_graph(calls),
+        cache=CacheSettings(cache, writer=writer),
+    )
+    result = await schema.execute(_CACHED_PRODUCT_QUERY)
+    assert result.errors is None
+    await writer.flush_async()
+    assert len(cache) == 1
+
+    await schema.execute(_CACHED_PRODUCT_QUERY)
+    assert calls == [[10]]
+
+
+def test_cache_writer_event_loops():
+    class SlowCache(InMemoryAsyncCache):
+        def __init__(self):
+            super().__init__()
+            self.loops = {}
+
+        async def set_many(self, items, ttl):
+            await asyncio.sleep(0.05)
+            for key in items:
+                self.loops[key] = asyncio.get_running_loop()
+            await super().set_many(items, ttl)
+
+    cache = SlowCache()
+    writer = CacheWriter()
+    started = threading.Barrier(2)
+    loops = {}
+
+    async def write(key):
+        loops[key] = asyncio.get_running_loop()
+        started.wait(5)
+        writer.submit(cache, {key: 1}, 10)
+        await writer.flush_async()
+        assert key in cache._store
+
+    threads = [
+        threading.Thread(target=asyncio.run, args=(write(key),))
+        for key in ["a", "b"]
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+    # each event loop writes its own entries
+    assert cache.loops == loops
+    assert len(writer) == 0
+    assert writer._tasks == {}
+
+
+def test_cache_writer_coalesce_and_drop():
+    cache = _BlockingCache()
+    writer = CacheWriter(maxsize=2)
+
+    def value(name: str) -> float:
+        return REGISTRY.get_sample_value(name) or 0.0
+
+    coalesced = value("hiku_cache_writer_coalesced_total")
+    dropped = value("hiku_cache_writer_dropped_total")
+
+    # first write blocks the writer thread
+    writer.submit(cache, {"a": 0}, 10)
+    for _ in range(100):
+        if not len(writer):
+            break
+        time.sleep(0.01)
+    assert len(writer) == 0
+
+    writer.submit(cache, {"a": 1, "b": 1}, 10)
+    writer.submit(cache, {"a": 2, "c": 2}, 10)
+    assert len(writer) == 2
+    assert value("hiku_cache_writer_coalesced_total") == coalesced + 1
+    assert value("hiku_cache_writer_dropped_total") == dropped + 1
+
+    cache.release.set()
+    assert writer.flush(5)
+    assert cache.calls == [{"a": 0}, {"a": 2, "b": 1}]
+    assert cache._store == {"a": 2, "b": 1}
+
+
+@pytest.mark.asyncio
+async def test_single_flight():
+    calls = []
+    cache = InMemoryAsyncCache()
+    single_flight = SingleFlight()
+    schema = Schema(
+        AsyncIOExecutor(deny_sync=True),
+        _async_cached_graph(calls),
+        cache=CacheSettings(cache, single_flight=single_flight),
+    )
+    expected = {"product": {"id": 1, "company": {"id": 10, "name": "apple"}}}
+
+    results = await asyncio.gather(
+        *[schema.execute(_CACHED_PRODUCT_QUERY) for _ in range(3)]
+    )
+    for result in results:
+        assert result.errors is None
+        assert result.data == expected
+    assert calls == [[10]]
+    assert len(single_flight) == 0
+    assert len(cache) == 1
+
+
+def test_single_flight_release():
+    single_flight = SingleFlight(timeout=0.05)
+    leader, follower = object(), object()
+
+    assert single_flight.acquire(["a", "b"], leader) == (["a", "b"], {})
+    leading, waiting = single_flight.acquire(["a", "b", "c"], follower)
+    assert leading == ["c"]
+    assert set(waiting) == {"a", "b"}
+
+    single_flight.release(leader, {"a": {"Company": {}}, "b": None})
+    # released only by the owner
+    single_flight.release(leader, {"c": {"Company": {}}})
+    assert single_flight.wait(waiting) == {"a": {"Company": {}}}
+    assert len(single_flight) == 1
+
+    # abandoned computation is taken over after timeout
+    leading, waiting = single_flight.acquire(["c"], leader)
+    assert list(waiting) == ["c"]
+    assert single_flight.wait(waiting) == {}
+    assert single_flight.acquire(["c"], leader) == (["c"], {})
+
+
+@pytest.mark.asyncio
+async def test_stale_while_revalidate():
+    calls = []
+    cache = InMemoryAsyncCache()
+    schema = Schema(
+        AsyncIOExecutor(deny_sync=True),
+        _async_cached_graph(calls),
+        cache=CacheSettings(cache, metrics=CacheMetrics("stale")),
+    )
+    query = """
+    query GetProduct {
+      product(id: 1) {
+        id
+        company @cached(ttl: 0, stale: 60) { id name }
+      }
+    }
+    """
+    expected = {"product": {"id": 1, "company": {"id": 10, "name": "apple"}}}
+
+    def stale_hits():
+        return REGISTRY.get_sample_value(
+            "hiku_result_cache_stale_hits_total",
+            {
+                "graph": "stale",
+                "query_name": "GetProduct",
+                "node": "Product",
+                "field": "company",
+            },
+        ) or 0.0
+
+    result = await schema.execute(query)
+    assert result.data == expected
+    assert calls == [[10]]
+    assert stale_hits() == 0
+
+    # expired entry is served and refreshed in background
+    result = await schema.execute(query)
+    assert result.data == expected
+    assert stale_hits() == 1
+    await asyncio.gather(*schema.engine._refresher._tasks)
+    assert calls == [[10], [10]]
+
+    # without stale window expired entry is not used
+    result = await schema.execute(query.replace(", stale: 60", ""))
+    assert result.data == expected
+    assert calls == [[10], [10], [10]]
+
+
+def test_stale_while_revalidate__sync():
+    calls = []
+
+    @pass_context
+    def company_fields(ctx, fields, ids):
+        calls.append((dict(ctx), ids))
+        return _company_fields(fields, ids)
+
+    def cache_key(ctx, hasher):
+        hasher.update(ctx["locale"].encode("utf-8"))
+
+    def refresh_context(ctx):
+        return {"refresh": ctx["locale"]}
+
+    query = _CACHED_PRODUCT_QUERY.replace("ttl: 10", "ttl: 0, stale: 60")
+    assert query != _CACHED_PRODUCT_QUERY
+    request = {"locale": "en"}
+
+    for context_fn, refresh_ctx in [
+        (None, {}),
+        (refresh_context, {"refresh": "en"}),
+    ]:
+        calls.clear()
+        cache = InMemoryCache()
+        pool = ThreadPoolExecutor(1)
+        schema = Schema(
+            SyncExecutor(),
+            _cached_graph(company_fields),
+            cache=CacheSettings(
+                cache,
+                cache_key,
+                refresh_executor=pool,
+                refresh_context=context_fn,
+            ),
+        )
+        schema.engine.deduplicate_ids = True
+        workflows = []
+        run = schema.engine._refresher.run
+
+        def run_refresh(queue, workflow, keys):
+            workflows.append(workflow)
+            run(queue, workflow, keys)
+
+        schema.engine._refresher.run = run_refresh
+
+        for _ in range(2):
+            result = schema.execute_sync(query, context=request)
+            assert result.data["product"]["company"]["name"] == "apple"
+        pool.shutdown(wait=True)
+        # refresh doesn't use context of the request
+        assert calls == [(request, [10]), (refresh_ctx, [10])]
+        # refreshed entry is stored under the key of the request
+        assert len(cache._store) == 1
+        assert workflows[0]._deduplicate_ids
+        assert not schema.engine._refresher._keys
+
+
+def test_refresher_worker():
+    calls = []
+
+    def company_fields(fields, ids):
+        calls.append(ids)
+        return _company_fields(fields, ids)
+
+    schema = Schema(
+        SyncExecutor(),
+        _cached_graph(company_fields),
+        cache=CacheSettings(InMemoryCache()),
+    )
+    query = _CACHED_PRODUCT_QUERY.replace("ttl: 10", "ttl: 0, stale: 60")
+    refresher = schema.engine._refresher
+
+    refresher.maxsize = 0
+    schema.execute_sync(query)
+    schema.execute_sync(query)
+    # refresh is dropped, when too many refreshes are waiting
+    assert refresher._thread is None
+    assert not refresher._keys
+    assert calls == [[10]]
+
+    refresher.maxsize = 100
+    schema.execute_sync(query)
+    for _ in range(500):
+        if not refresher._keys:
+            break
+        time.sleep(0.01)
+    assert not refresher._keys
+    assert calls == [[10], [10]]
+    assert refresher._thread.name == "hiku-cache-refresh"
+
+
+def test_cache_info_split(monkeypatch):
+    monkeypatch.setattr("hiku.cache.random.random", lambda: 0.5)
+    now = time.time()
+    fresh = {"data": {"A": 1}, "created": now, "expires": now + 100, "delta": 1}
+    stale = {"data": {"A": 2}, "created": now, "expires": now - 10, "delta": 1}
+    expired = {"data": {"A": 3}, "created": now, "expires": now - 100, "delta": 1}
+    payloads = {"fresh": fresh, "stale": stale, "expired": expired}
+
+    cache_info = CacheInfo(CacheSettings(InMemoryCache()))
+    assert cache_info.split(payloads, None, "X", "y") == ({"fresh": {"A": 1}}, {})
+    assert cache_info.split(payloads, 50, "X", "y") == (
+        {"fresh": {"A": 1}},
+        {"stale": {"A": 2}},
+    )
+
+    # slow computations are refreshed early
+    cache_info = CacheInfo(CacheSettings(InMemoryCache(), early_refresh=200.0))
+    assert cache_info.split({"fresh": fresh}, None, "X", "y") == (
+        {},
+        {"fresh": {"A": 1}},
+    )
+    fresh["delta"] = 0
+    assert cache_info.split({"fresh": fresh}, None, "X", "y") == (
+        {"fresh": {"A": 1}},
+        {},
+    )
+
+
+def _waits() -> float:
+    return REGISTRY.get_sample_value("hiku_cache_single_flight_waits_total") or 0.0
+
+
+def _single_flight_metric(name: str) -> float:
+    return REGISTRY.get_sample_value(name) or 0.0
+
+
+def test_single_flight_reacquire():
+    single_flight = SingleFlight(timeout=5)
+    leader, follower = object(), object()
+
+    assert single_flight.acquire(["a"], leader) == (["a"], {})
+    _, waiting = single_flight.acquire(["a"], follower)
+    # same link reached by another path keeps the flight
+    assert single_flight.acquire(["a"], leader) == (["a"], {})
+    single_flight.release(leader, {"a": {"Company": {}}})
+    assert waiting["a"].done()
+    assert single_flight.wait(waiting) == {"a": {"Company": {}}}
+
+
+def test_single_flight_timer():
+    single_flight = SingleFlight(timeout=0.05)
+    owners = [object() for _ in range(11)]
+    single_flight.acquire(["a", "b"], owners[0])
+    timeouts = _single_flight_metric("hiku_cache_single_flight_timeouts_total")
+    failures = _single_flight_metric("hiku_cache_single_flight_failures_total")
+
+    threads = set(threading.enumerate())
+    waits = []
+    for owner in owners[1:]:
+        _, waiting = single_flight.acquire(["a", "b"], owner)
+        waits.append(single_flight.wait_future(waiting))
+    # all waits share one timer thread
+    assert set(threading.enumerate()) - threads == {single_flight._timer}
+
+    single_flight.release(owners[0], {"a": None})
+    assert [w.result(1) for w in waits] == [{}] * 10
+    assert _single_flight_metric(
+        "hiku_cache_single_flight_timeouts_total"
+    ) == timeouts + 10
+    assert _single_flight_metric(
+        "hiku_cache_single_flight_failures_total"
+    ) == failures + 10
+
+
+@pytest.mark.asyncio
+async def test_single_flight_leader_error():
+    calls = []
+
+    async def company_fields(fields, ids):
+        calls.append(ids)
+        await asyncio.sleep(0)
+        if len(calls) == 1:
+            raise ValueError("leader failed")
+        return _company_fields(fields, ids)
+
+    single_flight = SingleFlight(timeout=5)
+    schema = Schema(
+        AsyncIOExecutor(deny_sync=True),
+        _cached_graph(company_fields),
+        cache=CacheSettings(
+            InMemoryAsyncCache(), single_flight=single_flight
+        ),
+    )
+    waits = _waits()
+    started = time.perf_counter()
+    results = await asyncio.gather(
+        *[schema.execute(_CACHED_PRODUCT_QUERY) for _ in range(3)],
+        return_exceptions=True,
+    )
+    assert time.perf_counter() - started < 1
+    assert _waits() == waits + 2
+    assert isinstance(results[0], ValueError)
+    for result in results[1:]:
+        assert result.data["product"]["company"]["name"] == "apple"
+    assert len(single_flight) == 0
+
+
+def test_single_flight_leader_error__threads():
+    entered = threading.Event()
+    proceed = threading.Event()
+    calls = []
+
+    def company_fields(fields, ids):
+        calls.append(ids)
+        if len(calls) == 1:
+            entered.set()
+            proceed.wait(5)
+            raise ValueError("leader failed")
+        return _company_fields(fields, ids)
+
+    single_flight = SingleFlight(timeout=5)
+    pool = ThreadPoolExecutor(2)
+    schema = Schema(
+        ThreadsExecutor(pool),
+        _cached_graph(company_fields),
+        cache=CacheSettings(InMemoryCache(), single_flight=single_flight),
+    )
+    results = {}
+
+    def execute(name):
+        try:
+            results[name] = schema.execute_sync(_CACHED_PRODUCT_QUERY)
+        except ValueError as e:
+            results[name] = e
+
+    waits = _waits()
+    leader = threading.Thread(target=execute, args=("leader",))
+    leader.start()
+    assert entered.wait(5)
+    follower = threading.Thread(target=execute, args=("follower",))
+    follower.start()
+    for _ in range(500):
+        if _waits() > waits:
+            break
+        time.sleep(0.01)
+    assert _waits() == waits + 1
+    # leader occupies one worker, follower waits without occupying another
+    assert pool.submit(lambda: 42).result(1) == 42
+
+    started = time.perf_counter()
+    proceed.set()
+    leader.join(5)
+    follower.join(5)
+    assert time.perf_counter() - started < 1
+    assert isinstance(results["leader"], ValueError)
+    assert results["follower"].data["product"]["company"]["name"] == "apple"
+    assert len(single_flight) == 0
+    pool.shutdown()
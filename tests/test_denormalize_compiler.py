@@ -0,0 +1,210 @@
+from datetime import datetime
+from enum import Enum
+
+import pytest
+
+from hiku.context import create_execution_context
+from hiku.denormalize.compiler import DenormalizeCache, DenormalizeCompiler
+from hiku.denormalize.graphql import DenormalizeGraphQL
+from hiku.engine import Engine
+from hiku.enum import Enum as GraphEnum
+from hiku.executors.sync import SyncExecutor
+from hiku.graph import Field, Graph, Interface, Link, Node, Nothing, Root
+from hiku.graph import Union
+from hiku.merge import QueryMerger
+from hiku.readers.graphql import read
+from hiku.scalar import DateTime
+from hiku.schema import Schema
+from hiku.types import (
+    EnumRef,
+    InterfaceRef,
+    Integer,
+    Optional,
+    Record,
+    Sequence,
+    String,
+    TypeRef,
+    UnionRef,
+)
+
+
+class Status(Enum):
+    ACTIVE = "active"
+    BANNED = "banned"
+
+
+USERS = {
+    1: {
+        "name": "John",
+        "status": Status.ACTIVE,
+        "statuses": [Status.ACTIVE, Status.BANNED],
+        "created": datetime(2020, 1, 1, 12),
+        "info": {"age": 42, "tags": ["a", "b"], "pet": {"name": "Rex"}},
+        "friend": 2,
+    },
+    2: {
+        "name": "Jane",
+        "status": Status.BANNED,
+        "statuses": [],
+        "created": None,
+        "info": {"age": 33, "tags": [], "pet": {"name": "Tom"}},
+        "friend": Nothing,
+    },
+}
+
+
+def user_fields(fields, ids):
+    return [[USERS[i][f.name] for f in fields] for i in ids]
+
+
+def id_fields(fields, ids):
+    return [[i for _ in fields] for i in ids]
+
+
+def user_friend(ids):
+    return [USERS[i]["friend"] for i in ids]
+
+
+GRAPH = Graph(
+    [
+        Node(
+            "User",
+            [
+                Field("id", Integer, id_fields),
+                Field("name", String, user_fields),
+                Field("status", EnumRef["Status"], user_fields),
+                Field("statuses", Sequence[EnumRef["Status"]], user_fields),
+                Field("created", Optional[DateTime], user_fields),
+                Field("info", TypeRef["Info"], user_fields),
+                Link(
+                    "friend",
+                    Optional[TypeRef["User"]],
+                    user_friend,
+                    requires="id",
+                ),
+            ],
+            implements=["Entity"],
+        ),
+        Node(
+            "Audio",
+            [Field("id", Integer, id_fields)],
+            implements=["Entity"],
+        ),
+        Root(
+            [
+                Field("answer", Integer, lambda fields: [42 for _ in fields]),
+                Link(
+                    "users",
+                    Sequence[TypeRef["User"]],
+                    lambda: [1, 2],
+                    requires=None,
+                ),
+                Link(
+                    "user",
+                    Optional[TypeRef["User"]],
+                    lambda: Nothing,
+                    requires=None,
+                ),
+                Link(
+                    "media",
+                    Sequence[UnionRef["Media"]],
+                    lambda: [(1, TypeRef["User"]), (7, TypeRef["Audio"])],
+                    requires=None,
+                ),
+                Link(
+                    "entity",
+                    InterfaceRef["Entity"],
+                    lambda: (7, TypeRef["Audio"]),
+                    requires=None,
+                ),
+            ]
+        ),
+    ],
+    data_types={
+        "Pet": Record[{"name": String}],
+        "Info": Record[
+            {"age": Integer, "tags": Sequence[String], "pet": TypeRef["Pet"]}
+        ],
+    },
+    unions=[Union("Media", ["User", "Audio"])],
+    interfaces=[Interface("Entity", [Field("id", Integer, id_fields)])],
+    enums=[GraphEnum.from_builtin(Status)],
+    scalars=[DateTime],
+)
+
+QUERY = """
+query {
+    __typename
+    answer
+    total: answer
+    user { id }
+    users {
+        __typename
+        id
+        name
+        status
+        statuses
+        created
+        info { __typename age years: age tags pet { name } }
+        friend { id name friend { id } }
+    }
+    media {
+        __typename
+        ... on User { id name }
+        ... on Audio { id }
+    }
+    entity {
+        __typename
+        id
+        ... on User { name }
+    }
+}
+"""
+
+
+def execute(query_src):
+    query = QueryMerger(GRAPH).merge(read(query_src))
+    result = Engine(SyncExecutor()).execute(
+        create_execution_context(query=query, query_graph=GRAPH)
+    )
+    return query, result
+
+
+def test_same_as_denormalize_graphql():
+    query, result = execute(QUERY)
+    expected = DenormalizeGraphQL(GRAPH, result, "Query").process(query)
+
+    denormalize = DenormalizeCompiler(GRAPH, "Query").compile(query)
+    data = denormalize(result.__idx__)
+    assert data == expected
+    assert data["users"][1]["friend"] is None
+    assert data["entity"] == {"__typename": "Audio", "id": 7}
+
+
+def test_source():
+    query, _ = execute("{ users { name status } }")
+    source = DenormalizeCompiler.compile_source(GRAPH, query, "Query")
+    # no type checks in the generated code
+    assert "isinstance" not in source
+    assert "def denormalize(index):" in source
+
+
+@pytest.mark.parametrize("size", [0, 1])
+def test_cache(size):
+    cache = DenormalizeCache(size)
+    query, _ = execute("{ answer }")
+    func = cache.get(GRAPH, query, "Query")
+    same_query, _ = execute("{ answer }")
+    if size:
+        assert cache.get(GRAPH, same_query, "Query") is func
+    else:
+        assert cache.get(GRAPH, same_query, "Query") is not func
+    assert cache.get(GRAPH, query, "Mutation") is not func
+
+
+def test_schema():
+    schema = Schema(SyncExecutor(), GRAPH, compile_denormalize=True)
+    result = schema.execute_sync(QUERY)
+    expected = Schema(SyncExecutor(), GRAPH).execute_sync(QUERY)
+    assert result.data == expected.data
+    assert result.data["answer"] == 42
@@ -0,0 +1,208 @@
+import json
+from datetime import datetime
+from enum import Enum
+
+import pytest
+
+from hiku.context import create_execution_context
+from hiku.denormalize.graphql import DenormalizeGraphQL
+from hiku.denormalize.json import DenormalizeGraphQLJSON
+from hiku.endpoint.graphql import AsyncGraphQLEndpoint, GraphQLEndpoint
+from hiku.engine import Engine
+from hiku.enum import Enum as GraphEnum
+from hiku.executors.asyncio import AsyncIOExecutor
+from hiku.executors.sync import SyncExecutor
+from hiku.graph import Field, Graph, Link, Node, Nothing, Root, Union
+from hiku.merge import QueryMerger
+from hiku.readers.graphql import read
+from hiku.scalar import DateTime
+from hiku.schema import Schema
+from hiku.types import (
+    EnumRef,
+    Integer,
+    Optional,
+    Record,
+    Sequence,
+    String,
+    TypeRef,
+    UnionRef,
+)
+
+
+class Status(Enum):
+    ACTIVE = "active"
+    BANNED = "banned"
+
+
+USERS = {
+    1: {
+        "name": "Jöhn \"J\" Doe",
+        "status": Status.ACTIVE,
+        "created": datetime(2020, 1, 1, 12),
+        "info": {"age": 42, "tags": ["a", "б"]},
+        "friend": 2,
+    },
+    2: {
+        "name": "Jane",
+        "status": Status.BANNED,
+        "created": datetime(2021, 2, 3, 4, 5),
+        "info": {"age": 33, "tags": []},
+        "friend": Nothing,
+    },
+}
+
+
+def user_fields(fields, ids):
+    return [[USERS[i][f.name] for f in fields] for i in ids]
+
+
+def id_fields(fields, ids):
+    return [[i for _ in fields] for i in ids]
+
+
+def user_friend(ids):
+    return [USERS[i]["friend"] for i in ids]
+
+
+GRAPH = Graph(
+    [
+        Node(
+            "User",
+            [
+                Field("id", Integer, id_fields),
+                Field("name", String, user_fields),
+                Field("status", EnumRef["Status"], user_fields),
+                Field("created", DateTime, user_fields),
+                Field("info", TypeRef["Info"], user_fields),
+                Link("friend", Optional[TypeRef["User"]], user_friend,
+                     requires="id"),
+            ],
+        ),
+        Node("Audio", [Field("id", Integer, id_fields)]),
+        Root(
+            [
+                Field("answer", Integer, lambda fields: [42 for _ in fields]),
+                Link("users", Sequence[TypeRef["User"]], lambda: [1, 2],
+                     requires=None),
+                Link("user", Optional[TypeRef["User"]], lambda: Nothing,
+                     requires=None),
+                Link("media", Sequence[UnionRef["Media"]],
+                     lambda: [(1, TypeRef["User"]), (7, TypeRef["Audio"])],
+                     requires=None),
+            ]
+        ),
+    ],
+    data_types={
+        "Info": Record[{"age": Integer, "tags": Sequence[String]}],
+    },
+    unions=[Union("Media", ["User", "Audio"])],
+    enums=[GraphEnum.from_builtin(Status)],
+    scalars=[DateTime],
+)
+
+QUERY = """
+query {
+    __typename
+    answer
+    total: answer
+    user { id }
+    users {
+        __typename
+        id
+        name
+        status
+        created
+        info { age years: age tags }
+        friend { id name friend { id } }
+    }
+    media {
+        __typename
+        ... on User { id name }
+        ... on Audio { id }
+    }
+}
+"""
+
+
+def execute(query_src):
+    query = QueryMerger(GRAPH).merge(read(query_src))
+    result = Engine(SyncExecutor()).execute(
+        create_execution_context(query=query, query_graph=GRAPH)
+    )
+    return query, result
+
+
+def test_same_as_denormalize_graphql():
+    query, result = execute(QUERY)
+    expected = DenormalizeGraphQL(GRAPH, result, "Query").process(query)
+
+    body = DenormalizeGraphQLJSON(GRAPH, result, "Query").process(query)
+    assert isinstance(body, bytes)
+    assert json.loads(body) == expected
+    # keys are written in the same order
+    assert body.decode("utf-8") == json.dumps(
+        expected, ensure_ascii=False, separators=(",", ":")
+    )
+
+
+def test_chunks():
+    query, result = execute(QUERY)
+    body = DenormalizeGraphQLJSON(GRAPH, result, "Query").process(query)
+
+    chunks = list(
+        DenormalizeGraphQLJSON(GRAPH, result, "Query", chunk_size=16)
+        .iter_chunks(query)
+    )
+    assert len(chunks) > 1
+    assert b"".join(chunks) == body
+
+
+@pytest.mark.asyncio
+async def test_async_chunks():
+    query, result = execute(QUERY)
+    body = DenormalizeGraphQLJSON(GRAPH, result, "Query").process(query)
+
+    denormalize = DenormalizeGraphQLJSON(GRAPH, result, "Query", chunk_size=16)
+    chunks = [chunk async for chunk in denormalize.aiter_chunks(query)]
+    assert len(chunks) > 1
+    assert b"".join(chunks) == body
+
+
+def test_endpoint():
+    schema = Schema(SyncExecutor(), GRAPH)
+    expected = GraphQLEndpoint(schema).dispatch({"query": QUERY})
+
+    endpoint = GraphQLEndpoint(schema, encode=True)
+    body = endpoint.dispatch({"query": QUERY})
+    assert json.loads(body) == expected
+
+
+def test_endpoint_errors():
+    endpoint = GraphQLEndpoint(Schema(SyncExecutor(), GRAPH), encode=True)
+    body = endpoint.dispatch({"query": "{ unknown }"})
+    assert json.loads(body) == {
+        "data": None,
+        "errors": [
+            {"message": 'Field "unknown" is not implemented in the "root" node'}
+        ],
+    }
+
+
+def test_endpoint_batching():
+    endpoint = GraphQLEndpoint(
+        Schema(SyncExecutor(), GRAPH), batching=True, encode=True
+    )
+    body = endpoint.dispatch([
+        {"query": "{ answer }"},
+        {"query": "{ total: answer }"},
+    ])
+    assert body == b'[{"data":{"answer":42}},{"data":{"total":42}}]'
+
+
+@pytest.mark.asyncio
+async def test_async_endpoint():
+    endpoint = AsyncGraphQLEndpoint(
+        Schema(AsyncIOExecutor(), GRAPH), encode=True
+    )
+    body = await endpoint.dispatch({"query": "{ answer }"})
+    assert body == b'{"data":{"answer":42}}'
@@ -5,6 +5,7 @@ from typing import Any, TypedDict
 from collections import defaultdict
 
 from graphql import get_introspection_query
+from prometheus_client import REGISTRY
 import pytest
 from sqlalchemy import Column, ForeignKey
 from sqlalchemy import Integer as SaInteger
@@ -21,7 +22,13 @@ from hiku.graph import Field, Graph, Input, Interface, Link, Node, Nothing, Opti
 from hiku.introspection.graphql import GraphQLIntrospection
 from hiku.merge import QueryMerger
 from hiku.readers.graphql import read
-from hiku.result import denormalize
+from hiku.result import (
+    CachedProxy,
+    ColumnarIndex,
+    Index,
+    Reference,
+    denormalize,
+)
 from hiku.schema import Schema
 from hiku.sources.sqlalchemy import FieldsQuery
 from hiku.types import (
@@ -735,6 +742,496 @@ def test_links_requires_list():
     )
 
 
+def _plan_graph(fb, fd):
+    return Graph(
+        [
+            Node(
+                "a",
+                [
+                    Field("d", None, fd),
+                    Field("e", None, fd),
+                ],
+            ),
+            Root(
+                [
+                    Link("b", Sequence[TypeRef["a"]], fb, requires=None),
+                ]
+            ),
+        ]
+    )
+
+
+def test_execution_plan_reused():
+    fb = Mock(return_value=[1])
+    fd = Mock(return_value=[["boners"]])
+    graph = _plan_graph(fb, fd)
+    engine = Engine(SyncExecutor())
+
+    for _ in range(2):
+        # structurally equal queries share the same plan
+        result = engine.execute(
+            create_execution_context(
+                query=build([Q.b[Q.d]]), query_graph=graph
+            )
+        )
+        check_result(result, {"b": [{"d": "boners"}]})
+
+    assert len(engine._plans) == 1
+    assert fb.call_count == 2
+    assert fd.call_count == 2
+
+
+def test_execution_plan_cache_size():
+    fb = Mock(return_value=[1])
+    fd = Mock(return_value=[["boners"]])
+    graph = _plan_graph(fb, fd)
+    engine = Engine(SyncExecutor(), plan_cache_size=1)
+
+    for query in [build([Q.b[Q.d]]), build([Q.b[Q.e]])]:
+        engine.execute(create_execution_context(query=query, query_graph=graph))
+
+    assert len(engine._plans) == 1
+    ((_, query),) = engine._plans.keys()
+    assert query == build([Q.b[Q.e]])
+
+
+def test_execution_plan_cache_disabled():
+    fb = Mock(return_value=[1])
+    fd = Mock(return_value=[["boners"]])
+    graph = _plan_graph(fb, fd)
+    engine = Engine(SyncExecutor(), plan_cache_size=0)
+
+    result = engine.execute(
+        create_execution_context(query=build([Q.b[Q.d]]), query_graph=graph)
+    )
+    check_result(result, {"b": [{"d": "boners"}]})
+    assert not engine._plans
+
+
+def _batch_graph(user_fields):
+    def post_fields(fields, ids):
+        return [[{"id": i, "author_id": i % 2}[f.name] for f in fields] for i in ids]
+
+    def comment_fields(fields, ids):
+        return [[{"id": i, "author_id": 1}[f.name] for f in fields] for i in ids]
+
+    def direct_link(ids):
+        return ids
+
+    return Graph(
+        [
+            Node(
+                "User",
+                [
+                    Field("id", Integer, user_fields),
+                    Field("name", String, user_fields),
+                ],
+            ),
+            Node(
+                "Post",
+                [
+                    Field("id", Integer, post_fields),
+                    Field("author_id", Integer, post_fields),
+                    Link(
+                        "author",
+                        TypeRef["User"],
+                        direct_link,
+                        requires="author_id",
+                    ),
+                ],
+            ),
+            Node(
+                "Comment",
+                [
+                    Field("id", Integer, comment_fields),
+                    Field("author_id", Integer, comment_fields),
+                    Link(
+                        "author",
+                        TypeRef["User"],
+                        direct_link,
+                        requires="author_id",
+                    ),
+                ],
+            ),
+            Root(
+                [
+                    Link(
+                        "posts",
+                        Sequence[TypeRef["Post"]],
+                        lambda: [1, 2, 3],
+                        requires=None,
+                    ),
+                    Link(
+                        "comments",
+                        Sequence[TypeRef["Comment"]],
+                        lambda: [4, 5],
+                        requires=None,
+                    ),
+                ]
+            ),
+        ]
+    )
+
+
+_BATCH_QUERY = build(
+    [
+        Q.posts[Q.id, Q.author[Q.name]],
+        Q.comments[Q.id, Q.author[Q.name]],
+    ]
+)
+
+_BATCH_RESULT = {
+    "posts": [
+        {"id": 1, "author": {"name": "user-1"}},
+        {"id": 2, "author": {"name": "user-0"}},
+        {"id": 3, "author": {"name": "user-1"}},
+    ],
+    "comments": [
+        {"id": 4, "author": {"name": "user-1"}},
+        {"id": 5, "author": {"name": "user-1"}},
+    ],
+}
+
+
+def test_batch_nodes():
+    calls = []
+
+    def user_fields(fields, ids):
+        calls.append(([f.name for f in fields], ids))
+        return [["user-{}".format(i)] for i in ids]
+
+    graph = _batch_graph(user_fields)
+    engine = Engine(SyncExecutor(), batch_nodes=True)
+    result = engine.execute(
+        create_execution_context(query=_BATCH_QUERY, query_graph=graph)
+    )
+    check_result(result, _BATCH_RESULT)
+    # User fields from both paths are loaded using single call
+    assert calls == [(["name"], [1, 0])]
+
+
+def test_batch_nodes_disabled():
+    calls = []
+
+    def user_fields(fields, ids):
+        calls.append(([f.name for f in fields], ids))
+        return [["user-{}".format(i)] for i in ids]
+
+    graph = _batch_graph(user_fields)
+    result = execute(graph, _BATCH_QUERY)
+    check_result(result, _BATCH_RESULT)
+    assert sorted(calls) == [(["name"], [1, 0, 1]), (["name"], [1, 1])]
+
+
+def _dedupe_graph(user_fields):
+    def post_fields(fields, ids):
+        return [[{"author_id": i % 2}[f.name] for f in fields] for i in ids]
+
+    def comment_fields(fields, ids):
+        return [[{"post_id": i - 3}[f.name] for f in fields] for i in ids]
+
+    def direct_link(ids):
+        return ids
+
+    return Graph(
+        [
+            Node("User", [Field("name", String, user_fields)]),
+            Node(
+                "Post",
+                [
+                    Field("author_id", Integer, post_fields),
+                    Link(
+                        "author",
+                        TypeRef["User"],
+                        direct_link,
+                        requires="author_id",
+                    ),
+                ],
+            ),
+            Node(
+                "Comment",
+                [
+                    Field("post_id", Integer, comment_fields),
+                    Link(
+                        "post", TypeRef["Post"], direct_link, requires="post_id"
+                    ),
+                ],
+            ),
+            Root(
+                [
+                    Link(
+                        "posts",
+                        Sequence[TypeRef["Post"]],
+                        lambda: [1, 2, 3],
+                        requires=None,
+                    ),
+                    Link(
+                        "comments",
+                        Sequence[TypeRef["Comment"]],
+                        lambda: [4, 5],
+                        requires=None,
+                    ),
+                ]
+            ),
+        ]
+    )
+
+
+@pytest.mark.parametrize(
+    "deduplicate_ids, expected_calls",
+    [
+        (True, [[1, 0]]),
+        (False, [[1, 0, 1], [1, 0]]),
+    ],
+)
+def test_deduplicate_ids(deduplicate_ids, expected_calls):
+    calls = []
+
+    def user_fields(fields, ids):
+        calls.append(ids)
+        return [["user-{}".format(i)] for i in ids]
+
+    def skipped(reason):
+        return REGISTRY.get_sample_value(
+            "hiku_engine_skipped_ids_total", {"node": "User", "reason": reason}
+        ) or 0
+
+    duplicate, loaded = skipped("duplicate"), skipped("loaded")
+
+    graph = _dedupe_graph(user_fields)
+    engine = Engine(SyncExecutor(), deduplicate_ids=deduplicate_ids)
+    query = build(
+        [
+            Q.posts[Q.author[Q.name]],
+            Q.comments[Q.post[Q.author[Q.name]]],
+        ]
+    )
+    result = engine.execute(
+        create_execution_context(query=query, query_graph=graph)
+    )
+    check_result(
+        result,
+        {
+            "posts": [
+                {"author": {"name": "user-1"}},
+                {"author": {"name": "user-0"}},
+                {"author": {"name": "user-1"}},
+            ],
+            "comments": [
+                {"post": {"author": {"name": "user-1"}}},
+                {"post": {"author": {"name": "user-0"}}},
+            ],
+        },
+    )
+    assert calls == expected_calls
+    if deduplicate_ids:
+        assert skipped("duplicate") - duplicate == 1
+        assert skipped("loaded") - loaded == 2
+    else:
+        assert skipped("duplicate") == duplicate
+        assert skipped("loaded") == loaded
+
+
+def _chunks_graph(calls, max_batch_size=None, field_batch_size=None):
+    def item_fields(fields, ids):
+        calls.append(("fields", ids))
+        return [[i * 10 for _ in fields] for i in ids]
+
+    def item_parent(ids):
+        calls.append(("link", ids))
+        return [i + 1 for i in ids]
+
+    return Graph(
+        [
+            Node(
+                "Item",
+                [
+                    Field(
+                        "value",
+                        Integer,
+                        item_fields,
+                        max_batch_size=field_batch_size,
+                    ),
+                    Field("id", Integer, id_field),
+                    Link(
+                        "parent",
+                        TypeRef["Item"],
+                        item_parent,
+                        requires="id",
+                        max_batch_size=field_batch_size,
+                    ),
+                ],
+            ),
+            Root(
+                [
+                    Link(
+                        "items",
+                        Sequence[TypeRef["Item"]],
+                        lambda: [1, 2, 3, 4, 5],
+                        requires=None,
+                    ),
+                ]
+            ),
+        ],
+        max_batch_size=max_batch_size,
+    )
+
+
+@pytest.mark.parametrize(
+    "max_batch_size, field_batch_size",
+    [(2, None), (None, 2), (100, 2)],
+)
+def test_max_batch_size(max_batch_size, field_batch_size):
+    calls = []
+    graph = _chunks_graph(calls, max_batch_size, field_batch_size)
+    result = execute(graph, build([Q.items[Q.value, Q.parent[Q.value]]]))
+    check_result(
+        result,
+        {
+            "items": [
+                {"value": i * 10, "parent": {"value": (i + 1) * 10}}
+                for i in [1, 2, 3, 4, 5]
+            ]
+        },
+    )
+    assert sorted(calls) == [
+        ("fields", [1, 2]),
+        ("fields", [2, 3]),
+        ("fields", [3, 4]),
+        ("fields", [4, 5]),
+        ("fields", [5]),
+        ("fields", [6]),
+        ("link", [1, 2]),
+        ("link", [3, 4]),
+        ("link", [5]),
+    ]
+
+
+def test_max_batch_size_with_batch_nodes():
+    calls = []
+    graph = _chunks_graph(calls, max_batch_size=4)
+    engine = Engine(SyncExecutor(), batch_nodes=True)
+    result = engine.execute(
+        create_execution_context(
+            query=build([Q.items[Q.value]]), query_graph=graph
+        )
+    )
+    check_result(
+        result, {"items": [{"value": i * 10} for i in [1, 2, 3, 4, 5]]}
+    )
+    assert calls == [("fields", [1, 2, 3, 4]), ("fields", [5])]
+
+
+@pytest.mark.parametrize("deduplicate_ids", [False, True])
+def test_columnar_index(deduplicate_ids):
+    calls = []
+    graph = _chunks_graph(calls, max_batch_size=2)
+    engine = Engine(
+        SyncExecutor(),
+        index_class=ColumnarIndex,
+        deduplicate_ids=deduplicate_ids,
+    )
+    result = engine.execute(
+        create_execution_context(
+            query=build([Q.items[Q.value, Q.parent[Q.value]]]),
+            query_graph=graph,
+        )
+    )
+    assert isinstance(result.__idx__, ColumnarIndex)
+    check_result(
+        result,
+        {
+            "items": [
+                {"value": i * 10, "parent": {"value": (i + 1) * 10}}
+                for i in [1, 2, 3, 4, 5]
+            ]
+        },
+    )
+
+
+
+
+def test_proxy_class():
+    graph = _chunks_graph([])
+    engine = Engine(SyncExecutor(), proxy_class=CachedProxy)
+    result = engine.execute(
+        create_execution_context(
+            query=build([Q.items[Q.value, Q.parent[Q.value]]]),
+            query_graph=graph,
+        )
+    )
+    assert isinstance(result, CachedProxy)
+    assert result.items is result.items
+    assert result.items[0].parent is result.items[0].parent
+    assert [item.value for item in result.items] == [10, 20, 30, 40, 50]
+
+@pytest.mark.parametrize("index_class", [Index, ColumnarIndex])
+def test_links_stored_as_idents(index_class):
+    graph = Graph(
+        [
+            Node("Item", [Field("id", Integer, id_field)]),
+            Node("Other", [Field("id", Integer, id_field)]),
+            Root(
+                [
+                    Link("one", TypeRef["Item"], lambda: 1, requires=None),
+                    Link(
+                        "maybe",
+                        Optional[TypeRef["Item"]],
+                        lambda: Nothing,
+                        requires=None,
+                    ),
+                    Link(
+                        "many",
+                        Sequence[TypeRef["Item"]],
+                        lambda: [2, 3],
+                        requires=None,
+                    ),
+                    Link(
+                        "maybe_many",
+                        Sequence[Optional[TypeRef["Item"]]],
+                        lambda: [4, Nothing],
+                        requires=None,
+                    ),
+                    Link(
+                        "union",
+                        UnionRef["Any"],
+                        lambda: (5, TypeRef["Other"]),
+                        requires=None,
+                    ),
+                ]
+            ),
+        ],
+        unions=[Union("Any", ["Item", "Other"])],
+    )
+    query = read(
+        """
+        {
+            one { id }
+            maybe { id }
+            many { id }
+            maybe_many { id }
+            union { ... on Other { id } }
+        }
+        """
+    )
+    result = Engine(SyncExecutor(), index_class=index_class).execute(
+        create_execution_context(query=query, query_graph=graph)
+    )
+    root = result.__idx__.root
+    assert root["one"] == 1
+    assert root["maybe"] is None
+    assert root["many"] == [2, 3]
+    assert root["maybe_many"] == [4, None]
+    assert isinstance(root["union"], Reference)
+    assert (root["union"].node, root["union"].ident) == ("Other", 5)
+    # links are resolved lazily by the proxy
+    assert result.one.id == 1
+    assert result.maybe is None
+    assert [item.id for item in result.many] == [2, 3]
+    assert result.maybe_many[0].id == 4
+    assert result.maybe_many[1] is None
+    assert result.union.__ref__.node == "Other"
+
 def test_links_requires_list_sa():
     SA_ENGINE_KEY = "sa-engine"
     metadata = MetaData()
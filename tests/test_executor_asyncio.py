@@ -1,9 +1,15 @@
 import asyncio
 import inspect
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from unittest.mock import Mock
 
 import pytest
+from prometheus_client import REGISTRY
 
+from hiku.engine import cheap, limit_concurrency
 from hiku.executors.asyncio import AsyncIOExecutor
 from hiku.executors.queue import Queue, Workflow
 
@@ -100,3 +106,128 @@ async def test_cancellation():
     assert task.done()
     assert task.cancelled() is True
     assert result == [1, 2]
+
+
+@pytest.mark.asyncio
+async def test_sync_result_is_not_a_task():
+    executor = AsyncIOExecutor()
+    fut = executor.submit(func2)
+    assert fut.done()
+    assert not isinstance(fut, asyncio.Task)
+    assert fut.result() == []
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(sys.version_info < (3, 12), reason="requires python3.12")
+async def test_eager_task():
+    executor = AsyncIOExecutor(eager=True)
+    fut = executor.submit(coroutine)
+    # coroutine without suspension points is completed immediately
+    assert fut.done()
+    assert fut.result() == "smiting"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("eager", [False, True])
+async def test_process(eager):
+    results = []
+
+    async def task(value):
+        await asyncio.sleep(0)
+        results.append(value)
+        return value
+
+    class TestWorkflow(Workflow):
+        def result(self):
+            return results
+
+    executor = AsyncIOExecutor(eager=eager)
+    queue = Queue(executor)
+    task_set = queue.fork(None)
+    fut = task_set.submit(task, 1)
+
+    def callback():
+        # futures submitted during processing are tracked as well
+        queue.add_callback(task_set.submit(task, 2), lambda: results.append(3))
+        task_set.submit(func)
+
+    queue.add_callback(fut, callback)
+    queue.add_callback(task_set, lambda: results.append("done"))
+
+    assert await executor.process(queue, TestWorkflow()) == [1, 2, 3, "done"]
+    assert not queue
+
+
+@pytest.mark.asyncio
+async def test_thread_pool():
+    loop_thread = threading.get_ident()
+
+    def sync_func():
+        return threading.get_ident()
+
+    @cheap
+    def cheap_func():
+        return threading.get_ident()
+
+    async def async_func():
+        return threading.get_ident()
+
+    def wait_count():
+        return REGISTRY.get_sample_value("hiku_thread_pool_wait_seconds_count")
+
+    count = wait_count()
+    with ThreadPoolExecutor(1) as pool:
+        executor = AsyncIOExecutor(thread_pool=pool)
+        assert await executor.submit(sync_func) != loop_thread
+        assert await executor.submit(cheap_func) == loop_thread
+        assert await executor.submit(async_func) == loop_thread
+        assert await executor.submit(lambda: coroutine()) == "smiting"
+    assert wait_count() - count == 2
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("thread_pool", [False, True])
+async def test_concurrency_limit(thread_pool):
+    running = 0
+    max_running = 0
+
+    @limit_concurrency(2)
+    async def func(value):
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return value
+
+    def sync_func(value):
+        time.sleep(0.01)
+        return value
+
+    with ThreadPoolExecutor(5) as pool:
+        executor = AsyncIOExecutor(
+            thread_pool=pool if thread_pool else None, max_concurrency=3
+        )
+        results = await asyncio.gather(
+            *[executor.submit(func, i) for i in range(6)],
+            *[executor.submit(sync_func, i) for i in range(3)],
+        )
+    assert results == [0, 1, 2, 3, 4, 5, 0, 1, 2]
+    assert max_running == 2
+
+
+def test_concurrency_limit__event_loops():
+    @limit_concurrency(1)
+    async def func(value):
+        await asyncio.sleep(0.01)
+        return value
+
+    executor = AsyncIOExecutor(max_concurrency=1)
+
+    async def run():
+        futures = [executor.submit(func, i) for i in range(3)]
+        return await asyncio.gather(*futures)
+
+    # semaphores are not shared between event loops
+    assert asyncio.run(run()) == [0, 1, 2]
+    assert asyncio.run(run()) == [0, 1, 2]
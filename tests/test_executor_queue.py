@@ -169,3 +169,78 @@ def test(idx, queue):
     assert not queue._futures
     assert not queue._forks
     assert not queue._callbacks
+    assert not queue._pending
+    assert not queue._parents
+
+
+def test_tick_callback(queue):
+    results = []
+    task_set = queue.fork(None)
+    deferred = []
+
+    def tick():
+        # submit deferred tasks before task set completion check
+        while deferred:
+            task_set.submit(func, results, deferred.pop())
+
+    queue.add_tick_callback(tick)
+    queue.add_callback(task_set, lambda: results.append("done"))
+
+    deferred.append("task1")
+    queue.progress([])
+    assert results == []
+    deferred.append("task2")
+    while queue.__futures__:
+        task = queue.__futures__[0]
+        task.run()
+        queue.progress([task])
+    assert results == [".. task1", ".. task2", "done"]
+    assert not queue._futures
+
+
+def test_wide_task_sets(queue):
+    results = []
+    root = queue.fork(None)
+    queue.add_callback(root, lambda: results.append("root"))
+    for i in range(1000):
+        task_set = queue.fork(root)
+        task_set.submit(func, results, i)
+        queue.add_callback(task_set, partial(results.append, "done"))
+
+    queue.progress([])
+    assert len(queue.__futures__) == 1000
+    assert queue
+
+    for task in queue.__futures__:
+        assert "root" not in results
+        task.run()
+        queue.progress([task])
+
+    assert results[-1] == "root"
+    assert results.count("done") == 1000
+    assert not queue
+    assert not queue._futures
+    assert not queue._forks
+    assert not queue._pending
+    assert not queue._parents
+
+
+def test_callback_submits_into_completed_task_set(queue):
+    results = []
+    task_set = queue.fork(None)
+
+    def callback():
+        if "first" not in results:
+            results.append("first")
+            task_set.submit(func, results, "task")
+            queue.add_callback(task_set, lambda: results.append("second"))
+
+    queue.add_callback(task_set, callback)
+    queue.progress([])
+    assert results == ["first"]
+
+    (task,) = queue.__futures__
+    task.run()
+    queue.progress([task])
+    assert results == ["first", ".. task", "second"]
+    assert not queue._futures
@@ -0,0 +1,88 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from prometheus_client import REGISTRY
+
+from hiku.engine import limit_concurrency
+from hiku.executors.queue import Queue, Workflow
+from hiku.executors.threads import ThreadsExecutor
+
+
+class Tracker:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.running = 0
+        self.max_running = 0
+
+    def __call__(self, value):
+        with self.lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        time.sleep(0.01)
+        with self.lock:
+            self.running -= 1
+        return value
+
+
+def saturated(resolver):
+    return REGISTRY.get_sample_value(
+        "hiku_executor_limit_saturated_total", {"resolver": resolver}
+    ) or 0
+
+
+def process(executor, func, values):
+    class TestWorkflow(Workflow):
+        def result(self):
+            return [fut.result() for fut in futures]
+
+    queue = Queue(executor)
+    task_set = queue.fork(None)
+    futures = [task_set.submit(func, v) for v in values]
+    return executor.process(queue, TestWorkflow())
+
+
+def test_function_limit():
+    tracker = Tracker()
+
+    @limit_concurrency(2)
+    def func(value):
+        return tracker(value)
+
+    before = saturated(func.__qualname__)
+    with ThreadPoolExecutor(10) as pool:
+        result = process(ThreadsExecutor(pool), func, range(6))
+    assert result == list(range(6))
+    assert tracker.max_running == 2
+    assert saturated(func.__qualname__) - before == 4
+
+
+def test_global_limit():
+    tracker = Tracker()
+    with ThreadPoolExecutor(10) as pool:
+        executor = ThreadsExecutor(pool, max_concurrency=3)
+        result = process(executor, tracker, range(9))
+    assert result == list(range(9))
+    assert tracker.max_running == 3
+
+
+def test_limit_exception():
+    @limit_concurrency(1)
+    def func(value):
+        raise ValueError(value)
+
+    with ThreadPoolExecutor(2) as pool:
+        executor = ThreadsExecutor(pool)
+        futures = [executor.submit(func, i) for i in range(3)]
+        for i, fut in enumerate(futures):
+            with pytest.raises(ValueError, match=str(i)):
+                fut.result(timeout=1)
+        # slots are released after failures
+        assert not executor._waiting
+        assert executor._running[func] == 0
+
+
+def test_invalid_limit():
+    with pytest.raises(ValueError):
+        limit_concurrency(0)
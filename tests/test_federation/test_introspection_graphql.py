@@ -61,7 +61,8 @@ def _schema(types, with_mutation=False) -> dict:
                     _ival('reason', _STR, description=ANY)
                 ]),
                 _directive('cached', ['FIELD', 'FRAGMENT_SPREAD', 'INLINE_FRAGMENT'], [
-                    _ival('ttl', _non_null(_INT), description=ANY)
+                    _ival('ttl', _non_null(_INT), description=ANY),
+                    _ival('stale', _INT, description=ANY)
                 ]),
             ],
             'mutationType': {'name': 'Mutation'} if with_mutation else None,
@@ -1,6 +1,7 @@
 import pytest
 
-from hiku.graph import Field, FieldType, FieldTypeInfo, Graph, Link, Node, Root, get_field_info
+from hiku.engine import pass_context
+from hiku.graph import Field, FieldType, FieldTypeInfo, Graph, Interface, Link, Node, Option, Root, get_field_info
 from hiku.scalar import DateTime
 from hiku.types import Any, EnumRef, Float, ID, Integer, Mapping, Optional, Sequence, String, TypeRef
 
@@ -70,3 +71,90 @@ def test_link_with_sequence_to_optional_type_ref():
 def test_field_type(field_type, type_info):
     info = get_field_info(field_type)
     assert info == type_info
+
+
+def test_resolvers():
+    class SubQuery:
+        @property
+        def __subquery__(self):
+            return self
+
+    sub_query = SubQuery()
+
+    @pass_context
+    def link_func(ctx, ids, options):
+        pass
+
+    graph = Graph([
+        Node('A', [
+            Field('a', String, noop),
+            Field('b', String, sub_query),
+        ]),
+        Root([
+            Field('c', Integer, noop),
+            Link('d', Sequence[TypeRef['A']], link_func, requires='c',
+                 options=[Option('size', Integer, default=10)]),
+        ])
+    ])
+
+    a, b = graph.nodes_map['A'].resolvers.values()
+    assert a.func is noop
+    assert not a.subquery
+    assert b.func is sub_query
+    assert b.subquery
+
+    d = graph.root.resolvers['d']
+    assert d.obj is graph.root.fields_map['d']
+    assert d.pass_context
+    assert d.requires == ('c',)
+    assert d.parse_options({}) == {'size': 10}
+    assert d.parse_options({'size': 5}) == {'size': 5}
+
+
+def test_resolver_required_option():
+    graph = Graph([
+        Root([
+            Field('a', String, noop, options=[Option('id', Integer)]),
+        ])
+    ])
+    with pytest.raises(TypeError) as err:
+        graph.root.resolvers['a'].parse_options(None)
+    err.match('Required option "id" for')
+
+
+def test_resolvers_max_batch_size():
+    def func(fields, ids):
+        pass
+
+    graph = Graph([
+        Node('A', [
+            Field('a', String, func, max_batch_size=10),
+            Field('b', String, func, max_batch_size=5),
+            Field('c', String, noop),
+            Link('d', TypeRef['A'], noop, requires='a'),
+        ]),
+        Root([
+            Link('a', Sequence[TypeRef['A']], noop, requires=None),
+        ]),
+    ], max_batch_size=100)
+
+    resolvers = graph.nodes_map['A'].resolvers
+    # fields with the same function share the smallest batch size
+    assert resolvers['a'].max_batch_size == 5
+    assert resolvers['b'].max_batch_size == 5
+    assert resolvers['c'].max_batch_size == 100
+    assert resolvers['d'].max_batch_size == 100
+
+
+def test_resolvers_interfaces_not_shared():
+    interface = Interface('I', [Field('a', String, noop)])
+    items = [
+        Node('A', [Field('a', String, noop)], implements=['I']),
+        Root([Link('a', TypeRef['A'], noop, requires=None)]),
+    ]
+    graph1 = Graph(items, interfaces=[interface], max_batch_size=10)
+    graph2 = Graph(items, interfaces=[interface], max_batch_size=20)
+
+    assert graph1.interfaces_map['I'].resolvers['a'].max_batch_size == 10
+    assert graph2.interfaces_map['I'].resolvers['a'].max_batch_size == 20
+    assert interface.resolvers == {}
@@ -164,7 +164,8 @@ def _schema(types, directives: list[dict] | None = None, with_mutation=False):
                   ]),
               _directive(
                   'cached', ['FIELD', 'FRAGMENT_SPREAD', 'INLINE_FRAGMENT'], [
-                      _ival('ttl', _non_null(_INT), description=ANY)
+                      _ival('ttl', _non_null(_INT), description=ANY),
+                      _ival('stale', _INT, description=ANY)
                   ]),
             ] + (directives or []),
             'mutationType': {'name': 'Mutation'} if with_mutation else None,
@@ -1,4 +1,21 @@
-from hiku.query import merge, Node, Field, Link
+import pickle
+
+from uuid import UUID
+from decimal import Decimal
+from datetime import date, datetime, time, timezone
+
+import pytest
+
+from hiku.query import (
+    merge,
+    value_key,
+    Node,
+    Field,
+    Link,
+    Fragment,
+    QueryInterner,
+    Variable,
+)
 
 
 def test():
@@ -148,3 +165,106 @@ def test_distinct_by_name_links():
             Link("b", Node([Field("d")]), options={"x": 1}, alias="a"),
         ]
     )
+
+
+def test_immutable():
+    field = Field("a", options={"x": 1})
+    node = Node([field])
+    with pytest.raises(AttributeError):
+        field.name = "b"
+    with pytest.raises(AttributeError):
+        node.fields = []
+    with pytest.raises(AttributeError):
+        del node.ordered
+    assert node.copy(ordered=True) == Node([field], ordered=True)
+    assert node.copy(ordered=True).fields[0] is field
+
+
+def test_hash():
+    def query():
+        return Node(
+            [
+                Field("a", options={"x": [1, "y"]}),
+                Link("b", Node([Field("c")]), alias="d"),
+            ],
+            [Fragment(None, "Foo", Node([Field("e")]))],
+        )
+
+    assert hash(query()) == hash(query())
+    assert query() == query()
+    assert hash(Link("b", Node([Field("c")]))) != hash(
+        Link("b", Node([Field("e")]))
+    )
+    assert pickle.loads(pickle.dumps(query())) == query()
+
+
+def test_interner():
+    interner = QueryInterner()
+    query1 = interner.intern(
+        Node([Field("a"), Link("b", Node([Field("c"), Field("d")]))])
+    )
+    query2 = interner.intern(
+        Node([Field("e"), Link("b", Node([Field("c"), Field("d")]))])
+    )
+    assert query1.fields[1] is query2.fields[1]
+    assert query1.fields[1].node is query2.fields[1].node
+    assert interner.intern(query1.copy()) is query1
+
+    interner = QueryInterner(maxsize=2)
+    interner.intern(Node([Field("a")]))
+    assert len(interner) == 2
+
+
+def test_index_key():
+    assert Field("a").index_key == "a"
+    assert Field("a", options={}).index_key == "a"
+    field = Field("a", options={"y": [1, "b"], "x": {"c": None, "b": True}})
+    assert field.index_key == 'a({"x":{"b":true,"c":null},"y":[1,"b"]})'
+    assert Field("a", options={"x": 1}).index_key != (
+        Field("a", options={"x": "1"}).index_key
+    )
+    assert Field("a", options={"x": 1}).options_hash == (
+        Field("a", options={"x": 1}).options_hash
+    )
+
+
+def test_value_key():
+    assert value_key("foo") == '"foo"'
+    assert value_key({"a": Variable("a")}) == '{"a":{"$variable":"a"}}'
+    assert value_key({1: "a", 2: "b"}) == value_key({2: "b", 1: "a"})
+    assert value_key({(1, 2): "a"}) == '{"$map":[["[1,2]","a"]]}'
+
+
+def test_value_key__scalars():
+    assert value_key(Decimal(-1)) != value_key(Decimal(-2))
+    assert value_key(Decimal("1.5")) == '{"$decimal":"1.5"}'
+    assert value_key(date(2024, 1, 2)) == '{"$date":"2024-01-02"}'
+    assert value_key(time(12, 30)) == '{"$time":"12:30:00"}'
+    assert value_key(datetime(2024, 1, 2, 12, 30, tzinfo=timezone.utc)) == (
+        '{"$datetime":"2024-01-02T12:30:00+00:00"}'
+    )
+    assert value_key(date(2024, 1, 2)) != value_key(datetime(2024, 1, 2))
+    uuid = UUID("12345678-1234-5678-1234-567812345678")
+    assert value_key(uuid) == (
+        '{"$uuid":"12345678-1234-5678-1234-567812345678"}'
+    )
+    assert value_key({date(2024, 1, 2): 1}) == (
+        '{"$map":[["{\\"$date\\":\\"2024-01-02\\"}",1]]}'
+    )
+
+
+def test_value_key__object():
+    class Point:
+        def __init__(self, x):
+            self.x = x
+
+        def __repr__(self):
+            return "Point({})".format(self.x)
+
+        def __hash__(self):
+            return 1
+
+    assert value_key(Point(1)) == (
+        '{"$object":"test_value_key__object.<locals>.Point:Point(1)"}'
+    )
+    assert value_key(Point(1)) != value_key(Point(2))
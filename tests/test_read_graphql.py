@@ -2,12 +2,13 @@ import pytest
 from graphql.language import ast
 from graphql.language.parser import parse
 
-from hiku.query import Field, Fragment, Link, Node
+from hiku.query import Field, Fragment, Link, Node, Variable
 from hiku.readers.graphql import (
     OperationGetter,
     OperationType,
     read,
     read_operation,
+    read_template,
 )
 
 
@@ -620,3 +621,75 @@ def test_read_operation_subscription():
     op = read_operation("subscription { ping }")
     assert op.type is OperationType.SUBSCRIPTION
     assert op.query == Node([Field("ping")])
+
+
+def test_read_template():
+    template = read_template(
+        """
+        query Foo($a: Int, $b: [Int!] = [1]) {
+          qux
+          foo(a: $a) { bar(b: $b, c: 3) baz }
+        }
+        """
+    )
+    assert template.type is OperationType.QUERY
+    assert template.name == "Foo"
+    assert template.directive_values == {}
+    assert template.query == Node(
+        [
+            Field("qux"),
+            Link(
+                "foo",
+                Node([
+                    Field("bar", options={"b": Variable("b"), "c": 3}),
+                    Field("baz"),
+                ]),
+                options={"a": Variable("a")},
+            ),
+        ]
+    )
+
+    op = template.bind({"a": 1})
+    assert op.name == "Foo"
+    assert op.query == Node(
+        [
+            Field("qux"),
+            Link(
+                "foo",
+                Node([Field("bar", options={"b": [1], "c": 3}), Field("baz")]),
+                options={"a": 1},
+            ),
+        ]
+    )
+    # query parts without variables are shared
+    assert op.query.fields[0] is template.query.fields[0]
+    assert op.query.fields[1].node.fields[1] is (
+        template.query.fields[1].node.fields[1]
+    )
+
+    op = template.bind({"a": 2, "b": [3]})
+    assert op.query.fields[1].options == {"a": 2}
+    assert op.query.fields[1].node.fields[0].options == {"b": [3], "c": 3}
+
+
+def test_read_template_required_variable():
+    template = read_template("query Foo($a: Int!) { foo(a: $a) }", {"a": 1})
+    with pytest.raises(TypeError) as err:
+        template.bind({})
+    err.match('Variable "a" is not provided for query Foo')
+
+
+def test_read_template_directive_variables():
+    src = "query Foo($cond: Boolean!, $a: Int) { foo(a: $a) @skip(if: $cond) }"
+    template = read_template(src, {"cond": True})
+    assert template.directive_values == {"cond": True}
+    assert template.query == Node([])
+    assert template.matches({"cond": True, "a": 1})
+    assert not template.matches({"cond": False})
+    assert not template.matches({})
+
+    template = read_template(src, {"cond": False})
+    assert template.query == Node([Field("foo", options={"a": Variable("a")})])
+    assert template.bind({"cond": False, "a": 5}).query == Node(
+        [Field("foo", options={"a": 5})]
+    )
@@ -0,0 +1,106 @@
+import pytest
+
+from hiku.readers import graphql, graphql_fast
+from hiku.readers.graphql_fast import Unsupported, _Reader
+
+
+@pytest.mark.parametrize(
+    "src, variables, operation_name",
+    [
+        ("{ a }", None, None),
+        (
+            """
+            query Q($x: Int = 5, $y: [String!]!) {
+              a(x: $x, y: $y) {
+                b
+                c: d(e: {f: [1, 2.5, "s\\n", ENUM, null, true]})
+              }
+            }
+            """,
+            {"y": ["1"]},
+            None,
+        ),
+        ("query A { a } query B { b }", None, "B"),
+        (
+            """
+            {
+              a
+              ...F
+              ... on T { b }
+              ... @include(if: true) { c }
+            }
+            fragment F on X { d e @skip(if: true) }
+            """,
+            None,
+            None,
+        ),
+        (
+            """
+            query($c: Boolean!, $t: Int) {
+              a @include(if: $c)
+              b @cached(ttl: $t) { x }
+            }
+            """,
+            {"c": False, "t": 10},
+            None,
+        ),
+        (
+            """
+            query($s: Int) {
+              a @cached(ttl: 10, stale: $s) { x }
+              b @cached(ttl: 5) { y }
+            }
+            """,
+            {"s": 20},
+            None,
+        ),
+        ("mutation M { a b }", None, None),
+        ("# comment\n{ a, b, c }", None, None),
+        ('{ a(s: "\\u00e9") }', None, None),
+    ],
+)
+def test_same_as_graphql_core(src, variables, operation_name):
+    type_, name, query = _Reader(src, variables, operation_name).read()
+    op = graphql.read_operation(src, variables, operation_name)
+    assert (type_, name, query) == (op.type, op.name, op.query)
+
+    template = graphql_fast.read_template(src, variables, operation_name)
+    expected = graphql.read_template(src, variables, operation_name)
+    assert template.query == expected.query
+    assert template.directive_values == expected.directive_values
+    assert [(v.name, v.default, v.required) for v in template.variables] == [
+        (v.name, v.default, v.required) for v in expected.variables
+    ]
+
+
+@pytest.mark.parametrize(
+    "src",
+    [
+        '{ a(s: """block""") }',
+        "{ a(",
+        "{ }",
+        "type Foo { a: Int }",
+        "{ a ...F }",
+        "{ a } fragment F on T { b } fragment F on T { c }",
+        "{ a(x: $undefined) }",
+        "{ a(x: 01) }",
+        "{ a @skip(if: true, x: 1) }",
+        "{ a } { b }",
+    ],
+)
+def test_unsupported(src):
+    with pytest.raises(Unsupported):
+        _Reader(src, None, None).read()
+
+
+def test_fallback():
+    src = '{ a(s: """block""") }'
+    assert graphql_fast.read(src) == graphql.read(src)
+
+    with pytest.raises(TypeError) as err:
+        graphql_fast.read("{ a ...F }")
+    err.match('Undefined fragment: "F"')
+
+    with pytest.raises(TypeError) as err:
+        graphql_fast.read("mutation { a }")
+    err.match('Only "query" operations are supported')
@@ -1,12 +1,23 @@
 import json
+from dataclasses import dataclass, field
 
 import pytest
 
 from hiku import query as hiku_query
 from hiku.query import merge
 from hiku.types import Record, String, Optional, Sequence, TypeRef, Integer
-from hiku.graph import Graph, Link, Node, Field, Root
-from hiku.result import denormalize, Index, Proxy, Reference, ROOT
+from hiku.graph import Graph, Link, Node, Field, Root, Many, Maybe, One
+from hiku.result import (
+    denormalize,
+    iter_dataclasses,
+    iter_tuples,
+    CachedProxy,
+    ColumnarIndex,
+    Index,
+    Proxy,
+    Reference,
+    ROOT,
+)
 from hiku.readers.graphql import read
 
 
@@ -643,3 +654,149 @@ def test_denormalize_data_type():
         ]
     )
     assert denormalize(graph, Proxy(index, ROOT, query)) == {"foo": {"a": 42}}
+
+
+def test_columnar_index():
+    index = ColumnarIndex()
+    index.root.update({"foo": 1})
+    index.store_rows("SomeNode", [1, 2], ["a", "b"], [[10, 11], [20, 21]])
+    index.store_column("SomeNode", [2, 3], "c", ["x", "y"])
+    index["SomeNode"][4]["a"] = 40
+    index.finish()
+
+    assert index.root == {"foo": 1}
+    node_idx = index["SomeNode"]
+    assert len(node_idx) == 4
+    assert node_idx[1] == {"a": 10, "b": 11}
+    assert node_idx[2] == {"a": 20, "b": 21, "c": "x"}
+    assert node_idx[3] == {"c": "y"}
+    assert node_idx[4] == {"a": 40}
+    assert "c" not in node_idx[1]
+    assert node_idx.get(5) is None
+    # index keys are stored only once per node
+    assert list(node_idx.columns) == ["a", "b", "c"]
+    assert node_idx.columns["a"][:2] == [10, 20]
+    with pytest.raises(KeyError):
+        node_idx[1]["c"]
+    with pytest.raises(KeyError):
+        node_idx[5]
+    with pytest.raises(KeyError):
+        index["UnknownNode"]
+
+
+def test_columnar_index_proxy():
+    index = ColumnarIndex()
+    index.store_rows("SomeNode", [42], ["foo"], [["bar"]])
+    index.finish()
+
+    query = hiku_query.Node([hiku_query.Field("foo"), hiku_query.Field("baz")])
+    proxy = Proxy(index, Reference("SomeNode", 42), query)
+    assert proxy.foo == "bar"
+    with pytest.raises(AssertionError) as err:
+        proxy.baz
+    err.match(r"Field SomeNode\[42\]\.baz is missing in the index")
+
+    proxy = Proxy(index, Reference("SomeNode", 1), query)
+    with pytest.raises(AssertionError) as err:
+        proxy.foo
+    err.match(r"Object SomeNode\[1\] is missing in the index")
+
+
+def _users_index():
+    index = Index()
+    index.targets.update(
+        {
+            ("__root__", "users"): ("User", Many),
+            ("__root__", "best"): ("User", Maybe),
+            ("User", "friend"): ("User", One),
+        }
+    )
+    index.root.update(
+        {
+            "users": [1, 2],
+            "best": None,
+            "media": [Reference("User", 2), None],
+        }
+    )
+    index["User"][1].update({"id": 1, "name": "Alice", "friend": 2})
+    index["User"][2].update({"id": 2, "name": "Bob", "friend": 1})
+    index.finish()
+    return index
+
+
+def test_cached_proxy():
+    query = read("{ users { id friend { id } } best { id } }")
+    proxy = CachedProxy(_users_index(), ROOT, query)
+    users = proxy.users
+    assert users is proxy.users
+    assert isinstance(users[0], CachedProxy)
+    assert users[0].friend is users[0].friend
+    assert users[0].friend.id == 2
+    assert proxy.best is None
+
+    plain = Proxy(_users_index(), ROOT, query)
+    assert plain.users is not plain.users
+
+
+def test_iter_tuples():
+    query = read("{ users { id name friend { id } } best { id } }")
+    proxy = Proxy(_users_index(), ROOT, query)
+    rows = list(iter_tuples(proxy, "users"))
+    assert [row[:2] for row in rows] == [(1, "Alice"), (2, "Bob")]
+    assert [row[2].id for row in rows] == [2, 1]
+    assert list(iter_tuples(proxy, "best")) == []
+    assert list(iter_tuples(proxy.users[0], "friend")) == [(2,)]
+
+
+def test_iter_tuples_single_field():
+    query = read("{ users { name } }")
+    proxy = Proxy(_users_index(), ROOT, query)
+    assert list(iter_tuples(proxy, "users")) == [("Alice",), ("Bob",)]
+
+
+def test_iter_tuples_references():
+    query = read("{ media { __typename id } }")
+    proxy = Proxy(_users_index(), ROOT, query)
+    assert list(iter_tuples(proxy, "media")) == [("User", 2), None]
+
+
+def test_iter_tuples_errors():
+    query = read("{ users { id } }")
+    proxy = Proxy(_users_index(), ROOT, query)
+    with pytest.raises(KeyError) as err:
+        list(iter_tuples(proxy, "unknown"))
+    err.match("Field 'unknown' wasn't requested in the query")
+    with pytest.raises(TypeError) as err:
+        list(iter_tuples(proxy.users[0], "id"))
+    err.match("Field 'id' is not a link")
+
+
+def test_iter_dataclasses():
+    @dataclass
+    class User:
+        name: str
+        id: int
+
+    @dataclass(kw_only=True)
+    class UserKw:
+        id: int
+        greeting: str = field(default="hi", init=False)
+
+    query = read("{ users { id name } }")
+    proxy = Proxy(_users_index(), ROOT, query)
+    assert list(iter_dataclasses(proxy, "users", User)) == [
+        User("Alice", 1),
+        User("Bob", 2),
+    ]
+    assert list(iter_dataclasses(proxy, "users", UserKw)) == [
+        UserKw(id=1),
+        UserKw(id=2),
+    ]
+
+    @dataclass
+    class Missing:
+        email: str
+
+    with pytest.raises(KeyError) as err:
+        list(iter_dataclasses(proxy, "users", Missing))
+    err.match("Field 'email' wasn't requested in the query")
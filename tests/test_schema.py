@@ -1,7 +1,12 @@
-from hiku.graph import Field, Graph, Link, Node, Root
-from hiku.types import String, TypeRef
+from unittest.mock import patch
+
+from hiku.graph import Field, Graph, Link, Node, Option, Root
+from hiku.types import Integer, String, TypeRef
 from hiku.schema import Schema
 from hiku.executors.sync import SyncExecutor
+from hiku.extensions.base_extension import Extension
+from hiku.extensions.base_validator import QueryValidator
+from hiku.validate.query import validate_template
 
 
 def mock_resolve():
@@ -34,3 +39,123 @@ def test_schema__non_existing_link():
     assert result.errors is not None
     assert len(result.errors) == 1
     assert result.errors[0].message == 'Link "nonExistingLink" is not implemented in the "root" node'
+
+
+def test_schema__query_template():
+    def answer(fields):
+        return [f.options["n"] * 2 for f in fields]
+
+    graph = Graph(
+        [Root([Field("answer", Integer, answer, options=[Option("n", Integer)])])]
+    )
+    schema = Schema(SyncExecutor(), graph, template_cache_size=128)
+    src = "query Answer($n: Int) { answer(n: $n) }"
+
+    with patch(
+        "hiku.schema.validate_template", wraps=validate_template
+    ) as validate_:
+        assert schema.execute_sync(src, {"n": 1}).data == {"answer": 2}
+        assert schema.execute_sync(src, {"n": 21}).data == {"answer": 42}
+        result = schema.execute_sync(src, {"n": "foo"})
+        # template is validated once, only variables are validated per request
+        assert validate_.call_count == 1
+
+    assert result.data is None
+    assert [e.message for e in result.errors] == [
+        'Invalid value for option "root.answer:n", "str" instead of Integer'
+    ]
+
+
+def test_schema__query_template_fields_conflict():
+    def answer(fields):
+        return [str(f.options["n"]) for f in fields]
+
+    graph = Graph(
+        [Root([Field("answer", String, answer, options=[Option("n", Integer)])])]
+    )
+    src = "query Answer($a: Int, $b: Int) { answer(n: $a) answer(n: $b) }"
+    for template_cache_size in (0, 128):
+        schema = Schema(
+            SyncExecutor(), graph, template_cache_size=template_cache_size
+        )
+        result = schema.execute_sync(src, {"a": 1, "b": 1})
+        assert result.data == {"answer": "1"}
+        result = schema.execute_sync(src, {"a": 1, "b": 2})
+        assert result.data is None
+        assert [e.message for e in result.errors] == [
+            'Found distinct fields with the same resulting name "answer" '
+            'for the node "root"'
+        ]
+
+
+def test_schema__query_template_custom_validator():
+    class LimitValidator(QueryValidator):
+        def validate(self, query, graph):
+            limit = query.fields_map["answer"].options.get("n")
+            if limit is not None and limit > 100:
+                return ["Limit is too big"]
+            return []
+
+    class LimitExtension(Extension):
+        def on_validate(self, execution_context):
+            execution_context.validators = execution_context.validators + (
+                LimitValidator(),
+            )
+            yield
+
+    def answer(fields):
+        return [f.options["n"] * 2 for f in fields]
+
+    graph = Graph(
+        [Root([Field("answer", Integer, answer, options=[Option("n", Integer)])])]
+    )
+    src = "query Answer($n: Int) { answer(n: $n) }"
+    for template_cache_size in (0, 128):
+        schema = Schema(
+            SyncExecutor(),
+            graph,
+            extensions=[LimitExtension()],
+            template_cache_size=template_cache_size,
+        )
+        assert schema.execute_sync(src, {"n": 1}).data == {"answer": 2}
+        result = schema.execute_sync(src, {"n": 100000})
+        assert result.data is None
+        assert [e.message for e in result.errors] == ["Limit is too big"]
+        result = schema.execute_sync("{ answer(n: 100000) }")
+        assert [e.message for e in result.errors] == ["Limit is too big"]
+
+
+def test_schema__intern_queries():
+    def answer(fields):
+        return [f.options["n"] * 2 for f in fields]
+
+    graph = Graph(
+        [Root([Field("answer", Integer, answer, options=[Option("n", Integer)])])]
+    )
+    schema = Schema(SyncExecutor(), graph, intern_queries=True)
+    src = "query Answer($n: Int) { answer(n: $n) }"
+    assert schema.execute_sync(src, {"n": 1}).data == {"answer": 2}
+    assert schema.execute_sync(src, {"n": 21}).data == {"answer": 42}
+    assert schema.execute_sync(src, {"n": 21}).data == {"answer": 42}
+    assert len(schema.query_interner) == 4
+
+
+def test_schema__fast_reader():
+    def answer(fields):
+        return [f.options["n"] * 2 for f in fields]
+
+    graph = Graph(
+        [Root([Field("answer", Integer, answer, options=[Option("n", Integer)])])]
+    )
+    src = "query Answer($n: Int) { answer(n: $n) }"
+    for template_cache_size in (0, 128):
+        schema = Schema(
+            SyncExecutor(),
+            graph,
+            fast_reader=True,
+            template_cache_size=template_cache_size,
+        )
+        with patch("hiku.schema.parse_query") as parse:
+            assert schema.execute_sync(src, {"n": 1}).data == {"answer": 2}
+            assert schema.execute_sync(src, {"n": 21}).data == {"answer": 42}
+            assert not parse.called